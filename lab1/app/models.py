@@ -1,7 +1,9 @@
-books = [
+from app.store import BookStore
+
+books = BookStore([
     {"id": 1, "title": "1984", "author": "George Orwell", "year": 1949},
     {"id": 2, "title": "Brave New World", "author": "Aldous Huxley", "year": 1932},
     {"id": 3, "title": "Fahrenheit 451", "author": "Ray Bradbury", "year": 1953},
     {"id": 4, "title": "To Kill a Mockingbird", "author": "Harper Lee", "year": 1960},
     {"id": 5, "title": "Moby Dick", "author": "Herman Melville", "year": 1851}
-]
\ No newline at end of file
+])
@@ -1,45 +1,86 @@
-from flask import request, jsonify
+from flask import request, jsonify, Response, stream_with_context
 from app import app
 from app.models import books
 from app.schemas import book_schema
 from marshmallow import ValidationError
 
-def generate_book_id():
-    return max(book['id'] for book in books) + 1 if books else 1
-
 @app.route('/')
 def index():
     return "Головна сторінка"
 
+def stream_books(skip, limit, total):
+    # Відповідь генерується по одній книзі, весь каталог в пам'ять не збирається
+    yield '{"meta": ' + app.json.dumps({'total': total, 'skip': skip, 'limit': limit}) + ', "data": ['
+    for i, book in enumerate(books.iter_books(skip, limit)):
+        yield (',' if i else '') + app.json.dumps(book)
+    yield ']}'
+
 @app.route('/books', methods=['GET'])
 def get_books():
-    return jsonify(books)
+    # Параметри пагінації
+    skip = max(request.args.get('skip', default=0, type=int), 0)
+    limit = request.args.get('limit', default=None, type=int)
+    if limit is not None:
+        limit = max(limit, 0)
+    stream = request.args.get('stream', default='false').lower() == 'true'
+    
+    total_books = len(books)
+    
+    if stream:
+        return Response(stream_with_context(stream_books(skip, limit, total_books)),
+                        mimetype='application/json')
+    
+    if limit is None:
+        limit = 10
+    limit = min(limit, 100)
+    
+    return jsonify({
+        'data': books.page(skip, limit),
+        'meta': {
+            'total': total_books,
+            'skip': skip,
+            'limit': limit
+        }
+    })
+
+@app.route('/books/search', methods=['GET'])
+def search_books():
+    query = request.args.get('q', default='').strip()
+    limit = min(max(request.args.get('limit', default=10, type=int), 1), 100)
+    
+    if not query:
+        return jsonify({"error": "Параметр q обов'язковий"}), 400
+    
+    return jsonify({
+        'data': books.search(query, limit),
+        'meta': {
+            'q': query,
+            'limit': limit
+        }
+    })
 
 @app.route('/books/<int:book_id>', methods=['GET'])
 def get_book(book_id):
-    book = next((b for b in books if b['id'] == book_id), None)
+    book = books.get(book_id)
     return jsonify(book) if book else (jsonify({"error": "Книга не знайдена"}), 404)
 
 @app.route('/books', methods=['POST'])
 def add_book():
     try:
         data = request.json.copy()
-        data['id'] = generate_book_id()
+        # id призначає сховище під своїм блокуванням
+        data.pop('id', None)
         
-        book = book_schema.load(data)
-        books.append(book)
+        book = books.add(book_schema.load(data, partial=('id',)))
         return jsonify(book), 201
     except ValidationError as err:
         return jsonify(err.messages), 400
 
 @app.route('/books/<int:book_id>', methods=['DELETE'])
 def delete_book(book_id):
-    global books
-    
-    book_to_delete = next((b for b in books if b['id'] == book_id), None)
+    book_to_delete = books.remove(book_id)
     
     if not book_to_delete:
         return jsonify({"error": "Книга не знайдена"}), 404
     
-    books = [b for b in books if b['id'] != book_id]
     return jsonify({"message": "Книга видалена"}), 200
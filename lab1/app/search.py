@@ -0,0 +1,94 @@
+import heapq
+import math
+import re
+from collections import Counter
+
+# Частка триграм запиту, яка має знайтися в книзі, щоб вона потрапила у видачу
+MIN_OVERLAP = 0.5
+
+WORD_RE = re.compile(r"\w+")
+
+
+def trigrams(text):
+    """
+    Множина триграм тексту.
+
+    Як у pg_trgm: текст розбивається на слова, кожне слово доповнюється
+    двома пробілами на початку та одним у кінці.
+    """
+    grams = set()
+    for word in WORD_RE.findall(text.casefold()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def book_text(book):
+    return f"{book['title']} {book['author']}"
+
+
+class TrigramIndex:
+    """
+    Інвертований індекс триграм title та author для нечіткого пошуку.
+
+    Для кожної триграми зберігається множина id книг, для кожної книги -
+    її триграми. Оцінка книги - частка триграм запиту, знайдених у книзі
+    (при рівності - коефіцієнт Жаккара). Кандидати беруться лише з
+    найрідкісніших триграм запиту (prefix filtering): книга, яка набирає
+    MIN_OVERLAP, обов'язково містить хоча б одну з них.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._grams = {}
+
+    def add(self, book):
+        grams = frozenset(trigrams(book_text(book)))
+        self._grams[book['id']] = grams
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(book['id'])
+
+    def remove(self, book_id):
+        for gram in self._grams.pop(book_id, ()):
+            ids = self._postings[gram]
+            ids.discard(book_id)
+            if not ids:
+                del self._postings[gram]
+
+    def search(self, query, limit=10):
+        """
+        Повертає до limit пар (score, book_id), найкращі першими
+
+        Args:
+            query: Рядок запиту, допускаються опечатки
+            limit: Максимальна кількість результатів
+        """
+        query_grams = trigrams(query)
+        if not query_grams or limit <= 0:
+            return []
+        required = max(1, math.ceil(MIN_OVERLAP * len(query_grams)))
+
+        rare_first = sorted(query_grams, key=lambda gram: len(self._postings.get(gram, ())))
+        prefix = len(query_grams) - required + 1
+        candidates = set()
+        for gram in rare_first[:prefix]:
+            candidates.update(self._postings.get(gram, ()))
+        if not candidates:
+            return []
+
+        # Перетин множин і підрахунок виконуються на рівні C, без циклу по кандидатах
+        overlap = Counter()
+        for gram in rare_first:
+            posting = self._postings.get(gram)
+            if posting:
+                overlap.update(candidates.intersection(posting))
+
+        def scored():
+            for book_id, common in overlap.items():
+                if common >= required:
+                    jaccard = common / (len(query_grams) + len(self._grams[book_id]) - common)
+                    yield common / len(query_grams), jaccard, -book_id
+
+        # Купа на limit елементів замість сортування всіх кандидатів
+        best = heapq.nlargest(limit, scored())
+        return [(round(score, 3), -negative_id) for score, _, negative_id in best]
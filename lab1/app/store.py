@@ -0,0 +1,108 @@
+import threading
+from itertools import islice
+
+from app.search import TrigramIndex
+
+
+class BookStore:
+    """
+    In-memory сховище книг з індексом за id.
+
+    Книги зберігаються у словнику id -> book, тому пошук, додавання та
+    видалення виконуються за O(1). Словник зберігає порядок вставки,
+    отже список книг віддається в тому ж порядку, в якому їх додавали.
+    Наступний id береться з монотонного лічильника, а не через max().
+    Триграмний індекс для пошуку оновлюється разом з каталогом.
+    """
+
+    def __init__(self, books=None):
+        self._books = {}
+        self._next_id = 1
+        self._search_index = TrigramIndex()
+        # Захищає зміни каталогу та знімок id для потокової відповіді
+        self._lock = threading.Lock()
+        for book in books or []:
+            self.add(book)
+
+    def __len__(self):
+        return len(self._books)
+
+    def __iter__(self):
+        return iter(self._books.values())
+
+    def __contains__(self, book_id):
+        return book_id in self._books
+
+    @property
+    def next_id(self):
+        """Id, який отримає наступна книга"""
+        return self._next_id
+
+    def get(self, book_id):
+        return self._books.get(book_id)
+
+    def add(self, book):
+        """
+        Додає книгу та зсуває лічильник id за неї.
+
+        Книга без id отримує next_id під тим самим блокуванням, тож
+        паралельні запити не отримають однаковий id. Наявний id не
+        замінюється: буде ValueError.
+        """
+        with self._lock:
+            if book.get('id') is None:
+                book = dict(book, id=self._next_id)
+            elif book['id'] in self._books:
+                raise ValueError(f"Книга з id {book['id']} вже існує")
+            self._books[book['id']] = book
+            self._search_index.add(book)
+            if book['id'] >= self._next_id:
+                self._next_id = book['id'] + 1
+        return book
+
+    def remove(self, book_id):
+        """Видаляє книгу за id. Повертає видалену книгу або None"""
+        with self._lock:
+            return self._remove(book_id)
+
+    def _remove(self, book_id):
+        book = self._books.pop(book_id, None)
+        if book is not None:
+            self._search_index.remove(book_id)
+        return book
+
+    def search(self, query, limit=10):
+        """Нечіткий пошук за title та author, найкращі збіги першими"""
+        return [self._books[book_id] for _, book_id in self._search_index.search(query, limit)]
+
+    def all(self):
+        return list(self._books.values())
+
+    def page(self, skip=0, limit=None):
+        """Сторінка книг у порядку вставки без копіювання всього каталогу"""
+        stop = None if limit is None else skip + limit
+        return list(islice(self._books.values(), skip, stop))
+
+    def iter_books(self, skip=0, limit=None):
+        """
+        Лінива ітерація книг для потокової відповіді.
+
+        Під блокуванням знімається лише список id (у порядку вставки), а
+        книги беруться зі словника по одній під час ітерації. Книги, видалені
+        після початку відповіді, пропускаються; додані - в неї не потрапляють.
+        Вартість залежить від кількості книг, а не від діапазону їх id.
+        """
+        with self._lock:
+            book_ids = list(self._books)
+        emitted = 0
+        for book_id in book_ids:
+            if limit is not None and emitted >= limit:
+                return
+            book = self._books.get(book_id)
+            if book is None:
+                continue
+            if skip:
+                skip -= 1
+                continue
+            emitted += 1
+            yield book
@@ -0,0 +1,131 @@
+import threading
+
+import pytest
+
+from app import app
+from app.store import BookStore
+
+
+@pytest.fixture
+def store():
+    return BookStore([
+        {"id": 1, "title": "1984", "author": "George Orwell", "year": 1949},
+        {"id": 2, "title": "Brave New World", "author": "Aldous Huxley", "year": 1932},
+    ])
+
+
+@pytest.fixture
+def client(monkeypatch, store):
+    from app import routes
+    monkeypatch.setattr(routes, "books", store)
+    return app.test_client()
+
+
+class TestBookStore:
+    """Тести для in-memory сховища книг"""
+
+    def test_get_and_contains(self, store):
+        assert store.get(1)["title"] == "1984"
+        assert 2 in store
+        assert store.get(42) is None
+
+    def test_next_id_is_monotonic(self, store):
+        assert store.next_id == 3
+        store.remove(2)
+        # Видалення останньої книги не повертає її id повторно
+        assert store.next_id == 3
+
+    def test_insertion_order_preserved(self, store):
+        store.add({"id": 3, "title": "Moby Dick", "author": "Herman Melville", "year": 1851})
+        store.remove(1)
+        assert [b["id"] for b in store] == [2, 3]
+
+    def test_iter_books_survives_changes(self, store):
+        store.add({"id": 3, "title": "Moby Dick", "author": "Herman Melville", "year": 1851})
+        books = store.iter_books()
+        assert next(books)["id"] == 1
+        store.remove(2)
+        store.add({"id": 4, "title": "Dune", "author": "Frank Herbert", "year": 1965})
+        # Видалена книга пропускається, додана після початку ітерації - ні
+        assert [b["id"] for b in books] == [3]
+        assert [b["id"] for b in store.iter_books(skip=1, limit=1)] == [3]
+
+    def test_iter_books_out_of_order_ids(self):
+        store = BookStore([
+            {"id": 5, "title": "Dune", "author": "Frank Herbert", "year": 1965},
+            {"id": 1, "title": "1984", "author": "George Orwell", "year": 1949},
+            {"id": 10_000_000, "title": "Emma", "author": "Jane Austen", "year": 1815},
+        ])
+        assert [b["id"] for b in store.iter_books()] == [b["id"] for b in store.all()] == [5, 1, 10_000_000]
+        assert [b["id"] for b in store.iter_books(skip=1)] == [1, 10_000_000]
+
+    def test_add_assigns_id_and_refuses_existing(self, store):
+        assert store.add({"title": "Dune", "author": "Frank Herbert", "year": 1965})["id"] == 3
+        with pytest.raises(ValueError):
+            store.add({"id": 1, "title": "Emma", "author": "Jane Austen", "year": 1815})
+        assert store.get(1)["title"] == "1984"
+
+    def test_concurrent_adds_get_distinct_ids(self, store):
+        def add_many():
+            for _ in range(200):
+                store.add({"title": "Dune", "author": "Frank Herbert", "year": 1965})
+
+        threads = [threading.Thread(target=add_many) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(store) == 802
+        assert store.next_id == 803
+
+    def test_remove_missing(self, store):
+        assert store.remove(42) is None
+        assert len(store) == 2
+
+
+class TestBookRoutes:
+    """Тести для маршрутів /books поверх BookStore"""
+
+    def test_add_and_get(self, client):
+        response = client.post("/books", json={"title": "Dune", "author": "Frank Herbert", "year": 1965})
+        assert response.status_code == 201
+        assert response.get_json()["id"] == 3
+        assert client.get("/books/3").get_json()["title"] == "Dune"
+
+    def test_delete(self, client):
+        assert client.delete("/books/1").status_code == 200
+        assert client.get("/books/1").status_code == 404
+        assert client.delete("/books/1").status_code == 404
+        assert [b["id"] for b in client.get("/books").get_json()["data"]] == [2]
+
+    def test_pagination(self, client):
+        body = client.get("/books?skip=1&limit=5").get_json()
+        assert [b["id"] for b in body["data"]] == [2]
+        assert body["meta"] == {"total": 2, "skip": 1, "limit": 5}
+
+    def test_stream_matches_page(self, client):
+        response = client.get("/books?stream=true")
+        assert response.is_streamed
+        body = response.get_json()
+        assert [b["id"] for b in body["data"]] == [1, 2]
+        assert body["meta"] == {"total": 2, "skip": 0, "limit": None}
+
+
+class TestSearch:
+    """Тести для нечіткого пошуку за триграмами"""
+
+    def test_typo_tolerant(self, store):
+        assert [b["id"] for b in store.search("Brave Nwe Wrld")] == [2]
+        assert [b["id"] for b in store.search("orwel")] == [1]
+        assert store.search("zzzzqq") == []
+
+    def test_index_follows_changes(self, store):
+        store.add({"id": 3, "title": "Nineteen Eighty-Four", "author": "George Orwell", "year": 1949})
+        assert {b["id"] for b in store.search("george orwell")} == {1, 3}
+        store.remove(1)
+        assert [b["id"] for b in store.search("george orwell")] == [3]
+
+    def test_route(self, client):
+        body = client.get("/books/search?q=huxley&limit=5").get_json()
+        assert [b["id"] for b in body["data"]] == [2]
+        assert client.get("/books/search").status_code == 400
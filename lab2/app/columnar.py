@@ -0,0 +1,213 @@
+from array import array
+from bisect import bisect_left
+from itertools import islice
+
+import numpy as np
+
+from store import SORT_FIELDS
+
+
+class StringTable:
+    """
+    Таблиця інтернованих рядків: кожен унікальний рядок зберігається один раз,
+    а книги посилаються на нього цілим кодом.
+
+    Таблиця лише доповнюється, тому коди, видані раніше, лишаються дійсними
+    для всіх версій каталогу. Рядки видалених книг не прибираються.
+    """
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def intern(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self._codes[value] = code
+        return code
+
+
+class ColumnarSnapshot:
+    """
+    Незмінна версія каталогу в колонковому вигляді.
+
+    id та year зберігаються в масивах NumPy, title та author - кодами в
+    StringTable. Рядки впорядковані за id, тому пошук за id - це
+    searchsorted. Вторинні індекси - масиви позицій, відсортовані за
+    (key, id). Словник книги будується лише тоді, коли він потрібен у
+    відповіді. Має той самий інтерфейс, що й CatalogSnapshot.
+
+    Ціна компактності - запис: with_book та without_book копіюють усі
+    колонки та три індекси, тобто O(n) на кожне додавання чи видалення.
+    На 1M книг це мілісекунди (у кілька разів довше, ніж у CatalogSnapshot,
+    див. bench_memory.py), і в async-маршруті весь цей час стоїть цикл
+    подій. Підходить для великих каталогів, які переважно читаються.
+    """
+
+    __slots__ = ("ids", "years", "title_codes", "author_codes", "titles", "authors", "indexes", "next_id", "version")
+
+    def __init__(self, ids, years, title_codes, author_codes, titles, authors, indexes, next_id):
+        self.ids = ids
+        self.years = years
+        self.title_codes = title_codes
+        self.author_codes = author_codes
+        self.titles = titles
+        self.authors = authors
+        self.indexes = indexes
+        self.next_id = next_id
+        self.version = 0
+
+    @staticmethod
+    def _string_ranks(table):
+        """Ранг кожного коду в порядку casefold (однакові ключі мають однаковий ранг)"""
+        keys = np.array([value.casefold() for value in table.values], dtype=object)
+        if not len(keys):
+            return np.empty(0, dtype=np.int64)
+        return np.unique(keys, return_inverse=True)[1]
+
+    @classmethod
+    def build(cls, books, next_id=None):
+        """Будує знімок за один прохід по книгах, не тримаючи їх у пам'яті"""
+        titles, authors = StringTable(), StringTable()
+        ids, years, title_codes, author_codes = array("q"), array("i"), array("i"), array("i")
+        for book in books:
+            ids.append(book["id"])
+            years.append(book["year"])
+            title_codes.append(titles.intern(book["title"]))
+            author_codes.append(authors.intern(book["author"]))
+
+        ids = np.frombuffer(ids, dtype=np.int64)
+        order = np.argsort(ids, kind="stable")
+        ids = ids[order]
+        years = np.frombuffer(years, dtype=np.int32)[order]
+        title_codes = np.frombuffer(title_codes, dtype=np.int32)[order]
+        author_codes = np.frombuffer(author_codes, dtype=np.int32)[order]
+
+        indexes = {
+            "year": np.lexsort((ids, years)).astype(np.int32),
+            "author": np.lexsort((ids, cls._string_ranks(authors)[author_codes])).astype(np.int32),
+            "title": np.lexsort((ids, cls._string_ranks(titles)[title_codes])).astype(np.int32),
+        }
+        max_id = int(ids[-1]) if len(ids) else 0
+        return cls(ids, years, title_codes, author_codes, titles, authors, indexes, max(max_id + 1, next_id or 1))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return (self._row(position) for position in range(len(self.ids)))
+
+    def _row(self, position):
+        """Лінива побудова словника книги з колонок"""
+        return {
+            "id": int(self.ids[position]),
+            "title": self.titles.values[self.title_codes[position]],
+            "author": self.authors.values[self.author_codes[position]],
+            "year": int(self.years[position]),
+        }
+
+    def _position(self, book_id):
+        position = int(np.searchsorted(self.ids, book_id))
+        if position < len(self.ids) and self.ids[position] == book_id:
+            return position
+        return None
+
+    def get(self, book_id):
+        position = self._position(book_id)
+        return None if position is None else self._row(position)
+
+    def _sort_key(self, field, ids, years, title_codes, author_codes):
+        """Ключ (key, id) позиції для вторинного індексу field"""
+        if field == "year":
+            return lambda p: (int(years[p]), int(ids[p]))
+        if field == "title":
+            return lambda p: (self.titles.values[title_codes[p]].casefold(), int(ids[p]))
+        return lambda p: (self.authors.values[author_codes[p]].casefold(), int(ids[p]))
+
+    def with_book(self, book):
+        """Нова версія знімка з доданою книгою"""
+        position = int(np.searchsorted(self.ids, book["id"]))
+        ids = np.insert(self.ids, position, book["id"])
+        years = np.insert(self.years, position, book["year"])
+        title_codes = np.insert(self.title_codes, position, self.titles.intern(book["title"]))
+        author_codes = np.insert(self.author_codes, position, self.authors.intern(book["author"]))
+
+        indexes = {}
+        for field, index in self.indexes.items():
+            # Нова книга з найбільшим id (звичайний POST) позицій не зсуває
+            if position < len(self.ids):
+                index = index + (index >= position)
+            key = self._sort_key(field, ids, years, title_codes, author_codes)
+            at = bisect_left(index, key(position), key=key)
+            indexes[field] = np.insert(index, at, position)
+        return ColumnarSnapshot(
+            ids, years, title_codes, author_codes, self.titles, self.authors,
+            indexes, max(self.next_id, book["id"] + 1),
+        )
+
+    def without_book(self, book):
+        """Нова версія знімка без книги"""
+        position = self._position(book["id"])
+        indexes = {}
+        for field, index in self.indexes.items():
+            index = index[index != position]
+            indexes[field] = index - (index > position)
+        return ColumnarSnapshot(
+            np.delete(self.ids, position),
+            np.delete(self.years, position),
+            np.delete(self.title_codes, position),
+            np.delete(self.author_codes, position),
+            self.titles, self.authors, indexes, self.next_id,
+        )
+
+    def _year_bounds(self, year_from, year_to):
+        """Межі [lo, hi) діапазону років в індексі year"""
+        index = self.indexes["year"]
+        years = self.years
+        lo = 0 if year_from is None else bisect_left(index, year_from, key=lambda p: years[p])
+        hi = len(index) if year_to is None else bisect_left(index, year_to + 1, key=lambda p: years[p])
+        return lo, max(lo, hi)
+
+    def query(self, year_from=None, year_to=None, sort=None, offset=0, limit=None):
+        """Те саме, що CatalogSnapshot.query, але над колонками"""
+        descending = bool(sort) and sort.startswith("-")
+        field = sort.lstrip("-") if sort else "id"
+        if field not in SORT_FIELDS:
+            raise ValueError(f"Невідоме поле сортування: {field}")
+        stop = None if limit is None else offset + limit
+
+        filtered = year_from is not None or year_to is not None
+        if filtered:
+            lo, hi = self._year_bounds(year_from, year_to)
+            if field != "year":
+                # Кандидати з діапазону років (k штук) сортуємо за потрібним ключем
+                candidates = self.indexes["year"][lo:hi]
+                if field == "id":
+                    positions = sorted(candidates.tolist(), reverse=descending)
+                else:
+                    key = self._sort_key(field, self.ids, self.years, self.title_codes, self.author_codes)
+                    positions = sorted(candidates.tolist(), key=key, reverse=descending)
+                return [self._row(p) for p in positions[offset:stop]]
+        else:
+            lo, hi = 0, len(self.ids)
+
+        if field == "id":
+            positions = range(len(self.ids) - 1, -1, -1) if descending else range(len(self.ids))
+            return [self._row(p) for p in islice(positions, offset, stop)]
+
+        # Сторінка береться прямо зі зрізу відсортованого індексу
+        index = self.indexes[field]
+        if descending:
+            end = hi - offset
+            start = lo if stop is None else max(lo, hi - stop)
+            positions = index[max(start, 0):max(end, 0)][::-1]
+        else:
+            start = lo + offset
+            end = hi if stop is None else min(hi, lo + stop)
+            positions = index[start:max(start, end)]
+        return [self._row(p) for p in positions.tolist()]
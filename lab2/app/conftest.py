@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+WORDS = ["war", "peace", "lord", "rings", "king", "return", "night", "day", "sea", "old", "man", "tale"]
+# Різний регістр та кирилиця перевіряють casefold і порядок байтів UTF-8
+AUTHORS = ["Austen", "orwell", "Tolkien", "huxley", "Франко"]
+
+
+def generate_books(count, seed=0):
+    rnd = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "title": " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(1, 4))),
+            "author": rnd.choice(AUTHORS),
+            "year": rnd.randint(1800, 2020),
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def query_reference(catalog, year_from=None, year_to=None, sort=None, offset=0, limit=None):
+    """Еталонна реалізація запиту повним проходом по списку"""
+    rows = [
+        b for b in catalog
+        if (year_from is None or b["year"] >= year_from) and (year_to is None or b["year"] <= year_to)
+    ]
+    if sort:
+        field = sort.lstrip("-")
+
+        def key(b):
+            value = b[field]
+            return (value.casefold() if isinstance(value, str) else value, b["id"])
+
+        rows.sort(key=key, reverse=sort.startswith("-"))
+    stop = None if limit is None else offset + limit
+    return rows[offset:stop]
+
+
+@pytest.fixture
+def make_books():
+    """Генератор каталогу: make_books(кількість, seed=0), id від 1"""
+    return generate_books
+
+
+@pytest.fixture
+def reference():
+    """Еталонний запит до каталогу: reference(catalog, year_from, year_to, sort, offset, limit)"""
+    return query_reference
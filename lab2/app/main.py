@@ -1,6 +1,12 @@
+import os
 import uvicorn
 from routes import app
 
-if __name__ == "__main__":
-    uvicorn.run(app, host="localhost", port=7000)
+# Кілька воркерів мають сенс з BOOKS_BACKEND=shared: каталог у них спільний
+WORKERS = int(os.environ.get("UVICORN_WORKERS", "1"))
 
+if __name__ == "__main__":
+    if WORKERS > 1:
+        uvicorn.run("routes:app", host="localhost", port=7000, workers=WORKERS)
+    else:
+        uvicorn.run(app, host="localhost", port=7000)
@@ -1,4 +1,15 @@
-books = [
+import os
+from store import BookStore, CatalogSnapshot
+
+# Каталог для знімка та логу; без нього книги живуть лише в пам'яті
+DATA_DIR = os.environ.get("BOOKS_DATA_DIR")
+# Представлення каталогу в пам'яті: dict (словники), columnar (колонки NumPy)
+# або shared (спільна пам'ять для всіх воркерів uvicorn)
+BACKEND = os.environ.get("BOOKS_BACKEND", "dict")
+# Ім'я сегмента спільної пам'яті для BACKEND=shared
+SHM_NAME = os.environ.get("BOOKS_SHM_NAME", "lab2_books")
+
+seed_books = [
     {"id": 1, "title": "The Hobbit", "author": "J.R.R. Tolkien", "year": 1937},
     {"id": 2, "title": "The Catcher in the Rye", "author": "J.D. Salinger", "year": 1951},
     {"id": 3, "title": "Pride and Prejudice", "author": "Jane Austen", "year": 1813},
@@ -10,3 +21,26 @@ books = [
     {"id": 9, "title": "Harry Potter and the Philosopher's Stone", "author": "J.K. Rowling", "year": 1997},
     {"id": 10, "title": "The Alchemist", "author": "Paulo Coelho", "year": 1988}
 ]
+
+if BACKEND == "columnar":
+    from columnar import ColumnarSnapshot
+    snapshot_cls = ColumnarSnapshot
+else:
+    snapshot_cls = CatalogSnapshot
+
+if BACKEND == "shared":
+    # Сегмент створює перший воркер, решта підключаються до наявного
+    from shared_store import SharedBookStore
+    books = SharedBookStore(SHM_NAME, seed_books)
+elif DATA_DIR:
+    from persistence import PersistentBookStore
+    books = PersistentBookStore(DATA_DIR, seed_books, snapshot_cls=snapshot_cls)
+else:
+    books = BookStore(seed_books, snapshot_cls=snapshot_cls)
+
+# TF-IDF індекс для GET /books/{id}/similar: будується при першому запиті,
+# далі оновлюється разом з каталогом.
+# У режимі shared індекс локальний для воркера і звіряється з версією сегмента,
+# щоб бачити записи інших воркерів
+from similarity import CatalogSimilarity
+similar_books = CatalogSimilarity(books, follow_store=BACKEND == "shared")
@@ -0,0 +1,244 @@
+import glob
+import logging
+import mmap
+import os
+import struct
+import threading
+
+from store import BookStore, CatalogSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Кількість записів у лозі, після якої запускається фонова компакція
+COMPACT_EVERY = int(os.environ.get("BOOKS_COMPACT_EVERY", "100000"))
+# fsync після кожного запису: переживає падіння ОС, але повільніше
+FSYNC = os.environ.get("BOOKS_FSYNC", "false").lower() == "true"
+
+OP_ADD = 1
+OP_DELETE = 2
+
+# op, id, year, довжина title, довжина author (далі йдуть UTF-8 байти рядків)
+RECORD_HEADER = struct.Struct("<BqiII")
+# magic, покоління логу після знімка, next_id, кількість книг
+SNAPSHOT_HEADER = struct.Struct("<4sQQQ")
+SNAPSHOT_MAGIC = b"BKS1"
+
+SNAPSHOT_FILE = "snapshot.bin"
+LOG_PATTERN = "log.*.bin"
+
+
+def encode_record(op, book):
+    """Кодує одну операцію у компактний бінарний запис"""
+    if op == OP_DELETE:
+        return RECORD_HEADER.pack(OP_DELETE, book["id"], 0, 0, 0)
+    title = book["title"].encode("utf-8")
+    author = book["author"].encode("utf-8")
+    return RECORD_HEADER.pack(OP_ADD, book["id"], book["year"], len(title), len(author)) + title + author
+
+
+def iter_records(buf, offset=0):
+    """
+    Декодує записи з буфера (bytes або mmap)
+
+    Yields:
+        tuple: (op, book, end_offset). Обрізаний запис у кінці (після
+        падіння під час запису) мовчки відкидається.
+    """
+    size = len(buf)
+    header_size = RECORD_HEADER.size
+    while offset + header_size <= size:
+        op, book_id, year, title_len, author_len = RECORD_HEADER.unpack_from(buf, offset)
+        end = offset + header_size + title_len + author_len
+        if op not in (OP_ADD, OP_DELETE) or end > size:
+            return
+        if op == OP_ADD:
+            title_end = offset + header_size + title_len
+            book = {
+                "id": book_id,
+                "title": str(buf[offset + header_size:title_end], "utf-8"),
+                "author": str(buf[title_end:end], "utf-8"),
+                "year": year,
+            }
+        else:
+            book = {"id": book_id}
+        yield op, book, end
+        offset = end
+
+
+def log_path(data_dir, generation):
+    return os.path.join(data_dir, f"log.{generation:08d}.bin")
+
+
+def log_generation(path):
+    return int(os.path.basename(path).split(".")[1])
+
+
+def read_snapshot(path):
+    """
+    Читає знімок через mmap
+
+    Returns:
+        tuple: (books: dict, generation: int, next_id: int) або None, якщо знімка немає
+    """
+    if not os.path.exists(path) or os.path.getsize(path) < SNAPSHOT_HEADER.size:
+        return None
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        magic, generation, next_id, count = SNAPSHOT_HEADER.unpack_from(mm, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"Пошкоджений знімок: {path}")
+        books = {book["id"]: book for _, book, _ in iter_records(mm, SNAPSHOT_HEADER.size)}
+    if len(books) != count:
+        raise ValueError(f"Знімок {path} неповний: {len(books)} з {count} книг")
+    return books, generation, next_id
+
+
+def replay_log(path, books):
+    """
+    Накочує лог на словник книг
+
+    Returns:
+        tuple: (кількість записів, найбільший id у лозі, довжина цілої частини файлу)
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return 0, 0, 0
+    count = max_id = valid = 0
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for op, book, valid in iter_records(mm):
+            if op == OP_ADD:
+                books[book["id"]] = book
+            else:
+                books.pop(book["id"], None)
+            max_id = max(max_id, book["id"])
+            count += 1
+    return count, max_id, valid
+
+
+def write_snapshot(data_dir, books, generation, next_id):
+    """Атомарно записує знімок: тимчасовий файл, fsync, os.replace"""
+    path = os.path.join(data_dir, SNAPSHOT_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb", buffering=1024 * 1024) as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, generation, next_id, len(books)))
+        for book in books:
+            f.write(encode_record(OP_ADD, book))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    # Логи старших поколінь уже увійшли до знімка
+    for old_log in glob.glob(os.path.join(data_dir, LOG_PATTERN)):
+        if log_generation(old_log) < generation:
+            os.remove(old_log)
+
+
+class PersistentBookStore(BookStore):
+    """
+    BookStore зі знімком та append-only логом на диску.
+
+    Кожне add/remove спершу дописується в лог поточного покоління. Коли в
+    лозі накопичується COMPACT_EVERY записів, лог перемикається на нове
+    покоління, а стан на момент перемикання записується у знімок фоновим
+    потоком. При старті знімок читається через mmap і на нього накочуються
+    логи поколінь, не старших за покоління знімка.
+    """
+
+    def __init__(self, data_dir, seed=None, compact_every=COMPACT_EVERY, fsync=FSYNC, snapshot_cls=CatalogSnapshot):
+        self.data_dir = data_dir
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._compaction = None
+        os.makedirs(data_dir, exist_ok=True)
+
+        snapshot = read_snapshot(os.path.join(data_dir, SNAPSHOT_FILE))
+        logs = sorted(glob.glob(os.path.join(data_dir, LOG_PATTERN)), key=log_generation)
+        if snapshot is None and not logs:
+            # Порожній каталог даних: стартуємо з початкових книг
+            super().__init__(seed, snapshot_cls=snapshot_cls)
+            self._generation = 1
+            write_snapshot(data_dir, self.snapshot(), self._generation, self.next_id)
+            self._log_records = 0
+        else:
+            books, self._generation, next_id = snapshot or ({}, 1, 1)
+            self._log_records = 0
+            for path in logs:
+                generation = log_generation(path)
+                if generation < self._generation:
+                    continue
+                count, max_id, valid = replay_log(path, books)
+                if valid < os.path.getsize(path):
+                    logger.warning(f"Обрізано пошкоджений хвіст логу {path}")
+                    os.truncate(path, valid)
+                self._log_records += count
+                self._generation = generation
+                next_id = max(next_id, max_id + 1)
+            # Id видалених книг не видаються повторно
+            super().__init__(books.values(), next_id, snapshot_cls)
+            logger.info(f"Відновлено {len(books)} книг, накочено {self._log_records} записів логу")
+
+        self._log = open(log_path(data_dir, self._generation), "ab")
+        if self._log_records >= self.compact_every:
+            self.compact()
+
+    def _append(self, op, book):
+        self._log.write(encode_record(op, book))
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+        self._log_records += 1
+
+    def add(self, book):
+        with self._lock:
+            if book.get("id") is None:
+                book = dict(book, id=self.next_id)
+            self._append(OP_ADD, book)
+            super().add(book)
+        if self._log_records >= self.compact_every:
+            self.compact()
+        return book
+
+    def remove(self, book_id):
+        with self._lock:
+            book = self.get(book_id)
+            if book is None:
+                return None
+            self._append(OP_DELETE, book)
+            super().remove(book_id)
+        if self._log_records >= self.compact_every:
+            self.compact()
+        return book
+
+    def compact(self, wait=False):
+        """
+        Перемикає лог на нове покоління і у фоні пише знімок
+
+        Під блокуванням береться лише незмінна версія каталогу: книги
+        (для ColumnarSnapshot - словники з колонок) будує фоновий потік.
+
+        Args:
+            wait: Дочекатися завершення запису знімка
+        """
+        with self._lock:
+            if self._compaction is not None and self._compaction.is_alive():
+                return
+            books = self.snapshot()
+            next_id = self.next_id
+            self._log.close()
+            self._generation += 1
+            self._log = open(log_path(self.data_dir, self._generation), "ab")
+            self._log_records = 0
+            self._compaction = threading.Thread(
+                target=write_snapshot,
+                args=(self.data_dir, books, self._generation, next_id),
+                daemon=True,
+            )
+            self._compaction.start()
+        if wait:
+            self._compaction.join()
+
+    def close(self):
+        """Дочікується фонової компакції та закриває лог"""
+        if self._compaction is not None:
+            self._compaction.join()
+        with self._lock:
+            self._log.close()
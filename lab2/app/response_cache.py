@@ -0,0 +1,68 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+# Скільки різних наборів параметрів GET /books тримати для однієї версії
+MAX_ENTRIES = 256
+
+
+def encode_json(content):
+    """Кодує так само, як JSONResponse у FastAPI"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class ResponseCache:
+    """
+    Кеш уже закодованих відповідей для поточної версії каталогу.
+
+    Ключ - параметри запиту, значення - (bytes, ETag). Каталог змінюється лише
+    через POST/DELETE, які збільшують версію сховища, тому при зміні версії
+    кеш просто очищається. ETag - хеш тіла, отже він сильний і лишається
+    коректним навіть після перезапуску процесу.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version, key, build):
+        """
+        Повертає (body, etag) з кешу або будує і кодує відповідь
+
+        Args:
+            version: Версія каталогу, з якої будується відповідь
+            key: Параметри запиту
+            build: Функція без аргументів, що повертає дані для кодування
+        """
+        with self._lock:
+            if self._version == version and key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        body = encode_json(build())
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+        with self._lock:
+            if self._version != version:
+                # Старші версії більше не потрібні; відповідь старішої версії не кешуємо
+                if self._version is not None and version < self._version:
+                    return body, etag
+                self._version = version
+                self._entries.clear()
+            self._entries[key] = (body, etag)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body, etag
+
+
+def etag_matches(if_none_match, etag):
+    """Порівняння If-None-Match з ETag (слабке, як вимагає RFC 9110 для GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
@@ -1,43 +1,78 @@
-from fastapi import FastAPI, HTTPException
-from typing import List
-from models import books
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from typing import List, Optional
+from models import books, similar_books
+from response_cache import ResponseCache, etag_matches
 from schemas import Book
+from store import StoreFullError
 
 app = FastAPI()
 
-def generate_book_id():
-    return max(book['id'] for book in books) + 1 if books else 1
+# Закодовані відповіді GET /books для поточної версії каталогу
+books_cache = ResponseCache()
+
+# Дозволені значення параметра sort, напр. "year" або "-author"
+SORT_PATTERN = r"^-?(id|year|author|title)$"
 
 @app.get('/')
 async def index():
     return "Головна сторінка"
 
 @app.get('/books', response_model=List[Book])
-async def get_books():
-    return books
+async def get_books(
+    request: Request,
+    year_from: Optional[int] = Query(None),
+    year_to: Optional[int] = Query(None),
+    sort: Optional[str] = Query(None, pattern=SORT_PATTERN),
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+):
+    # Книги в сховищі вже провалідовані при POST, тому віддаємо готові байти
+    # з кешу поточної версії замість повторної валідації та кодування
+    snapshot = books.snapshot()
+    body, etag = books_cache.get(
+        snapshot.version,
+        (year_from, year_to, sort, limit, offset),
+        # Фільтр та сортування обслуговуються відсортованими індексами сховища
+        lambda: snapshot.query(year_from=year_from, year_to=year_to, sort=sort, offset=offset, limit=limit),
+    )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 @app.get('/books/{book_id}', response_model=Book)
 async def get_book(book_id: int):
-    book = next((b for b in books if b['id'] == book_id), None)
+    book = books.get(book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Книга не знайдена")
     return book
 
+@app.get('/books/{book_id}/similar', response_model=List[Book])
+async def get_similar_books(book_id: int, k: int = Query(10, ge=1, le=100)):
+    matches = similar_books.similar(book_id, k)
+    if matches is None:
+        raise HTTPException(status_code=404, detail="Книга не знайдена")
+    found = (books.get(match_id) for _, match_id in matches)
+    return [book for book in found if book is not None]
+
 @app.post('/books', response_model=Book, status_code=201)
 async def add_book(book: Book):
-    # Генеруємо ID автоматично
-    book.id = generate_book_id()
-    books.append(book.model_dump())
-    return book
+    # ID генерується сховищем атомарно разом з додаванням
+    book.id = None
+    try:
+        created = books.add(book.model_dump())
+    except StoreFullError as err:
+        raise HTTPException(status_code=507, detail=str(err))
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    similar_books.add(created)
+    return created
 
 @app.delete('/books/{book_id}')
 async def delete_book(book_id: int):
-    global books
-    
-    book_to_delete = next((b for b in books if b['id'] == book_id), None)
-    
+    book_to_delete = books.remove(book_id)
+
     if not book_to_delete:
         raise HTTPException(status_code=404, detail="Книга не знайдена")
-    
-    books = [b for b in books if b['id'] != book_id]
-    return {"message": "Книга видалена"}
\ No newline at end of file
+    similar_books.remove(book_id)
+
+    return {"message": "Книга видалена"}
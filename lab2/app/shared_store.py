@@ -0,0 +1,300 @@
+import fcntl
+import os
+import tempfile
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from store import SORT_FIELDS, StoreFullError
+
+# Максимальна кількість записів у сегменті (задається при створенні)
+SHM_CAPACITY = int(os.environ.get("BOOKS_SHM_CAPACITY", "1000000"))
+
+TITLE_BYTES = 256
+AUTHOR_BYTES = 128
+# Довжина ключа сортування: перші байти casefold-рядка в UTF-8
+SORT_KEY_BYTES = 32
+
+LAYOUT_MAGIC = b"BKS2"
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S4"),
+    ("capacity", "<u8"),
+    ("count", "<u8"),
+    ("next_id", "<u8"),
+    ("version", "<u8"),
+    ("live", "<u8"),
+])
+
+RECORD_DTYPE = np.dtype([
+    ("id", "<i8"),
+    ("year", "<i4"),
+    ("deleted", "u1"),
+    ("title", f"S{TITLE_BYTES}"),
+    ("author", f"S{AUTHOR_BYTES}"),
+    ("title_key", f"S{SORT_KEY_BYTES}"),
+    ("author_key", f"S{SORT_KEY_BYTES}"),
+])
+
+# Частка нових записів, після якої порядок сортування будується заново
+REBUILD_RATIO = 0.05
+
+
+def sort_key(value, size=SORT_KEY_BYTES):
+    return value.casefold().encode("utf-8")[:size]
+
+
+def open_segment(name, size):
+    """Створює або підключає сегмент, не віддаючи його resource_tracker'у процесу"""
+    try:
+        try:
+            return shared_memory.SharedMemory(name=name, create=True, size=size, track=False), True
+        except TypeError:
+            segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+            created = True
+    except FileExistsError:
+        try:
+            return shared_memory.SharedMemory(name=name, track=False), False
+        except TypeError:
+            segment = shared_memory.SharedMemory(name=name)
+            created = False
+    # До Python 3.13 трекер видаляє сегмент, щойно завершується будь-який процес,
+    # що його відкрив; сегмент має жити, поки працює хоча б один воркер
+    resource_tracker.unregister(segment._name, "shared_memory")
+    return segment, created
+
+
+class SharedBookStore:
+    """
+    Каталог книг у сегменті multiprocessing.shared_memory.
+
+    Сегмент складається із заголовка та масиву записів фіксованого розміру
+    (RECORD_DTYPE). Нові книги лише дописуються в кінець, id зростають,
+    тому записи впорядковані за id; видалення ставить прапорець deleted.
+    Усі воркери дивляться на ті самі байти через NumPy без копіювання і
+    бачать записи одразу. Записи серіалізуються через flock на файлі
+    блокування (між процесами) та threading.Lock (між потоками).
+
+    Порядки сортування за year, title та author кожен воркер тримає у
+    себе (4 байти на книгу) і доповнює їх новими записами інкрементально.
+    Title та author сортуються за першими SORT_KEY_BYTES байтами casefold;
+    записи з однаковим повним (обрізаним) ключем порівнюються за всім
+    casefold-значенням, яке рахується лише для них.
+    """
+
+    def __init__(self, name, seed=None, capacity=SHM_CAPACITY, lock_path=None):
+        self.name = name
+        self._lock_path = lock_path or os.path.join(tempfile.gettempdir(), f"{name}.lock")
+        self._lock_file = open(self._lock_path, "a+b")
+        self._thread_lock = threading.Lock()
+        self._orders = {}
+
+        size = HEADER_DTYPE.itemsize + capacity * RECORD_DTYPE.itemsize
+        with self._write_lock():
+            self._segment, created = open_segment(name, size)
+            self._map()
+            if created:
+                self._header["magic"] = LAYOUT_MAGIC
+                self._header["capacity"] = capacity
+                self._header["next_id"] = 1
+                self._map()
+                for book in seed or []:
+                    self._append(book)
+            elif bytes(self._header["magic"]) != LAYOUT_MAGIC:
+                raise ValueError(f"Сегмент {name} має невідомий формат")
+
+    def _map(self):
+        buf = self._segment.buf
+        self._header = np.ndarray((), dtype=HEADER_DTYPE, buffer=buf)
+        capacity = int(self._header["capacity"])
+        self._records = np.ndarray((capacity,), dtype=RECORD_DTYPE, buffer=buf, offset=HEADER_DTYPE.itemsize)
+
+    @contextmanager
+    def _write_lock(self):
+        with self._thread_lock:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def close(self):
+        """Від'єднує сегмент від процесу (дані лишаються для інших воркерів)"""
+        self._header = self._records = None
+        self._orders = {}
+        self._segment.close()
+        self._lock_file.close()
+
+    def unlink(self):
+        """Видаляє сегмент з системи"""
+        if getattr(self._segment, "_track", True):
+            # До Python 3.13 unlink() знімає сегмент з трекера, тож повертаємо його туди
+            resource_tracker.register(self._segment._name, "shared_memory")
+        self._segment.unlink()
+        os.remove(self._lock_path)
+
+    # --- Інтерфейс знімка: сховище саме є своїм знімком ---
+
+    def snapshot(self):
+        return self
+
+    @property
+    def version(self):
+        return int(self._header["version"])
+
+    @property
+    def next_id(self):
+        return int(self._header["next_id"])
+
+    def __len__(self):
+        return int(self._header["live"])
+
+    def _view(self):
+        """Опубліковані записи: count читається до записів, тож вони вже повні"""
+        return self._records[:int(self._header["count"])]
+
+    def __iter__(self):
+        view = self._view()
+        return (self._row(view, p) for p in np.flatnonzero(view["deleted"] == 0).tolist())
+
+    @staticmethod
+    def _row(view, position):
+        record = view[position]
+        return {
+            "id": int(record["id"]),
+            "title": record["title"].decode("utf-8"),
+            "author": record["author"].decode("utf-8"),
+            "year": int(record["year"]),
+        }
+
+    def _position(self, view, book_id):
+        position = int(np.searchsorted(view["id"], book_id))
+        if position < len(view) and view["id"][position] == book_id and not view["deleted"][position]:
+            return position
+        return None
+
+    def live_ids(self):
+        """Id невидалених книг у порядку зростання"""
+        view = self._view()
+        return view["id"][view["deleted"] == 0]
+
+    def get(self, book_id):
+        view = self._view()
+        position = self._position(view, book_id)
+        return None if position is None else self._row(view, position)
+
+    # --- Запис ---
+
+    def _append(self, book):
+        count = int(self._header["count"])
+        if count >= len(self._records):
+            raise StoreFullError("Сховище заповнене")
+        title = book["title"].encode("utf-8")
+        author = book["author"].encode("utf-8")
+        if len(title) > TITLE_BYTES or len(author) > AUTHOR_BYTES:
+            raise ValueError(f"title до {TITLE_BYTES} байт, author до {AUTHOR_BYTES} байт у UTF-8")
+        book_id = book.get("id") or int(self._header["next_id"])
+        self._records[count] = (
+            book_id, book["year"], 0, title, author, sort_key(book["title"]), sort_key(book["author"]),
+        )
+        # Запис публікується збільшенням count уже після того, як він повністю записаний
+        self._header["next_id"] = max(int(self._header["next_id"]), book_id + 1)
+        self._header["live"] += 1
+        self._header["count"] = count + 1
+        self._header["version"] += 1
+        return dict(book, id=book_id)
+
+    def add(self, book):
+        """Дописує книгу в кінець сегмента. Книга без id отримує next_id"""
+        with self._write_lock():
+            if book.get("id") is not None and book["id"] < self.next_id:
+                raise ValueError("Id книг у спільному сховищі мають зростати")
+            return self._append(book)
+
+    def remove(self, book_id):
+        """Позначає книгу видаленою. Повертає видалену книгу або None"""
+        with self._write_lock():
+            view = self._view()
+            position = self._position(view, book_id)
+            if position is None:
+                return None
+            book = self._row(view, position)
+            view["deleted"][position] = 1
+            self._header["live"] -= 1
+            self._header["version"] += 1
+        return book
+
+    # --- Запити ---
+
+    def _order(self, view, field):
+        """
+        Позиції записів, відсортовані за (key, id), для поточної довжини view
+
+        Нові записи (їх позиції більші за всі наявні) вставляються в уже
+        відсортований масив бінарним пошуком; якщо нових записів багато,
+        порядок будується заново одним np.lexsort.
+        """
+        column = {"year": "year", "title": "title_key", "author": "author_key"}[field]
+        keys = view[column]
+        seen, order = self._orders.get(field, (0, np.empty(0, dtype=np.int32)))
+        count = len(view)
+        if count == seen:
+            return order
+
+        def key(p):
+            if field == "year" or len(keys[p]) < SORT_KEY_BYTES:
+                return keys[p], b"", p
+            # Ключ обрізаний: рівність префіксів вирішує повне значення
+            return keys[p], sort_key(view[field][p].decode("utf-8"), None), p
+
+        if count - seen > max(1, REBUILD_RATIO * seen):
+            order = np.lexsort((np.arange(count), keys)).astype(np.int32)
+            if field != "year":
+                order = self._break_ties(order, keys, key)
+        else:
+            new = sorted(range(seen, count), key=key)
+            points = [bisect_left(order, key(p), key=key) for p in new]
+            order = np.insert(order, points, new).astype(np.int32)
+        self._orders[field] = (count, order)
+        return order
+
+    @staticmethod
+    def _break_ties(order, keys, key):
+        """Пересортовує за key групи сусідніх записів з однаковим обрізаним ключем"""
+        ordered = keys[order]
+        tied = (ordered[1:] == ordered[:-1]) & (np.char.str_len(ordered[1:]) >= SORT_KEY_BYTES)
+        if not tied.any():
+            return order
+        order = order.copy()
+        # Межі груп: початок і кінець кожного суцільного відрізка tied
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], tied.view(np.int8), [0]]))).reshape(-1, 2)
+        for start, stop in edges.tolist():
+            order[start:stop + 1] = sorted(order[start:stop + 1].tolist(), key=key)
+        return order
+
+    def query(self, year_from=None, year_to=None, sort=None, offset=0, limit=None):
+        """Те саме, що CatalogSnapshot.query, векторно над спільними записами"""
+        descending = bool(sort) and sort.startswith("-")
+        field = sort.lstrip("-") if sort else "id"
+        if field not in SORT_FIELDS:
+            raise ValueError(f"Невідоме поле сортування: {field}")
+        stop = None if limit is None else offset + limit
+
+        view = self._view()
+        mask = view["deleted"] == 0
+        if year_from is not None:
+            mask &= view["year"] >= year_from
+        if year_to is not None:
+            mask &= view["year"] <= year_to
+
+        if field == "id":
+            positions = np.flatnonzero(mask)
+        else:
+            order = self._order(view, field)
+            positions = order[mask[order]]
+        if descending:
+            positions = positions[::-1]
+        return [self._row(view, p) for p in positions[offset:stop].tolist()]
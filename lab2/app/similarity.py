@@ -0,0 +1,317 @@
+import re
+import threading
+from array import array
+from collections import Counter
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Хвіст нових рядків, після якого колонковий (CSC) порядок будується наново
+REBUILD_RATIO = 0.1
+MIN_TAIL = 10_000
+
+
+def tokenize(book):
+    return TOKEN_RE.findall(f"{book['title']} {book['author']}".casefold())
+
+
+class GrowableArray:
+    """Масив NumPy з амортизованим подвоєнням місткості для дописування в кінець"""
+
+    def __init__(self, dtype, capacity=1024):
+        self._data = np.zeros(capacity, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        needed = self.size + len(values)
+        if needed > len(self._data):
+            grown = np.zeros(max(needed, 2 * len(self._data)), dtype=self._data.dtype)
+            grown[:self.size] = self._data[:self.size]
+            self._data = grown
+        self._data[self.size:needed] = values
+        self.size = needed
+
+    def view(self):
+        return self._data[:self.size]
+
+
+class SimilarityIndex:
+    """
+    Розріджена TF-IDF матриця книг за токенами title та author.
+
+    Матриця зберігається у форматі COO (row, col, tf), до якого нові книги
+    лише дописуються, а видалені позначаються маскою alive. Для запиту
+    потрібні стовпці лише токенів самої книги, тому основна частина матриці
+    додатково впорядковується за стовпцями (CSC); рядки, дописані після
+    цього, обробляються окремим хвостом, а CSC перебудовується, коли хвіст
+    виростає.
+
+    Частоти документів (df) оновлюються інкрементально. Оскільки
+    idf = L - l, де L = log(1 + N) + 1 спільне для всіх токенів, а
+    l = log(1 + df), квадрат норми рядка розкладається на
+    L^2 * A - 2L * B + C з A = sum(tf^2), B = sum(tf^2 * l), C = sum(tf^2 * l^2).
+    Після запису A, B, C виправляються лише для рядків зі списків токенів,
+    у яких змінився df, і для нових рядків, а не перераховуються по всій
+    матриці; повністю вони рахуються лише разом з перебудовою CSC.
+    """
+
+    def __init__(self, books=()):
+        self._lock = threading.Lock()
+        self._vocab = {}
+        self._df = GrowableArray(np.int64)
+        self._rows = GrowableArray(np.int32)
+        self._cols = GrowableArray(np.int32)
+        self._tf = GrowableArray(np.float32)
+        self._row_start = GrowableArray(np.int64)
+        self._row_ids = GrowableArray(np.int64)
+        self._alive = GrowableArray(np.bool_)
+        self._row_of = {}
+        self._version = 0
+        self._base = None
+        # (рядків, ненульових, base_nnz, A, B, C, l) на момент останнього оновлення норм
+        self._norm_parts = None
+        self._state = None
+        self.add_many(books)
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def ids(self):
+        """Id книг в індексі (без видалених)"""
+        with self._lock:
+            return self._row_ids.view()[self._alive.view()].copy()
+
+    def add(self, book):
+        self.add_many([book])
+
+    def add_many(self, books):
+        """Додає книги пакетом: токенізація в Python, дописування в масиви - векторно"""
+        with self._lock:
+            rows, cols, tf = array("i"), array("i"), array("f")
+            row_start, row_ids = array("q"), array("q")
+            row = self._row_ids.size
+            for book in books:
+                # Книга, яка вже є в індексі (напр. потрапила в лінивий збір), не дублюється
+                if book["id"] in self._row_of:
+                    continue
+                row_start.append(self._cols.size + len(cols))
+                row_ids.append(book["id"])
+                self._row_of[book["id"]] = row
+                for token, count in Counter(tokenize(book)).items():
+                    col = self._vocab.get(token)
+                    if col is None:
+                        col = self._vocab[token] = len(self._vocab)
+                    rows.append(row)
+                    cols.append(col)
+                    tf.append(count)
+                row += 1
+            self._df.extend(np.zeros(len(self._vocab) - self._df.size))
+            self._row_start.extend(row_start)
+            self._row_ids.extend(row_ids)
+            self._alive.extend(np.ones(len(row_ids), dtype=np.bool_))
+            self._rows.extend(rows)
+            self._cols.extend(cols)
+            self._tf.extend(tf)
+            self._df.view()[:] += np.bincount(np.asarray(cols, dtype=np.int64), minlength=self._df.size)
+            self._version += 1
+
+    def remove(self, book_id):
+        with self._lock:
+            row = self._row_of.pop(book_id, None)
+            if row is None:
+                return
+            self._alive.view()[row] = False
+            start, end = self._row_slice(row)
+            np.subtract.at(self._df.view(), self._cols.view()[start:end], 1)
+            self._version += 1
+
+    def _row_slice(self, row):
+        start = int(self._row_start.view()[row])
+        end = int(self._row_start.view()[row + 1]) if row + 1 < self._row_start.size else self._cols.size
+        return start, end
+
+    def _rebuild_base(self, nnz):
+        """Впорядковує перші nnz ненульових елементів за стовпцями"""
+        cols = self._cols.view()[:nnz]
+        order = np.argsort(cols, kind="stable")
+        col_ptr = np.searchsorted(cols[order], np.arange(len(self._vocab) + 1))
+        self._base = (nnz, self._rows.view()[:nnz][order], self._tf.view()[:nnz][order], col_ptr)
+
+    def _update_norm_parts(self):
+        """Доводить A, B, C до поточної версії (див. docstring класу)"""
+        rows, cols, tf = self._rows.view(), self._cols.view(), self._tf.view()
+        row_count, nnz = self._row_ids.size, self._cols.size
+        log_df = np.log1p(self._df.view())
+        tf2 = tf * tf
+        base_nnz, base_rows, base_tf, col_ptr = self._base
+        parts = self._norm_parts
+
+        if parts is None or parts[2] != base_nnz:
+            # Разом з перебудовою CSC: повний перерахунок, що скидає й накопичену похибку
+            weighted = tf2 * log_df[cols]
+            self._norm_parts = (
+                row_count, nnz, base_nnz,
+                np.bincount(rows, weights=tf2, minlength=row_count),
+                np.bincount(rows, weights=weighted, minlength=row_count),
+                np.bincount(rows, weights=weighted * log_df[cols], minlength=row_count),
+                log_df,
+            )
+            return
+
+        old_rows, old_nnz, _, a, b, c, old_log_df = parts
+        changed = np.flatnonzero(log_df[:len(old_log_df)] != old_log_df)
+        if len(changed):
+            # Входження змінених токенів у старих рядках: з CSC та з хвоста до old_nnz
+            counts = col_ptr[changed + 1] - col_ptr[changed]
+            positions = np.repeat(col_ptr[changed] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            tail = np.arange(base_nnz, old_nnz)
+            tail = tail[np.isin(cols[base_nnz:old_nnz], changed)]
+            hit_rows = np.concatenate([base_rows[positions], rows[tail]])
+            hit_tf2 = np.concatenate([base_tf[positions], tf[tail]]) ** 2
+            hit_cols = np.concatenate([np.repeat(changed, counts), cols[tail]])
+            delta = log_df[hit_cols] - old_log_df[hit_cols]
+            delta2 = log_df[hit_cols] ** 2 - old_log_df[hit_cols] ** 2
+            # Нові масиви замість змін на місці: читачі зі старим станом їх не бачать
+            b = b + np.bincount(hit_rows, weights=hit_tf2 * delta, minlength=old_rows)
+            c = c + np.bincount(hit_rows, weights=hit_tf2 * delta2, minlength=old_rows)
+
+        if row_count > old_rows:
+            new_rows = rows[old_nnz:nnz] - old_rows
+            weighted = tf2[old_nnz:nnz] * log_df[cols[old_nnz:nnz]]
+            new_count = row_count - old_rows
+            a = np.concatenate([a, np.bincount(new_rows, weights=tf2[old_nnz:nnz], minlength=new_count)])
+            b = np.concatenate([b, np.bincount(new_rows, weights=weighted, minlength=new_count)])
+            c = np.concatenate([c, np.bincount(
+                new_rows, weights=weighted * log_df[cols[old_nnz:nnz]], minlength=new_count)])
+        self._norm_parts = (row_count, nnz, base_nnz, a, b, c, log_df)
+
+    def _current_state(self):
+        """IDF, частини норм, CSC основної частини та перегляди масивів для поточної версії"""
+        with self._lock:
+            if self._state is not None and self._state[0] == self._version:
+                return self._state
+            nnz = self._cols.size
+            base_nnz = self._base[0] if self._base else 0
+            if self._base is None or nnz - base_nnz > max(MIN_TAIL, REBUILD_RATIO * base_nnz):
+                self._rebuild_base(nnz)
+            self._update_norm_parts()
+            big_l = np.log(1 + len(self._row_of)) + 1
+            idf = big_l - self._norm_parts[6]
+            self._state = (
+                self._version, idf, big_l, self._norm_parts[3:6], self._base,
+                self._rows.view(), self._cols.view(), self._tf.view(), self._row_ids.view(), self._alive.view(),
+            )
+            return self._state
+
+    def similar(self, book_id, k=10):
+        """
+        Повертає до k пар (score, book_id) найбільш схожих книг
+
+        Returns:
+            list або None, якщо книги немає в індексі
+        """
+        row = self._row_of.get(book_id)
+        if row is None:
+            return None
+        _, idf, big_l, (a, b, c), base, rows, cols, tf, row_ids, alive = self._current_state()
+        start, end = self._row_slice(row)
+        query = np.zeros(len(idf))
+        query[cols[start:end]] = tf[start:end] * idf[cols[start:end]]
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            return []
+
+        # Добуток матриці на вектор запиту: беремо лише стовпці токенів запиту
+        base_nnz, base_rows, base_tf, col_ptr = base
+        query_cols = cols[start:end]
+        query_cols = query_cols[query_cols < len(col_ptr) - 1]
+        parts = [np.arange(col_ptr[c], col_ptr[c + 1]) for c in query_cols]
+        positions = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+        hit_rows = base_rows[positions]
+        hit_cols = np.repeat(query_cols, [len(p) for p in parts]) if parts else np.empty(0, dtype=np.int64)
+        contributions = base_tf[positions] * idf[hit_cols] * query[hit_cols]
+
+        # Рядки, дописані після побудови CSC
+        tail_cols = cols[base_nnz:len(rows)]
+        in_query = query[tail_cols] != 0
+        hit_rows = np.concatenate([hit_rows, rows[base_nnz:len(rows)][in_query]])
+        tail_hits = tail_cols[in_query]
+        contributions = np.concatenate([contributions, tf[base_nnz:len(rows)][in_query] * idf[tail_hits] * query[tail_hits]])
+
+        # Скалярні добутки та норми рахуються лише для рядків-кандидатів
+        candidates, inverse = np.unique(hit_rows, return_inverse=True)
+        dots = np.bincount(inverse, weights=contributions, minlength=len(candidates))
+        keep = alive[candidates] & (candidates != row)
+        candidates, dots = candidates[keep], dots[keep]
+        if not len(candidates):
+            return []
+        norms = np.sqrt(np.maximum(big_l * big_l * a[candidates] - 2 * big_l * b[candidates] + c[candidates], 0))
+        scores = dots / (norms * query_norm)
+
+        k = min(k, int((scores > 0).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top_rows = candidates[top]
+        top = top[np.lexsort((row_ids[top_rows], -scores[top]))]
+        return [(round(float(scores[i]), 4), int(row_ids[candidates[i]])) for i in top]
+
+
+class CatalogSimilarity:
+    """
+    SimilarityIndex над сховищем, який будується лише при першому запиті
+
+    Поки GET /books/{id}/similar не викликали, індекс не займає пам'яті, а
+    add/remove нічого не роблять. Перший similar() будує індекс зі знімка
+    сховища, далі він оновлюється інкрементально разом з каталогом.
+
+    З follow_store=True (спільне сховище, куди пишуть інші воркери) індекс
+    перед запитом звіряється з версією сховища: якщо вона змінилась,
+    множина id сховища (store.live_ids()) порівнюється з id індексу, і
+    індекс дописує нові книги та прибирає видалені.
+    """
+
+    def __init__(self, store, follow_store=False):
+        self.store = store
+        self.follow_store = follow_store
+        self._index = None
+        self._synced_version = None
+        self._lock = threading.Lock()
+
+    @property
+    def built(self):
+        return self._index is not None
+
+    def _current(self):
+        with self._lock:
+            if self._index is None:
+                # Версія читається до знімка: записи, що потраплять у нього пізніше, не втратяться
+                self._synced_version = self.store.version if self.follow_store else None
+                self._index = SimilarityIndex(self.store.snapshot())
+            elif self.follow_store and self.store.version != self._synced_version:
+                self._sync()
+            return self._index
+
+    def _sync(self):
+        """Доводить індекс до поточного вмісту спільного сховища"""
+        self._synced_version = self.store.version
+        live, indexed = self.store.live_ids(), self._index.ids()
+        for book_id in np.setdiff1d(indexed, live).tolist():
+            self._index.remove(book_id)
+        added = (self.store.get(book_id) for book_id in np.setdiff1d(live, indexed).tolist())
+        self._index.add_many(book for book in added if book is not None)
+
+    def add(self, book):
+        with self._lock:
+            if self._index is not None:
+                self._index.add(book)
+
+    def remove(self, book_id):
+        with self._lock:
+            if self._index is not None:
+                self._index.remove(book_id)
+
+    def similar(self, book_id, k=10):
+        return self._current().similar(book_id, k)
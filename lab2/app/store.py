@@ -0,0 +1,305 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from itertools import accumulate, chain
+from operator import itemgetter
+
+# Поля, за якими можна сортувати GET /books ("-" перед назвою - спадання)
+SORT_FIELDS = ("id", "year", "author", "title")
+
+# Цільовий розмір фрагмента SortedChunks; фрагмент ділиться навпіл, коли
+# виростає вдвічі
+CHUNK_SIZE = 1024
+
+
+class StoreFullError(Exception):
+    """У сховищі фіксованої місткості не лишилося місця для нових записів"""
+
+
+def index_key(field, book):
+    value = book[field]
+    # Рядки сортуємо без урахування регістру
+    return value.casefold() if isinstance(value, str) else value
+
+
+class SortedChunks:
+    """
+    Незмінний відсортований список кортежів, поділений на фрагменти.
+
+    Вставка чи видалення повертає нову версію, яка копіює лише змінений
+    фрагмент (до 2 * CHUNK_SIZE елементів) та список посилань на фрагменти,
+    а решту фрагментів поділяє з попередньою версією. Запис коштує
+    O(CHUNK_SIZE + n / CHUNK_SIZE) замість O(n) для копії всього списку.
+    """
+
+    __slots__ = ("chunks", "maxes", "ends")
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        # Останній елемент кожного фрагмента та кумулятивні довжини для
+        # пошуку фрагмента за значенням і за позицією (обидва проходи - на рівні C)
+        self.maxes = list(map(itemgetter(-1), chunks))
+        self.ends = list(accumulate(map(len, chunks)))
+
+    @classmethod
+    def from_sorted(cls, items):
+        items = list(items)
+        return cls([items[i:i + CHUNK_SIZE] for i in range(0, len(items), CHUNK_SIZE)])
+
+    def __len__(self):
+        return self.ends[-1] if self.ends else 0
+
+    def __iter__(self):
+        return chain.from_iterable(self.chunks)
+
+    def _start(self, chunk_number):
+        return self.ends[chunk_number - 1] if chunk_number else 0
+
+    def bisect_left(self, item):
+        """Позиція першого елемента, не меншого за item"""
+        k = bisect_left(self.maxes, item)
+        if k == len(self.chunks):
+            return len(self)
+        return self._start(k) + bisect_left(self.chunks[k], item)
+
+    def find(self, key):
+        """Елемент, перше поле якого дорівнює key, або None"""
+        probe = (key,)
+        k = bisect_left(self.maxes, probe)
+        if k == len(self.chunks):
+            return None
+        chunk = self.chunks[k]
+        item = chunk[bisect_left(chunk, probe)]
+        return item if item[0] == key else None
+
+    def slice(self, start, stop):
+        """Елементи з позицій [start, stop) без проходу по попередніх фрагментах"""
+        stop = min(stop, len(self))
+        if start >= stop:
+            return []
+        k = bisect_right(self.ends, start)
+        offset = start - self._start(k)
+        result = []
+        need = stop - start
+        while len(result) < need:
+            chunk = self.chunks[k]
+            result.extend(chunk[offset:offset + need - len(result)])
+            k, offset = k + 1, 0
+        return result
+
+    def insert(self, item):
+        """Нова версія з доданим item"""
+        if not self.chunks:
+            return SortedChunks([[item]])
+        k = min(bisect_left(self.maxes, item), len(self.chunks) - 1)
+        chunk = list(self.chunks[k])
+        insort(chunk, item)
+        chunks = list(self.chunks)
+        if len(chunk) > 2 * CHUNK_SIZE:
+            chunks[k:k + 1] = [chunk[:CHUNK_SIZE], chunk[CHUNK_SIZE:]]
+        else:
+            chunks[k] = chunk
+        return SortedChunks(chunks)
+
+    def remove(self, item):
+        """Нова версія без item (item має бути в списку)"""
+        k = bisect_left(self.maxes, item)
+        chunk = self.chunks[k]
+        position = bisect_left(chunk, item)
+        chunks = list(self.chunks)
+        if len(chunk) > 1:
+            chunks[k] = chunk[:position] + chunk[position + 1:]
+        else:
+            del chunks[k]
+        return SortedChunks(chunks)
+
+
+class CatalogSnapshot:
+    """
+    Незмінна версія каталогу.
+
+    Книги зберігаються парами (id, book) у SortedChunks, впорядкованому за
+    id. Для year, author та title додатково є відсортовані SortedChunks
+    кортежів (key, id), тому запит за діапазоном років або відсортована
+    сторінка коштують O(log n + k) замість повного проходу по каталогу.
+    Нова версія після запису поділяє з попередньою всі незмінені фрагменти,
+    тож запис не копіює каталог. Після публікації знімок ніхто не змінює,
+    тож читати його можна з будь-якого потоку без блокувань.
+    """
+
+    __slots__ = ("books", "indexes", "next_id", "version")
+
+    def __init__(self, books, indexes, next_id):
+        self.books = books
+        self.indexes = indexes
+        self.next_id = next_id
+        # Номер версії, який присвоює BookStore при публікації
+        self.version = 0
+
+    @classmethod
+    def build(cls, books, next_id=None):
+        """Будує знімок з набору книг одним сортуванням на кожен індекс"""
+        by_id = {}
+        for book in books:
+            by_id[book["id"]] = book
+        values = by_id.values()
+        indexes = {
+            "year": SortedChunks.from_sorted(sorted([(book["year"], book["id"]) for book in values])),
+            "author": SortedChunks.from_sorted(sorted([(book["author"].casefold(), book["id"]) for book in values])),
+            "title": SortedChunks.from_sorted(sorted([(book["title"].casefold(), book["id"]) for book in values])),
+        }
+        max_id = max(by_id, default=0)
+        entries = SortedChunks.from_sorted((book_id, by_id[book_id]) for book_id in sorted(by_id))
+        return cls(entries, indexes, max(max_id + 1, next_id or 1))
+
+    def __len__(self):
+        return len(self.books)
+
+    def __iter__(self):
+        return (book for _, book in self.books)
+
+    def get(self, book_id):
+        entry = self.books.find(book_id)
+        return None if entry is None else entry[1]
+
+    def with_book(self, book):
+        """Нова версія знімка з доданою (або заміненою) книгою"""
+        current = self.get(book["id"])
+        snapshot = self if current is None else self.without_book(current)
+        indexes = {
+            field: index.insert((index_key(field, book), book["id"]))
+            for field, index in snapshot.indexes.items()
+        }
+        return CatalogSnapshot(
+            snapshot.books.insert((book["id"], book)), indexes, max(self.next_id, book["id"] + 1),
+        )
+
+    def without_book(self, book):
+        """Нова версія знімка без книги"""
+        indexes = {
+            field: index.remove((index_key(field, book), book["id"]))
+            for field, index in self.indexes.items()
+        }
+        return CatalogSnapshot(self.books.remove((book["id"],)), indexes, self.next_id)
+
+    def _year_bounds(self, year_from, year_to):
+        """Межі [lo, hi) діапазону років в індексі year"""
+        index = self.indexes["year"]
+        lo = 0 if year_from is None else index.bisect_left((year_from,))
+        hi = len(index) if year_to is None else index.bisect_left((year_to + 1,))
+        return lo, max(lo, hi)
+
+    def query(self, year_from=None, year_to=None, sort=None, offset=0, limit=None):
+        """
+        Повертає сторінку книг з фільтром за роками та сортуванням
+
+        Args:
+            year_from: Мінімальний рік (включно)
+            year_to: Максимальний рік (включно)
+            sort: Поле сортування з SORT_FIELDS, "-" на початку - спадання
+            offset: Скільки книг пропустити
+            limit: Максимальна кількість книг (None - без обмеження)
+
+        Returns:
+            list: Книги поточної сторінки
+        """
+        descending = bool(sort) and sort.startswith("-")
+        field = sort.lstrip("-") if sort else "id"
+        if field not in SORT_FIELDS:
+            raise ValueError(f"Невідоме поле сортування: {field}")
+        stop = None if limit is None else offset + limit
+
+        filtered = year_from is not None or year_to is not None
+        if filtered:
+            lo, hi = self._year_bounds(year_from, year_to)
+            if field != "year":
+                # Кандидати з діапазону років (k штук) сортуємо за потрібним ключем
+                entries = self.indexes["year"].slice(lo, hi)
+                if field == "id":
+                    ids = sorted((book_id for _, book_id in entries), reverse=descending)
+                else:
+                    ids = [book_id for _, book_id in sorted(
+                        ((index_key(field, self.get(book_id)), book_id) for _, book_id in entries),
+                        reverse=descending,
+                    )]
+                return [self.get(book_id) for book_id in ids[offset:stop]]
+        else:
+            lo, hi = 0, len(self.books)
+
+        # Сторінка береться прямо зі зрізу відсортованого індексу (для id - самих книг)
+        index = self.books if field == "id" else self.indexes[field]
+        if descending:
+            end = hi - offset
+            start = lo if stop is None else max(lo, hi - stop)
+            entries = index.slice(start, end)[::-1]
+        else:
+            start = lo + offset
+            end = hi if stop is None else min(hi, lo + stop)
+            entries = index.slice(start, end)
+        if field == "id":
+            return [book for _, book in entries]
+        return [self.get(book_id) for _, book_id in entries]
+
+
+class BookStore:
+    """
+    Конкурентне in-memory сховище книг з копіюванням при записі.
+
+    Читачі беруть поточний CatalogSnapshot одним читанням посилання і
+    працюють з ним без блокувань. Писачі під блокуванням будують наступну
+    версію знімка і атомарно підміняють посилання, тож читач ніколи не
+    бачить наполовину оновлений каталог.
+
+    snapshot_cls задає представлення каталогу: CatalogSnapshot (словники)
+    або columnar.ColumnarSnapshot (компактні колонки).
+    """
+
+    def __init__(self, books=None, next_id=None, snapshot_cls=CatalogSnapshot):
+        self._snapshot = snapshot_cls.build(books or [], next_id)
+        self._write_lock = threading.Lock()
+
+    def snapshot(self):
+        """Поточна незмінна версія каталогу"""
+        return self._snapshot
+
+    @property
+    def version(self):
+        """Лічильник версій, зростає з кожним записом"""
+        return self._snapshot.version
+
+    def _publish(self, snapshot):
+        snapshot.version = self._snapshot.version + 1
+        self._snapshot = snapshot
+
+    def __len__(self):
+        return len(self._snapshot)
+
+    def __iter__(self):
+        return iter(self._snapshot)
+
+    @property
+    def next_id(self):
+        """Id, який отримає наступна книга"""
+        return self._snapshot.next_id
+
+    def get(self, book_id):
+        return self._snapshot.get(book_id)
+
+    def query(self, *args, **kwargs):
+        return self._snapshot.query(*args, **kwargs)
+
+    def add(self, book):
+        """Публікує нову версію каталогу з доданою книгою. Книга без id отримує next_id"""
+        with self._write_lock:
+            if book.get("id") is None:
+                book = dict(book, id=self._snapshot.next_id)
+            self._publish(self._snapshot.with_book(book))
+        return book
+
+    def remove(self, book_id):
+        """Видаляє книгу за id. Повертає видалену книгу або None"""
+        with self._write_lock:
+            book = self._snapshot.get(book_id)
+            if book is None:
+                return None
+            self._publish(self._snapshot.without_book(book))
+        return book
@@ -0,0 +1,66 @@
+import os
+
+from columnar import ColumnarSnapshot
+from persistence import PersistentBookStore, SNAPSHOT_FILE, log_path
+
+SEED = [
+    {"id": 1, "title": "The Hobbit", "author": "J.R.R. Tolkien", "year": 1937},
+    {"id": 2, "title": "Crime and Punishment", "author": "Fyodor Dostoevsky", "year": 1866},
+]
+
+
+def reopen(store, **kwargs):
+    store.close()
+    return PersistentBookStore(store.data_dir, **kwargs)
+
+
+class TestPersistentBookStore:
+    """Тести для знімка та append-only логу"""
+
+    def test_fresh_dir_is_seeded(self, tmp_path):
+        store = PersistentBookStore(str(tmp_path), SEED)
+        assert os.path.exists(tmp_path / SNAPSHOT_FILE)
+        store = reopen(store)
+        assert list(store) == SEED
+
+    def test_log_replay(self, tmp_path):
+        store = PersistentBookStore(str(tmp_path), SEED)
+        store.add({"id": 3, "title": "Війна і мир", "author": "Лев Толстой", "year": 1869})
+        store.remove(3)
+        store.remove(1)
+        store = reopen(store)
+        assert [b["id"] for b in store] == [2]
+        # Id видаленої книги не видається повторно
+        assert store.next_id == 4
+        assert store.query(sort="title") == [SEED[1]]
+
+    def test_compaction(self, tmp_path):
+        store = PersistentBookStore(str(tmp_path), SEED, compact_every=3)
+        for i in range(3, 10):
+            store.add({"id": i, "title": f"Book {i}", "author": "Author", "year": 2000 + i})
+        store.compact(wait=True)
+        store.remove(5)
+        store = reopen(store)
+        assert [b["id"] for b in store] == [1, 2, 3, 4, 6, 7, 8, 9]
+        logs = [name for name in os.listdir(tmp_path) if name.startswith("log.")]
+        assert len(logs) == 1
+
+    def test_compaction_of_columnar_snapshot(self, tmp_path):
+        store = PersistentBookStore(str(tmp_path), SEED, compact_every=100, snapshot_cls=ColumnarSnapshot)
+        store.add({"id": 3, "title": "Dune", "author": "Frank Herbert", "year": 1965})
+        store.compact(wait=True)
+        store = reopen(store, snapshot_cls=ColumnarSnapshot)
+        assert [b["id"] for b in store] == [1, 2, 3]
+        assert store.get(3)["title"] == "Dune"
+
+    def test_torn_tail_is_dropped(self, tmp_path):
+        store = PersistentBookStore(str(tmp_path), SEED)
+        store.add({"id": 3, "title": "Dune", "author": "Frank Herbert", "year": 1965})
+        store.close()
+        with open(log_path(str(tmp_path), 1), "ab") as f:
+            f.write(b"\x01\x04\x00")
+        store = PersistentBookStore(str(tmp_path))
+        assert [b["id"] for b in store] == [1, 2, 3]
+        store.add({"id": store.next_id, "title": "Solaris", "author": "Stanislaw Lem", "year": 1961})
+        store = reopen(store)
+        assert [b["id"] for b in store] == [1, 2, 3, 4]
@@ -0,0 +1,68 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import routes
+from response_cache import ResponseCache, etag_matches
+from store import BookStore
+
+SEED = [
+    {"id": 1, "title": "The Hobbit", "author": "J.R.R. Tolkien", "year": 1937},
+    {"id": 2, "title": "Війна і мир", "author": "Лев Толстой", "year": 1869},
+]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(routes, "books", BookStore(SEED))
+    monkeypatch.setattr(routes, "books_cache", ResponseCache())
+    return TestClient(routes.app)
+
+
+class TestResponseCache:
+    """Тести для кешу закодованих відповідей GET /books"""
+
+    def test_build_called_once_per_version(self):
+        cache = ResponseCache()
+        calls = []
+
+        def build():
+            calls.append(1)
+            return SEED
+
+        first = cache.get(1, ("key",), build)
+        assert cache.get(1, ("key",), build) == first
+        assert len(calls) == 1
+        cache.get(2, ("key",), build)
+        assert len(calls) == 2
+
+    def test_etag_matches(self):
+        assert etag_matches('"abc"', '"abc"')
+        assert etag_matches('W/"abc", "def"', '"abc"')
+        assert etag_matches("*", '"abc"')
+        assert not etag_matches('"def"', '"abc"')
+        assert not etag_matches(None, '"abc"')
+
+
+class TestBooksEtag:
+    """Тести для ETag та 304 у GET /books"""
+
+    def test_body_and_not_modified(self, client):
+        response = client.get("/books")
+        assert response.json() == SEED
+        etag = response.headers["etag"]
+
+        cached = client.get("/books", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+
+    def test_etag_changes_after_write(self, client):
+        etag = client.get("/books").headers["etag"]
+        client.post("/books", json={"title": "Dune", "author": "Frank Herbert", "year": 1965})
+        response = client.get("/books", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert len(response.json()) == 3
+        assert response.headers["etag"] != etag
+
+    def test_params_are_part_of_key(self, client):
+        assert [b["id"] for b in client.get("/books", params={"sort": "year"}).json()] == [2, 1]
+        assert [b["id"] for b in client.get("/books", params={"limit": 1}).json()] == [1]
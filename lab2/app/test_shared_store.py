@@ -0,0 +1,119 @@
+import multiprocessing
+import uuid
+
+import pytest
+
+from shared_store import SORT_KEY_BYTES, SharedBookStore
+from similarity import CatalogSimilarity
+from store import StoreFullError
+
+
+@pytest.fixture
+def open_store():
+    """
+    Відкриває SharedBookStore на унікальному сегменті: open_store(seed, capacity=...)
+
+    Сегмент видаляється через уже відкритий дескриптор; повторне відкриття
+    за іменем у teardown створило б його наново.
+    """
+    name = f"test_books_{uuid.uuid4().hex[:8]}"
+    stores = []
+
+    def open_store(*args, **kwargs):
+        store = SharedBookStore(name, *args, **kwargs)
+        stores.append(store)
+        return store
+
+    yield open_store
+    if stores:
+        stores[0].unlink()
+    for store in stores:
+        store.close()
+
+
+def add_from_other_process(name, count):
+    store = SharedBookStore(name)
+    for i in range(count):
+        store.add({"title": f"Remote {i}", "author": "Worker", "year": 2000})
+    store.close()
+
+
+class TestSharedBookStore:
+    """Тести для каталогу в спільній пам'яті"""
+
+    def test_writes_visible_to_other_attachments(self, open_store, make_books):
+        first = open_store(make_books(3), capacity=10)
+        second = open_store()
+        added = first.add({"title": "Кобзар", "author": "Тарас Шевченко", "year": 1840})
+        assert second.get(added["id"]) == added
+        assert second.remove(1)["id"] == 1
+        assert first.get(1) is None
+        assert len(first) == len(second) == 3
+        assert first.version == second.version
+
+    @pytest.mark.parametrize("sort", [None, "-id", "year", "-year", "author", "-author", "title", "-title"])
+    @pytest.mark.parametrize("year_from,year_to", [(None, None), (1850, 1950)])
+    def test_query_matches_book_store(self, open_store, make_books, reference, sort, year_from, year_to):
+        catalog = make_books(120)
+        shared = open_store(catalog, capacity=200)
+        for book_id in range(1, 121, 5):
+            shared.remove(book_id)
+        catalog = [b for b in catalog if b["id"] % 5 != 1]
+        # Інкрементальне доповнення порядків сортування
+        shared.query(sort=sort)
+        for i in range(3):
+            catalog.append(shared.add({"title": f"Title {i}", "author": "Austen", "year": 1900}))
+        for offset, limit in [(0, None), (7, 10)]:
+            assert shared.query(year_from, year_to, sort, offset, limit) == \
+                reference(catalog, year_from, year_to, sort, offset, limit)
+
+    @pytest.mark.parametrize("sort", ["title", "-title", "author"])
+    def test_long_keys_with_common_prefix(self, open_store, reference, sort):
+        # Перші SORT_KEY_BYTES байтів однакові, порядок визначає решта рядка
+        prefix = "Ї" * SORT_KEY_BYTES
+        tails = ["b", "A", "c", "", "a", "B"]
+        catalog = [
+            {"id": i, "title": prefix + tail, "author": f"{prefix}{tails[-i]}", "year": 1900}
+            for i, tail in enumerate(tails, 1)
+        ]
+        catalog.append({"id": 7, "title": "Short", "author": "Ї", "year": 1900})
+        shared = open_store(catalog, capacity=20)
+        assert shared.query(sort=sort) == reference(catalog, sort=sort)
+        # Нові записи вставляються в готовий порядок бінарним пошуком з тим самим ключем
+        for i, tail in enumerate(["bb", "Ab", "", "zz"]):
+            catalog.append(shared.add({"title": prefix + tail, "author": prefix, "year": 1900 + i}))
+            assert shared.query(sort=sort) == reference(catalog, sort=sort)
+
+    def test_other_process(self, open_store):
+        store = open_store(capacity=100)
+        process = multiprocessing.get_context("spawn").Process(
+            target=add_from_other_process, args=(store.name, 5)
+        )
+        process.start()
+        process.join()
+        assert process.exitcode == 0
+        assert [b["title"] for b in store] == [f"Remote {i}" for i in range(5)]
+        assert store.next_id == 6
+
+    def test_capacity_and_field_limits(self, open_store):
+        store = open_store(capacity=1)
+        with pytest.raises(ValueError):
+            store.add({"title": "x" * 1000, "author": "A", "year": 1})
+        store.add({"title": "A", "author": "B", "year": 1})
+        with pytest.raises(StoreFullError):
+            store.add({"title": "C", "author": "D", "year": 2})
+
+    def test_similarity_follows_other_attachments(self, open_store, make_books):
+        books = make_books(40)
+        first = open_store(books[:30], capacity=100)
+        second = open_store()
+        similar = CatalogSimilarity(first, follow_store=True)
+        assert similar.similar(31) is None
+
+        # Записи іншого воркера: локальний індекс про них не знає
+        for book in books[30:]:
+            second.add(book)
+        second.remove(2)
+        expected = CatalogSimilarity(second).similar(31, 50)
+        assert similar.similar(31, 50) == expected
+        assert 2 not in [book_id for _, book_id in similar.similar(1, 50)]
@@ -0,0 +1,110 @@
+import math
+import random
+from collections import Counter
+
+import pytest
+
+import similarity
+from similarity import CatalogSimilarity, SimilarityIndex, tokenize
+from store import BookStore
+
+
+def cosine_reference(books, book_id, k):
+    """Попарна косинусна подібність у чистому Python"""
+    docs = {b["id"]: Counter(tokenize(b)) for b in books}
+    df = Counter(token for doc in docs.values() for token in doc)
+    idf = {t: math.log((1 + len(docs)) / (1 + n)) + 1 for t, n in df.items()}
+    vectors = {i: {t: c * idf[t] for t, c in doc.items()} for i, doc in docs.items()}
+    norm = {i: math.sqrt(sum(w * w for w in v.values())) for i, v in vectors.items()}
+    query = vectors[book_id]
+    scores = []
+    for i, vector in vectors.items():
+        if i == book_id:
+            continue
+        dot = sum(w * vector.get(t, 0) for t, w in query.items())
+        if dot > 0:
+            scores.append((-round(dot / (norm[i] * norm[book_id]), 4), i))
+    return [(-score, i) for score, i in sorted(scores)[:k]]
+
+
+class TestSimilarityIndex:
+    """Тести для TF-IDF індексу схожих книг"""
+
+    @pytest.mark.parametrize("min_tail", [0, 10_000])
+    def test_matches_reference(self, monkeypatch, min_tail, make_books):
+        monkeypatch.setattr(similarity, "MIN_TAIL", min_tail)
+        books = make_books(200)
+        index = SimilarityIndex(books[:150])
+        index.similar(1)
+        # Частина книг потрапляє в хвіст після побудови CSC
+        for book in books[150:]:
+            index.add(book)
+        for book_id in (1, 42, 180):
+            got = index.similar(book_id, 5)
+            expected = cosine_reference(books, book_id, 5)
+            assert [round(s, 3) for s, _ in got] == [round(s, 3) for s, _ in expected]
+
+    @pytest.mark.parametrize("min_tail", [0, 10_000])
+    def test_norms_follow_interleaved_writes(self, monkeypatch, min_tail, make_books):
+        # Запит після кожного запису: частини норм оновлюються інкрементально
+        monkeypatch.setattr(similarity, "MIN_TAIL", min_tail)
+        books = make_books(120)
+        live = books[:80]
+        index = SimilarityIndex(live)
+        rnd = random.Random(1)
+        for book in books[80:]:
+            index.add(book)
+            live.append(book)
+            if rnd.random() < 0.3:
+                removed = live.pop(rnd.randrange(1, len(live)))
+                index.remove(removed["id"])
+            got = index.similar(1, 5)
+            assert [round(s, 3) for s, _ in got] == [round(s, 3) for s, _ in cosine_reference(live, 1, 5)]
+
+    def test_removed_books_are_excluded(self, make_books):
+        books = make_books(50)
+        index = SimilarityIndex(books)
+        removed = [i for _, i in index.similar(1, 3)]
+        for book_id in removed:
+            index.remove(book_id)
+        remaining = [b for b in books if b["id"] not in removed]
+        assert not set(removed) & {i for _, i in index.similar(1, 50)}
+        assert [round(s, 3) for s, _ in index.similar(1, 5)] == [round(s, 3) for s, _ in cosine_reference(remaining, 1, 5)]
+        assert index.similar(removed[0]) is None
+
+    def test_no_overlap(self):
+        index = SimilarityIndex([
+            {"id": 1, "title": "Alpha", "author": "Beta", "year": 1},
+            {"id": 2, "title": "Gamma", "author": "Delta", "year": 1},
+        ])
+        assert index.similar(1) == []
+
+    def test_duplicate_add_is_ignored(self, make_books):
+        books = make_books(30)
+        index = SimilarityIndex(books)
+        index.add(books[0])
+        assert len(index) == 30
+        assert index.similar(1, 5) == SimilarityIndex(books).similar(1, 5)
+
+
+class TestCatalogSimilarity:
+    """Тести для лінивого індексу над сховищем"""
+
+    def test_built_on_first_query(self, make_books):
+        books = make_books(60)
+        store = BookStore(books[:50])
+        similar = CatalogSimilarity(store)
+        # До першого запиту записи в індекс не потрапляють і пам'ять не займають
+        store.add(books[50])
+        similar.add(books[50])
+        store.remove(2)
+        similar.remove(2)
+        assert not similar.built
+
+        remaining = [b for b in books[:51] if b["id"] != 2]
+        assert similar.similar(1, 5) == cosine_reference(remaining, 1, 5)
+        assert similar.built
+
+        for book in books[51:]:
+            similar.add(store.add(book))
+        assert similar.similar(55, 5) == cosine_reference(remaining + books[51:], 55, 5)
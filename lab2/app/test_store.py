@@ -0,0 +1,146 @@
+import random
+import threading
+
+import pytest
+
+import store as store_module
+from columnar import ColumnarSnapshot
+from store import BookStore, CatalogSnapshot, SortedChunks
+
+
+@pytest.fixture
+def catalog(make_books):
+    return make_books(300)
+
+
+@pytest.fixture(params=[CatalogSnapshot, ColumnarSnapshot], ids=["dict", "columnar"])
+def store(request, catalog):
+    return BookStore(catalog, snapshot_cls=request.param)
+
+
+class TestBookStoreQuery:
+    """Тести для запитів за відсортованими індексами"""
+
+    @pytest.mark.parametrize("sort", [None, "id", "-id", "year", "-year", "author", "-author", "title", "-title"])
+    @pytest.mark.parametrize("year_from,year_to", [(None, None), (1900, 1950), (None, 1850), (2000, None), (1990, 1980)])
+    @pytest.mark.parametrize("offset,limit", [(0, None), (5, 10), (290, 20)])
+    def test_matches_reference(self, store, catalog, reference, sort, year_from, year_to, offset, limit):
+        expected = reference(catalog, year_from, year_to, sort, offset, limit)
+        assert store.query(year_from, year_to, sort, offset, limit) == expected
+
+    def test_indexes_follow_add_and_remove(self, store, catalog, reference):
+        for book_id in range(1, 301, 3):
+            store.remove(book_id)
+        remaining = [b for b in catalog if (b["id"] - 1) % 3 != 0]
+        new_book = {"id": store.next_id, "title": "aaa", "author": "Zamyatin", "year": 1924}
+        store.add(new_book)
+        remaining.append(new_book)
+
+        assert store.query(sort="title", limit=1) == [new_book]
+        assert store.query(1924, 1924, sort="year") == reference(remaining, 1924, 1924, "year")
+        assert store.query(sort="-author") == reference(remaining, sort="-author")
+
+    def test_unknown_sort_field(self, store):
+        with pytest.raises(ValueError):
+            store.query(sort="isbn")
+
+    def test_iteration_and_lookup(self, store, catalog):
+        assert list(store) == catalog
+        assert store.get(17) == catalog[16]
+        assert store.get(1000) is None
+
+    @pytest.mark.parametrize("snapshot_cls", [CatalogSnapshot, ColumnarSnapshot], ids=["dict", "columnar"])
+    def test_empty_store(self, snapshot_cls):
+        store = BookStore(snapshot_cls=snapshot_cls)
+        assert store.query(1900, 2000, sort="title") == []
+        assert store.add({"title": "A", "author": "B", "year": 1950})["id"] == 1
+        assert store.query(sort="-year") == [store.get(1)]
+
+
+class TestBookStoreSnapshots:
+    """Тести для публікації незмінних знімків"""
+
+    def test_snapshot_is_not_affected_by_writes(self, store, catalog, reference):
+        before = store.snapshot()
+        store.remove(1)
+        added = store.add({"title": "New", "author": "Author", "year": 2001})
+        assert added["id"] == 301
+        assert len(before) == 300 and before.get(1) is not None and before.get(301) is None
+        assert before.query(sort="year") == reference(catalog, sort="year")
+        assert store.get(301) == added and store.get(1) is None
+
+    def test_concurrent_readers_see_consistent_versions(self, store):
+        errors = []
+        done = threading.Event()
+
+        def reader():
+            while not done.is_set():
+                snapshot = store.snapshot()
+                if any(len(index) != len(snapshot) for index in snapshot.indexes.values()):
+                    errors.append("індекс не узгоджений з каталогом")
+
+        def writer():
+            for i in range(200):
+                book = store.add({"title": f"T{i}", "author": "A", "year": 1900 + i})
+                if i % 2:
+                    store.remove(book["id"])
+
+        readers = [threading.Thread(target=reader) for _ in range(4)]
+        writers = [threading.Thread(target=writer) for _ in range(2)]
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        done.set()
+        for thread in readers:
+            thread.join()
+
+        assert not errors
+        assert len(store) == 500
+        assert len({b["id"] for b in store}) == 500
+
+
+class TestSortedChunks:
+    """Тести для фрагментованого незмінного списку (малий CHUNK_SIZE, щоб фрагменти ділились)"""
+
+    @pytest.fixture(autouse=True)
+    def small_chunks(self, monkeypatch):
+        monkeypatch.setattr(store_module, "CHUNK_SIZE", 4)
+
+    def test_matches_plain_list(self):
+        rnd = random.Random(3)
+        expected = sorted((value,) for value in rnd.sample(range(1000), 40))
+        chunks = SortedChunks.from_sorted(expected)
+        versions = [(chunks, list(expected))]
+        for _ in range(300):
+            if expected and rnd.random() < 0.4:
+                item = rnd.choice(expected)
+                expected.remove(item)
+                chunks = chunks.remove(item)
+            else:
+                item = (rnd.randrange(1000), rnd.random())
+                expected.append(item)
+                expected.sort()
+                chunks = chunks.insert(item)
+            versions.append((chunks, list(expected)))
+
+        # Кожна версія лишається незмінною після наступних записів
+        for chunks, expected in versions:
+            assert list(chunks) == expected and len(chunks) == len(expected)
+            assert chunks.slice(3, 17) == expected[3:17]
+            for probe in [(-1,), (500,), (999, 1.0), (2000,)]:
+                assert chunks.bisect_left(probe) == sum(item < probe for item in expected)
+
+    def test_store_with_many_chunks(self, catalog, reference):
+        store = BookStore(catalog)
+        for book_id in range(1, 301, 2):
+            store.remove(book_id)
+        remaining = [b for b in catalog if b["id"] % 2 == 0]
+        for i in range(50):
+            remaining.append(store.add({"title": f"T{i}", "author": "A", "year": 1900 + i}))
+
+        assert list(store) == remaining
+        assert store.get(2) == catalog[1] and store.get(3) is None
+        for sort in ["id", "-id", "year", "-title"]:
+            assert store.query(1900, 1960, sort, 3, 25) == reference(remaining, 1900, 1960, sort, 3, 25)
+            assert store.query(sort=sort, offset=7) == reference(remaining, sort=sort, offset=7)
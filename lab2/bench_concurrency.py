@@ -0,0 +1,99 @@
+"""
+Стрес-бенчмарк BookStore: читачі та писачі в окремих потоках.
+
+Для кожного розміру каталогу спочатку вимірюється пропускна здатність
+читання без записів, потім те саме під час безперервних записів, а також
+середня та максимальна тривалість одного запису. Запис не копіює каталог,
+тож його вартість (і час, на який він займає GIL та цикл подій
+async-обробника) не має рости з розміром каталогу. Кожен читач перевіряє,
+що знімок узгоджений (індекси мають стільки ж записів, скільки книг).
+
+Запуск: python bench_concurrency.py [книг,...] [читачів] [записів/с]
+"""
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from store import BookStore
+
+PHASE_SECONDS = 3.0
+DEFAULT_SIZES = [10_000, 100_000, 500_000]
+
+
+def make_book(book_id, rnd):
+    return {
+        "id": book_id,
+        "title": f"Book title number {book_id}",
+        "author": f"Author {rnd.randint(1, 5_000)}",
+        "year": rnd.randint(1500, 2024),
+    }
+
+
+def reader(store, stop, counter, errors):
+    rnd = random.Random()
+    reads = 0
+    while not stop.is_set():
+        snapshot = store.snapshot()
+        year = rnd.randint(1500, 2024)
+        snapshot.query(year_from=year, year_to=year + 5, sort="year", limit=20)
+        snapshot.get(rnd.randint(1, len(snapshot) or 1))
+        if any(len(index) != len(snapshot) for index in snapshot.indexes.values()):
+            errors.append("неузгоджений знімок")
+        reads += 1
+    counter.append(reads)
+
+
+def writer(store, stop, rate, latencies):
+    rnd = random.Random(1)
+    # Кожна ітерація - два записи: додавання та видалення
+    interval = 2.0 / rate if rate else 0
+    while not stop.is_set():
+        started = time.perf_counter()
+        book = store.add({"title": "New book", "author": "Writer", "year": rnd.randint(1500, 2024)})
+        added = time.perf_counter()
+        store.remove(book["id"])
+        latencies.extend((added - started, time.perf_counter() - added))
+        if interval:
+            time.sleep(interval)
+
+
+def run_phase(store, readers, write_rate):
+    stop = threading.Event()
+    reads, writes, errors = [], [], []
+    threads = [threading.Thread(target=reader, args=(store, stop, reads, errors)) for _ in range(readers)]
+    if write_rate is not None:
+        threads.append(threading.Thread(target=writer, args=(store, stop, write_rate, writes)))
+    for thread in threads:
+        thread.start()
+    time.sleep(PHASE_SECONDS)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(reads) / PHASE_SECONDS, writes, errors
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1].split(",")] if len(sys.argv) > 1 else DEFAULT_SIZES
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    write_rate = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+    print(f"читачів: {readers}, цільова частота записів: {write_rate}/с")
+    print(f"{'книг':>8} {'фаза':<16} {'читань/с':>10} {'записів/с':>10} "
+          f"{'запис, мс':>10} {'макс, мс':>9} {'помилок':>8}")
+    for size in sizes:
+        rnd = random.Random(42)
+        store = BookStore([make_book(i, rnd) for i in range(1, size + 1)])
+        for name, rate in (("лише читання", None), ("читання+запис", write_rate)):
+            read_rps, writes, errors = run_phase(store, readers, rate)
+            mean_ms = sum(writes) / len(writes) * 1000 if writes else 0
+            max_ms = max(writes, default=0) * 1000
+            print(f"{size:>8} {name:<16} {read_rps:>10.0f} {len(writes) / PHASE_SECONDS:>10.0f} "
+                  f"{mean_ms:>10.3f} {max_ms:>9.2f} {len(errors):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Бенчмарк пам'яті: список словників проти BookStore з CatalogSnapshot та
+ColumnarSnapshot.
+
+Пам'ять рахується через tracemalloc (NumPy теж звітує свої алокації), книги
+генеруються ліниво, тож у вимір потрапляє лише саме представлення каталогу.
+Окремо (без tracemalloc) міряється медіана часу додавання однієї книги:
+ColumnarSnapshot копіює всі колонки та індекси на кожен запис, тож цей час
+росте лінійно з розміром каталогу.
+
+Запуск: python bench_memory.py [розмір ...]
+"""
+import gc
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from columnar import ColumnarSnapshot
+from store import BookStore, CatalogSnapshot
+
+DEFAULT_SIZES = [100_000, 1_000_000]
+# Скільки книг додається для виміру часу запису
+WRITES = 20
+
+
+def generate_books(size, seed=42):
+    rnd = random.Random(seed)
+    for book_id in range(1, size + 1):
+        yield {
+            "id": book_id,
+            "title": f"Book title number {book_id}",
+            "author": f"Author {rnd.randint(1, 50_000)}",
+            "year": rnd.randint(1500, 2024),
+        }
+
+
+NEW_BOOK = {"title": "New book", "author": "Author 1", "year": 2000}
+
+BACKENDS = {
+    "список словників": lambda size: list(generate_books(size)),
+    "BookStore/dict": lambda size: BookStore(generate_books(size), snapshot_cls=CatalogSnapshot),
+    "BookStore/columnar": lambda size: BookStore(generate_books(size), snapshot_cls=ColumnarSnapshot),
+}
+
+
+def measure(factory, size):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    catalog = factory(size)
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    write_ms = measure_writes(catalog, size)
+    del catalog
+    return current, peak, elapsed, write_ms
+
+
+def measure_writes(catalog, size):
+    """Медіана часу додавання однієї книги, мс"""
+    timings = []
+    for book_id in range(size + 1, size + 1 + WRITES):
+        started = time.perf_counter()
+        if isinstance(catalog, list):
+            catalog.append(dict(NEW_BOOK, id=book_id))
+        else:
+            catalog.add(NEW_BOOK)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    print(f"{'книг':>10} {'представлення':<20} {'МБ':>8} {'пік, МБ':>8} {'Б/книгу':>8} {'побудова, с':>12} "
+          f"{'запис, мс':>10}")
+    for size in sizes:
+        for name, factory in BACKENDS.items():
+            current, peak, elapsed, write_ms = measure(factory, size)
+            print(f"{size:>10} {name:<20} {current / 2**20:>8.1f} {peak / 2**20:>8.1f} "
+                  f"{current / size:>8.0f} {elapsed:>12.2f} {write_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
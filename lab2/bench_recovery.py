@@ -0,0 +1,61 @@
+"""
+Бенчмарк часу відновлення PersistentBookStore залежно від розміру каталогу.
+
+Для кожного розміру створюється знімок та хвіст логу (10% операцій після
+знімка), після чого вимірюється час відкриття сховища.
+
+Запуск: python bench_recovery.py [розмір ...]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from persistence import PersistentBookStore, write_snapshot, encode_record, log_path, OP_ADD, OP_DELETE
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def make_book(book_id, rnd):
+    return {
+        "id": book_id,
+        "title": f"Book title number {book_id}",
+        "author": f"Author {rnd.randint(1, 50_000)}",
+        "year": rnd.randint(1500, 2024),
+    }
+
+
+def prepare(data_dir, size, rnd):
+    books = [make_book(i, rnd) for i in range(1, size + 1)]
+    write_snapshot(data_dir, books, 1, size + 1)
+    tail = size // 10
+    with open(log_path(data_dir, 1), "wb") as log:
+        for i in range(tail):
+            if i % 4 == 0:
+                log.write(encode_record(OP_DELETE, {"id": rnd.randint(1, size)}))
+            else:
+                log.write(encode_record(OP_ADD, make_book(size + i + 1, rnd)))
+    return tail
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    rnd = random.Random(42)
+    print(f"{'книг':>10} {'записів логу':>14} {'знімок, МБ':>11} {'відновлення, с':>15}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            tail = prepare(data_dir, size, rnd)
+            snapshot_mb = os.path.getsize(os.path.join(data_dir, "snapshot.bin")) / 2**20
+            started = time.perf_counter()
+            # compact_every більший за хвіст, щоб не змішувати відновлення з компакцією
+            store = PersistentBookStore(data_dir, compact_every=tail + 1)
+            elapsed = time.perf_counter() - started
+            store.close()
+            print(f"{size:>10} {tail:>14} {snapshot_mb:>11.1f} {elapsed:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
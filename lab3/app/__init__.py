@@ -1,23 +1,67 @@
 import os
 from flask import Flask
 from app.database import db
+from app.replicas import init_replicas
+from app.cache import init_cache
+from app.instrumentation import init_instrumentation
 
-def create_app():
-    app = Flask(__name__)
-    
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+def load_config():
+    """
+    Налаштування з оточення, спільні для Flask-застосунку та async-варіанту
+
+    Returns:
+        dict у форматі app.config
+    """
+    config = {}
+    config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
         'DATABASE_URL',
-        'postgresql://postgres:postgres@db:5432/bookdb'
+        'postgresql+psycopg2://postgres:postgres@db:5432/bookdb'
     )
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Скільки рядків bulk INSERT ... RETURNING відправляється одним оператором
+    # (3 параметри на книгу, тож 10000 рядків вкладаються в ліміт 65535 параметрів)
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = {'insertmanyvalues_page_size': 10000}
+    # Таблиця-лічильник з тригерами для точного meta.total за O(1)
+    config['BOOKS_COUNTER'] = os.environ.get('BOOKS_COUNTER', '0') == '1'
+    # Репліки для read-only маршрутів (через кому); DATABASE_URL лишається primary для записів
+    config['DATABASE_REPLICA_URLS'] = [
+        url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()
+    ]
+    # Як часто перевіряти відтворений WAL та відставання кожної репліки, секунд
+    config['REPLICA_CHECK_SECONDS'] = float(os.environ.get('REPLICA_CHECK_SECONDS', '1'))
+    # Репліка, що відстає від primary більше, не отримує запитів, секунд
+    config['REPLICA_MAX_LAG_SECONDS'] = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', '5'))
+    # Скільки секунд недоступна репліка не отримує запитів
+    config['REPLICA_RETRY_SECONDS'] = float(os.environ.get('REPLICA_RETRY_SECONDS', '30'))
+    # Кеш відповідей GET /books та GET /books/<id>: записів у LRU процесу (за замовчуванням
+    # вимкнено: migrate.py тоді ставить тригер версій, на якому серіалізуються записи в books),
+    # TTL у секундах і необов'язковий спільний рівень у Redis
+    config['RESULT_CACHE_SIZE'] = int(os.environ.get('RESULT_CACHE_SIZE', '0'))
+    config['RESULT_CACHE_TTL'] = float(os.environ.get('RESULT_CACHE_TTL', '60'))
+    config['RESULT_CACHE_REDIS_URL'] = os.environ.get('RESULT_CACHE_REDIS_URL')
+    # Запити, довші за SQL_SLOW_QUERY_MS, пишуться в журнал повільних запитів (з EXPLAIN, якщо SQL_EXPLAIN;
+    # план будується з фактичними параметрами і може містити їхні значення)
+    config['SQL_SLOW_QUERY_MS'] = float(os.environ.get('SQL_SLOW_QUERY_MS', '200'))
+    config['SQL_EXPLAIN'] = os.environ.get('SQL_EXPLAIN', '1') == '1'
+    # Заголовки X-SQL-* і поза debug-режимом
+    config['SQL_DEBUG_HEADERS'] = os.environ.get('SQL_DEBUG_HEADERS', '0') == '1'
+    # GET /sql/stats (тексти, час і плани запитів) - лише за явного увімкнення
+    config['SQL_STATS_ENDPOINT'] = os.environ.get('SQL_STATS_ENDPOINT', '0') == '1'
+    return config
+
+
+def create_app():
+    app = Flask(__name__)
+    app.config.update(load_config())
     
-   
     db.init_app(app)
+    init_replicas(app, app.config['DATABASE_REPLICA_URLS'])
+    init_cache(app)
+    init_instrumentation(app)
     
     from app.routes import register_routes
     register_routes(app)
     
-    with app.app_context():
-        db.create_all()
+    # Схема (таблиці, індекси, лічильник) створюється окремим кроком: python migrate.py
     
     return app
@@ -0,0 +1,44 @@
+import os
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import load_config
+from app.replicas import ReplicaRouter
+
+# Спільний пул з'єднань процесу: усі корутини беруть з'єднання з нього
+POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '20'))
+MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '10'))
+# Скільки підготовлених операторів asyncpg тримає на кожному з'єднанні
+STATEMENT_CACHE_SIZE = int(os.environ.get('DB_STATEMENT_CACHE_SIZE', '500'))
+
+# Ті самі налаштування оточення, що й у sync-застосунку (DATABASE_URL, репліки, кеш, SQL_*)
+config = load_config()
+
+ENGINE_OPTIONS = {
+    'pool_size': POOL_SIZE,
+    'max_overflow': MAX_OVERFLOW,
+    'connect_args': {'prepared_statement_cache_size': STATEMENT_CACHE_SIZE},
+    # Той самий розмір пакета bulk INSERT ... RETURNING, що й у sync-застосунку
+    'insertmanyvalues_page_size': 10000,
+}
+
+
+def async_database_url(url):
+    """Та сама адреса бази, що й у sync-застосунку, але з драйвером asyncpg"""
+    return make_url(url).set(drivername='postgresql+asyncpg')
+
+
+def create_engine(url, **options):
+    return create_async_engine(async_database_url(url), **options)
+
+
+engine = create_engine(config['SQLALCHEMY_DATABASE_URI'], **ENGINE_OPTIONS)
+
+async_session = async_sessionmaker(engine, expire_on_commit=False)
+
+# Репліки для read-only маршрутів (DATABASE_REPLICA_URLS); кожна має власний пул
+replicas = ReplicaRouter(
+    config['DATABASE_REPLICA_URLS'], ENGINE_OPTIONS, config['REPLICA_RETRY_SECONDS'],
+    config['REPLICA_CHECK_SECONDS'], config['REPLICA_MAX_LAG_SECONDS'], create=create_engine,
+) if config['DATABASE_REPLICA_URLS'] else None
@@ -0,0 +1,294 @@
+import logging
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+from marshmallow import ValidationError
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import DBAPIError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+
+from app.async_database import async_session, config, engine, replicas
+from app.cache import MISSING, build_cache, cache_key, table_version
+from app.counting import COUNT_MODES, count_books
+from app.instrumentation import RequestSql, SqlStats, current_sql, listen_engine_events, sql_headers
+from app.pagination import BOOK_COLUMNS, offset_page_statement
+from app.models import Book
+from app.replicas import LAST_WRITE_COOKIE, LAST_WRITE_HEADER, REPLICA_STATUS_SQL, WRITE_LSN_SQL, last_write_lsn
+from app.schemas import book_schema, books_schema, book_updates_schema, bulk_delete_schema
+from app.bulk import bulk_update, bulk_delete, summarize
+
+# Асинхронний варіант API lab3: ті самі маршрути, формат відповідей, репліки,
+# кеш результатів та статистика SQL, що й у Flask-застосунку (app/routes.py),
+# але на asyncio + asyncpg
+app = FastAPI()
+
+BOOKS_COUNTER = config['BOOKS_COUNTER']
+READ_ONLY_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+result_cache = build_cache(config)
+sql_stats = SqlStats()
+logger = logging.getLogger(__name__)
+listen_engine_events()
+
+
+class RequestTracking:
+    """
+    ASGI-middleware: статистика SQL запиту (як init_instrumentation) та
+    LSN останнього запису для read-your-writes (як init_replicas)
+
+    Чисте ASGI замість @app.middleware: маршрут виконується в тій самій
+    задачі, тож current_sql, встановлений тут, бачать усі його запити.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        def endpoint():
+            # Маршрутизатор дописує route у той самий scope
+            route = scope.get('route')
+            return route.name if route is not None else scope['path']
+
+        sql = RequestSql(sql_stats, endpoint, config, logger)
+        token = current_sql.set(sql)
+
+        async def send_with_headers(message):
+            if message['type'] == 'http.response.start':
+                sql_stats.add_request(endpoint(), sql)
+                headers = MutableHeaders(scope=message)
+                if config['SQL_DEBUG_HEADERS']:
+                    headers.update(sql_headers(sql))
+                if replicas is not None and scope['method'] not in READ_ONLY_METHODS and message['status'] < 400:
+                    async with engine.connect() as conn:
+                        lsn = str(await conn.scalar(WRITE_LSN_SQL))
+                    headers[LAST_WRITE_HEADER] = lsn
+                    headers.append('set-cookie', f"{LAST_WRITE_COOKIE}={lsn}; HttpOnly; Path=/")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            current_sql.reset(token)
+
+
+app.add_middleware(RequestTracking)
+
+
+@app.on_event("shutdown")
+async def close_pool():
+    await engine.dispose()
+    for replica in replicas.engines if replicas is not None else []:
+        await replica.dispose()
+
+
+async def cache_call(method, *args):
+    """Виклик кешу; з Redis - у пулі потоків, щоб мережа не блокувала цикл подій"""
+    if result_cache.remote is None:
+        return method(*args)
+    return await run_in_threadpool(method, *args)
+
+
+async def cached(request, session, view):
+    """Те саме, що @cached у Flask-застосунку: ключ з версією таблиці books"""
+    if result_cache is None:
+        return await view(session)
+
+    version = await session.run_sync(table_version)
+    if version is None:
+        return await view(session)
+    key = cache_key(request.scope['route'].name, request.path_params.items(), request.query_params.multi_items(), version)
+    body = await cache_call(result_cache.get, key)
+    if body is not MISSING:
+        return Response(body, media_type='application/json', headers={'X-Cache': 'HIT'})
+
+    response = await view(session)
+    if response.status_code == 200:
+        await cache_call(result_cache.set, key, response.body)
+    response.headers['X-Cache'] = 'MISS'
+    return response
+
+
+async def check_replicas():
+    """Те саме, що replicas.check_replicas, на async-engine"""
+    for replica in replicas.due_checks():
+        try:
+            async with replica.connect() as conn:
+                replicas.record(replica, *(await conn.execute(REPLICA_STATUS_SQL)).one())
+        except (DBAPIError, OSError):
+            replicas.mark_down(replica)
+            await replica.dispose()
+
+
+async def read(request, view):
+    """
+    Виконує read-only маршрут view(session) як @read_only + @cached
+
+    Після власного запису клієнт читає лише з реплік, що відтворили його
+    LSN, інакше з primary. Якщо репліка недоступна, вона виключається на
+    REPLICA_RETRY_SECONDS, а маршрут виконується ще раз на primary.
+    """
+    replica = None
+    if replicas is not None:
+        await check_replicas()
+        replica = replicas.choose(last_write_lsn(request.headers, request.cookies))
+    if replica is not None:
+        try:
+            async with async_session(bind=replica) as session:
+                return await cached(request, session, view)
+        except (DBAPIError, OSError):
+            replicas.mark_down(replica)
+            # З'єднання до впалої репліки в пулі вже непридатні
+            await replica.dispose()
+    async with async_session() as session:
+        return await cached(request, session, view)
+
+
+async def read_json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+@app.get("/")
+async def index():
+    return Response("Головна сторінка API бібліотеки", media_type="text/html")
+
+
+@app.get("/books")
+async def get_books(request: Request, offset: int = 0, limit: int = 10, count: str = None):
+    if limit > 100:
+        limit = 100
+
+    count_mode = count or 'exact'
+    if count_mode not in COUNT_MODES:
+        return JSONResponse({"error": f"count має бути одним з: {', '.join(COUNT_MODES)}"}, status_code=400)
+
+    async def page(session):
+        # count_books написаний для sync-сесії; run_sync виконує його на тому ж з'єднанні
+        total_books = await session.run_sync(count_books, count_mode, BOOKS_COUNTER)
+        books = (await session.execute(offset_page_statement(offset, limit))).all()
+        return JSONResponse({
+            'data': books_schema.dump(books),
+            'meta': {
+                'total': total_books,
+                'count': count_mode,
+                'offset': offset,
+                'limit': limit
+            }
+        })
+
+    return await read(request, page)
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    if result_cache is None:
+        return JSONResponse({"error": "Кеш результатів вимкнено (RESULT_CACHE_SIZE=0)"}, status_code=404)
+    return JSONResponse(result_cache.stats())
+
+
+if config['SQL_STATS_ENDPOINT']:
+    @app.get("/sql/stats")
+    async def get_sql_stats():
+        return JSONResponse(sql_stats.report())
+
+
+@app.get("/books/{book_id}")
+async def get_book(request: Request, book_id: int):
+    async def book(session):
+        row = (await session.execute(select(*BOOK_COLUMNS).where(Book.id == book_id))).first()
+        if not row:
+            return JSONResponse({"error": "Книга не знайдена"}, status_code=404)
+        return JSONResponse(book_schema.dump(row))
+
+    return await read(request, book)
+
+
+@app.post("/books")
+async def add_books_bulk(request: Request):
+    try:
+        books_data = books_schema.load(await read_json(request))
+    except ValidationError as err:
+        return JSONResponse(err.messages, status_code=400)
+
+    if not books_data:
+        return JSONResponse([], status_code=201)
+
+    statement = insert(Book).returning(*BOOK_COLUMNS, sort_by_parameter_order=True)
+    async with async_session() as session:
+        rows = (await session.execute(statement, books_data)).all()
+        await session.commit()
+
+    return JSONResponse(books_schema.dump(rows), status_code=201)
+
+
+@app.post("/books/bulk-update")
+async def bulk_update_books(request: Request):
+    try:
+        items = book_updates_schema.load(await read_json(request))
+    except ValidationError as err:
+        return JSONResponse(err.messages, status_code=400)
+
+    ids = [item['id'] for item in items]
+    if len(set(ids)) != len(ids):
+        return JSONResponse({"error": "id у запиті мають бути унікальними"}, status_code=400)
+
+    async with async_session() as session:
+        results = await session.run_sync(bulk_update, items)
+        await session.commit()
+
+    return JSONResponse(summarize(results))
+
+
+@app.delete("/books")
+async def delete_books_bulk(request: Request):
+    try:
+        target = bulk_delete_schema.load(await read_json(request))
+    except ValidationError as err:
+        return JSONResponse(err.messages, status_code=400)
+
+    async with async_session() as session:
+        results = await session.run_sync(bulk_delete, target.get('ids'), target.get('filter'))
+        await session.commit()
+
+    return JSONResponse(summarize(results))
+
+
+@app.put("/books/{book_id}")
+async def update_book(book_id: int, request: Request):
+    try:
+        book_data = book_schema.load(await read_json(request))
+    except ValidationError as err:
+        return JSONResponse(err.messages, status_code=400)
+
+    statement = (
+        update(Book)
+        .where(Book.id == book_id)
+        .values(**book_data)
+        .returning(*BOOK_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+    async with async_session() as session:
+        book = (await session.execute(statement)).first()
+        await session.commit()
+
+    if book is None:
+        return JSONResponse({"error": "Книга не знайдена"}, status_code=404)
+    return JSONResponse(book_schema.dump(book))
+
+
+@app.delete("/books/{book_id}")
+async def delete_book(book_id: int):
+    statement = delete(Book).where(Book.id == book_id).returning(Book.id).execution_options(synchronize_session=False)
+    async with async_session() as session:
+        deleted = (await session.execute(statement)).first()
+        await session.commit()
+
+    if deleted is None:
+        return JSONResponse({"error": "Книга не знайдена"}, status_code=404)
+    return JSONResponse({"message": "Книга видалена"}, status_code=200)
@@ -0,0 +1,80 @@
+from collections import Counter
+
+from sqlalchemy import text
+
+# Усі оновлення - один UPDATE: масиви розгортаються unnest у набір рядків,
+# тож кількість параметрів не залежить від кількості книг. NULL означає
+# "поле не передано" (усі колонки books NOT NULL)
+BULK_UPDATE_SQL = text("""
+    UPDATE books AS b
+    SET title = coalesce(v.title, b.title),
+        author = coalesce(v.author, b.author),
+        year = coalesce(v.year, b.year)
+    FROM unnest(
+        CAST(:ids AS integer[]),
+        CAST(:titles AS varchar[]),
+        CAST(:authors AS varchar[]),
+        CAST(:years AS integer[])
+    ) AS v(id, title, author, year)
+    WHERE b.id = v.id
+    RETURNING b.id
+""")
+
+DELETE_BY_IDS_SQL = text("DELETE FROM books WHERE id = ANY(CAST(:ids AS integer[])) RETURNING id")
+
+# Умови фільтра для DELETE /books за назвою поля
+FILTER_CONDITIONS = {
+    'author': "author = :author",
+    'title': "title = :title",
+    'year_from': "year >= :year_from",
+    'year_to': "year <= :year_to",
+}
+
+
+def per_id_results(requested_ids, done_ids, status):
+    """[{'id', 'status'}] у порядку запиту: status або not_found"""
+    done_ids = set(done_ids)
+    return [{'id': book_id, 'status': status if book_id in done_ids else 'not_found'} for book_id in requested_ids]
+
+
+def summarize(results):
+    """Тіло відповіді bulk-ендпоінтів: результати по id та кількість за статусами"""
+    return {'results': results, 'meta': dict(Counter(result['status'] for result in results))}
+
+
+def bulk_update(session, items):
+    """
+    Оновлює книги одним оператором. Коміт - на викликачеві
+
+    Args:
+        items: [{'id': ..., 'title'?: ..., 'author'?: ..., 'year'?: ...}] з унікальними id
+
+    Returns:
+        list: Результат для кожного id: updated або not_found
+    """
+    ids = [item['id'] for item in items]
+    params = {
+        'ids': ids,
+        'titles': [item.get('title') for item in items],
+        'authors': [item.get('author') for item in items],
+        'years': [item.get('year') for item in items],
+    }
+    updated = session.execute(BULK_UPDATE_SQL, params).scalars().all()
+    return per_id_results(ids, updated, 'updated')
+
+
+def bulk_delete(session, ids=None, filters=None):
+    """
+    Видаляє книги за списком id або за фільтром одним оператором. Коміт - на викликачеві
+
+    Returns:
+        list: Для ids - deleted або not_found для кожного id,
+              для фільтра - deleted для кожної видаленої книги
+    """
+    if ids is not None:
+        deleted = session.execute(DELETE_BY_IDS_SQL, {'ids': ids}).scalars().all()
+        return per_id_results(ids, deleted, 'deleted')
+
+    where = ' AND '.join(FILTER_CONDITIONS[name] for name in sorted(filters))
+    deleted = session.execute(text(f"DELETE FROM books WHERE {where} RETURNING id"), filters).scalars().all()
+    return [{'id': book_id, 'status': 'deleted'} for book_id in sorted(deleted)]
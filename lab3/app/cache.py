@@ -0,0 +1,276 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request
+from sqlalchemy import text
+
+from app.models import Book
+
+VERSION_TABLE_SQL = text("SELECT to_regclass('table_versions') IS NOT NULL")
+# Версія лише з увімкненим тригером: без нього вона не змінюється при записах
+VERSION_SQL = text("""
+    SELECT v.version
+    FROM table_versions v
+    WHERE v.table_name = :table AND EXISTS (
+        SELECT 1 FROM pg_trigger t
+        WHERE t.tgrelid = to_regclass(:table) AND t.tgname = :trigger AND t.tgenabled <> 'D'
+    )
+""")
+
+# Тригер рівня оператора збільшує версію в тій самій транзакції, що й запис.
+# Таблицю створює й міграція 3; тут - на випадок migrate.py з меншою версією
+VERSION_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS table_versions (
+        table_name text PRIMARY KEY,
+        version bigint NOT NULL
+    )
+    """,
+    """
+    CREATE OR REPLACE FUNCTION table_versions_bump() RETURNS trigger AS $$
+    BEGIN
+        UPDATE table_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+]
+
+# Бази (URL), в яких уже є table_versions: таблиця не зникає, тож досить однієї перевірки
+_version_tables = set()
+
+# Значення, якого немає в кеші (None теж може бути закешованим значенням)
+MISSING = object()
+
+
+class LRUCache:
+    """Кеш процесу з обмеженням кількості записів (LRU) та TTL"""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisCache:
+    """
+    Спільний для всіх воркерів рівень кешу в Redis
+
+    Недоступний Redis не ламає читання: помилка рахується як промах.
+    """
+
+    def __init__(self, url, ttl, prefix='lab3:'):
+        import redis
+
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5)
+        self.errors = redis.RedisError
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        try:
+            value = self.client.get(self.prefix + key)
+        except self.errors:
+            return MISSING
+        return MISSING if value is None else value
+
+    def set(self, key, value):
+        try:
+            self.client.set(self.prefix + key, value, ex=max(1, int(self.ttl)))
+        except self.errors:
+            pass
+
+
+class ResultCache:
+    """
+    Дворівневий кеш відповідей: LRU процесу, за ним (необов'язково) Redis
+
+    Ключ містить версію таблиці, тож після запису старі записи просто
+    перестають запитуватись і витісняються за LRU або TTL.
+    """
+
+    def __init__(self, local, remote=None):
+        self.local = local
+        self.remote = remote
+        self._stats = {'local_hits': 0, 'redis_hits': 0, 'misses': 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is not MISSING:
+            self._count('local_hits')
+            return value
+        if self.remote is not None:
+            value = self.remote.get(key)
+            if value is not MISSING:
+                self._count('redis_hits')
+                self.local.set(key, value)
+                return value
+        self._count('misses')
+        return MISSING
+
+    def set(self, key, value):
+        self.local.set(key, value)
+        if self.remote is not None:
+            self.remote.set(key, value)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        hits = stats['local_hits'] + stats['redis_hits']
+        lookups = hits + stats['misses']
+        stats.update({
+            'hits': hits,
+            'hit_ratio': round(hits / lookups, 4) if lookups else None,
+            'entries': len(self.local),
+            'redis': self.remote is not None,
+        })
+        return stats
+
+
+def version_trigger(table):
+    return f"{table}_version_bump"
+
+
+def install_version_trigger(engine, table=Book.__tablename__):
+    """
+    Створює тригер, що збільшує версію таблиці при кожному записі
+
+    Кожен запис у таблицю оновлює один і той самий рядок table_versions,
+    тому паралельні транзакції запису серіалізуються на ньому до коміту -
+    тригер потрібен лише з увімкненим кешем результатів. Версія
+    збільшується й тут: записи без тригера могли лишити застарілі ключі.
+    """
+    with engine.begin() as conn:
+        for statement in VERSION_DDL:
+            conn.execute(text(statement))
+        conn.execute(text(f"""
+            CREATE OR REPLACE TRIGGER {version_trigger(table)}
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION table_versions_bump()
+        """))
+        conn.execute(text("""
+            INSERT INTO table_versions (table_name, version) VALUES (:table, 1)
+            ON CONFLICT (table_name) DO UPDATE SET version = table_versions.version + 1
+        """), {'table': table})
+
+
+def drop_version_trigger(engine, table=Book.__tablename__):
+    """
+    Прибирає тригер версій, коли кеш вимкнено: записи перестають чекати
+    одне на одного на рядку table_versions. Процеси, що ще кешують,
+    побачать відсутність тригера в table_version і читатимуть без кешу.
+    """
+    with engine.begin() as conn:
+        # DROP TRIGGER блокує таблицю навіть без тригера - спершу перевірка
+        exists = conn.execute(
+            text("SELECT 1 FROM pg_trigger WHERE tgrelid = to_regclass(:table) AND tgname = :trigger"),
+            {'table': table, 'trigger': version_trigger(table)},
+        ).scalar()
+        if exists:
+            conn.execute(text(f"DROP TRIGGER {version_trigger(table)} ON {table}"))
+
+
+def table_version(session, table=Book.__tablename__):
+    """
+    Поточна версія таблиці (збільшується тригером при кожному записі)
+
+    None, якщо міграцію 3 ще не застосовано або тригер не встановлено:
+    тоді версія не відстежує записи, і кешувати не можна.
+    """
+    url = str(session.get_bind().url)
+    if url not in _version_tables:
+        if not session.execute(VERSION_TABLE_SQL).scalar():
+            return None
+        _version_tables.add(url)
+    return session.execute(VERSION_SQL, {'table': table, 'trigger': version_trigger(table)}).scalar()
+
+
+def cache_key(endpoint, path_params, query_items, version):
+    """Ключ (маршрут, параметри шляху й запиту, версія таблиці)"""
+    return json.dumps([
+        endpoint,
+        sorted(path_params),
+        sorted(query_items),
+        version,
+    ], separators=(',', ':'))
+
+
+def cached(view):
+    """
+    Кешує успішні JSON-відповіді маршруту за ключем з версією таблиці books
+
+    Версія читається з тієї ж бази (primary або репліки), що й дані, тому
+    @cached ставиться під @read_only. Без версії (тригер не встановлено)
+    маршрут виконується без кешу.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        cache = current_app.extensions.get('result_cache')
+        if cache is None:
+            return view(*args, **kwargs)
+
+        version = table_version(current_app.extensions['sqlalchemy'].session)
+        if version is None:
+            return view(*args, **kwargs)
+        key = cache_key(request.endpoint, request.view_args.items(), request.args.items(multi=True), version)
+        body = cache.get(key)
+        if body is not MISSING:
+            response = current_app.response_class(body, mimetype='application/json')
+            response.headers['X-Cache'] = 'HIT'
+            return response
+
+        response = current_app.make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            cache.set(key, response.get_data())
+        response.headers['X-Cache'] = 'MISS'
+        return response
+    return wrapper
+
+
+def build_cache(config):
+    """ResultCache за налаштуваннями RESULT_CACHE_* або None, якщо RESULT_CACHE_SIZE <= 0"""
+    if config['RESULT_CACHE_SIZE'] <= 0:
+        return None
+    ttl = config['RESULT_CACHE_TTL']
+    redis_url = config['RESULT_CACHE_REDIS_URL']
+    return ResultCache(
+        LRUCache(config['RESULT_CACHE_SIZE'], ttl),
+        RedisCache(redis_url, ttl) if redis_url else None,
+    )
+
+
+def init_cache(app):
+    """Вмикає кеш результатів, якщо RESULT_CACHE_SIZE > 0"""
+    cache = build_cache(app.config)
+    if cache is not None:
+        app.extensions['result_cache'] = cache
@@ -0,0 +1,122 @@
+from sqlalchemy import text
+
+from app.models import Book
+
+COUNT_MODES = ('exact', 'estimated', 'none')
+
+COUNTER_TABLE = 'book_counts'
+
+# Оцінка як у планувальника: щільність рядків з останнього ANALYZE/VACUUM,
+# помножена на поточну кількість сторінок таблиці
+ESTIMATE_SQL = text("""
+    SELECT CASE WHEN c.reltuples < 0 OR c.relpages = 0 THEN NULL
+                ELSE (c.reltuples / c.relpages
+                      * (pg_relation_size(c.oid) / current_setting('block_size')::int))::bigint
+           END
+    FROM pg_class c
+    WHERE c.oid = to_regclass(:table)
+""")
+
+COUNTER_SQL = text(f"SELECT total FROM {COUNTER_TABLE} WHERE table_name = :table")
+
+# Тригери рівня оператора з перехідними таблицями: один UPDATE лічильника
+# на INSERT/DELETE, скільки б рядків він не зачепив
+COUNTER_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {COUNTER_TABLE} (
+        table_name text PRIMARY KEY,
+        total bigint NOT NULL
+    )
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION {COUNTER_TABLE}_insert() RETURNS trigger AS $$
+    BEGIN
+        UPDATE {COUNTER_TABLE} SET total = total + (SELECT count(*) FROM inserted)
+        WHERE table_name = TG_TABLE_NAME;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION {COUNTER_TABLE}_delete() RETURNS trigger AS $$
+    BEGIN
+        UPDATE {COUNTER_TABLE} SET total = total - (SELECT count(*) FROM deleted)
+        WHERE table_name = TG_TABLE_NAME;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION {COUNTER_TABLE}_truncate() RETURNS trigger AS $$
+    BEGIN
+        UPDATE {COUNTER_TABLE} SET total = 0 WHERE table_name = TG_TABLE_NAME;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql
+    """,
+]
+
+
+def counter_triggers(table):
+    return [
+        f"DROP TRIGGER IF EXISTS {table}_count_insert ON {table}",
+        f"""CREATE TRIGGER {table}_count_insert AFTER INSERT ON {table}
+            REFERENCING NEW TABLE AS inserted
+            FOR EACH STATEMENT EXECUTE FUNCTION {COUNTER_TABLE}_insert()""",
+        f"DROP TRIGGER IF EXISTS {table}_count_delete ON {table}",
+        f"""CREATE TRIGGER {table}_count_delete AFTER DELETE ON {table}
+            REFERENCING OLD TABLE AS deleted
+            FOR EACH STATEMENT EXECUTE FUNCTION {COUNTER_TABLE}_delete()""",
+        f"DROP TRIGGER IF EXISTS {table}_count_truncate ON {table}",
+        f"""CREATE TRIGGER {table}_count_truncate AFTER TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION {COUNTER_TABLE}_truncate()""",
+    ]
+
+
+def install_counter(engine, table=Book.__tablename__):
+    """
+    Створює таблицю-лічильник і тригери, що підтримують її в актуальному стані
+
+    Повторний виклик лише оновлює функції. Початкове значення рахується
+    один раз під блокуванням, яке не пускає паралельні записи, тож
+    лічильник і тригери стартують узгоджено. Кожен запис у таблицю
+    оновлює один і той самий рядок лічильника, тому паралельні транзакції
+    запису серіалізуються на ньому до коміту.
+    """
+    with engine.begin() as conn:
+        for statement in COUNTER_DDL:
+            conn.execute(text(statement))
+        if conn.execute(COUNTER_SQL, {'table': table}).scalar() is not None:
+            return
+        conn.execute(text(f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE"))
+        for statement in counter_triggers(table):
+            conn.execute(text(statement))
+        conn.execute(text(f"""
+            INSERT INTO {COUNTER_TABLE} (table_name, total)
+            SELECT :table, count(*) FROM {table}
+        """), {'table': table})
+
+
+def count_books(session, mode, use_counter=False):
+    """
+    Загальна кількість книг для meta.total
+
+    Args:
+        mode: exact - точне значення (з лічильника, якщо він встановлений,
+              інакше COUNT(*)); estimated - оцінка зі статистики
+              планувальника; none - не рахувати
+        use_counter: Чи встановлена таблиця-лічильник
+
+    Returns:
+        int або None для mode=none
+    """
+    table = Book.__tablename__
+    if mode == 'none':
+        return None
+    if use_counter:
+        total = session.execute(COUNTER_SQL, {'table': table}).scalar()
+        if total is not None:
+            return total
+    if mode == 'estimated':
+        total = session.execute(ESTIMATE_SQL, {'table': table}).scalar()
+        if total is not None:
+            return total
+    # Таблицю ще не аналізували (або вона порожня) - рахуємо напряму
+    return session.query(Book).count()
@@ -0,0 +1,223 @@
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Скільки останніх повільних запитів віддає GET /sql/stats
+SLOW_LOG_SIZE = 50
+# Довжина опису параметрів у звітах: bulk-запити передають тисячі значень
+PARAMS_PREVIEW = 500
+HEADER_STATEMENT_SIZE = 200
+EXPLAINABLE = ('select', 'insert', 'update', 'delete', 'with')
+
+
+class RequestSql:
+    """
+    SQL одного HTTP-запиту та налаштування журналу повільних запитів
+
+    Args:
+        stats: SqlStats процесу
+        endpoint: Функція без аргументів, що повертає назву маршруту (у
+                  FastAPI маршрут відомий лише після маршрутизації)
+        config: Налаштування з SQL_SLOW_QUERY_MS та SQL_EXPLAIN
+        logger: Куди писати повільні запити
+    """
+
+    def __init__(self, stats, endpoint, config, logger):
+        self.stats = stats
+        self.endpoint = endpoint
+        self.slow_ms = config['SQL_SLOW_QUERY_MS']
+        self.explain = config['SQL_EXPLAIN']
+        self.logger = logger
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest = None
+
+
+# SQL поточного HTTP-запиту (Flask або FastAPI); None - код поза запитом
+current_sql = ContextVar('current_sql', default=None)
+
+
+class SqlStats:
+    """Накопичена статистика SQL по маршрутах та журнал повільних запитів"""
+
+    def __init__(self):
+        self.endpoints = {}
+        self.slow_queries = deque(maxlen=SLOW_LOG_SIZE)
+        self._lock = threading.Lock()
+
+    def add_request(self, endpoint, sql):
+        with self._lock:
+            stats = self.endpoints.setdefault(endpoint, {
+                'requests': 0, 'statements': 0, 'sql_seconds': 0.0, 'max_statements': 0, 'slowest': None,
+            })
+            stats['requests'] += 1
+            stats['statements'] += sql.count
+            stats['sql_seconds'] += sql.seconds
+            stats['max_statements'] = max(stats['max_statements'], sql.count)
+            slowest = sql.slowest
+            if slowest is not None and (stats['slowest'] is None or slowest['seconds'] > stats['slowest']['seconds']):
+                stats['slowest'] = slowest
+
+    def add_slow_query(self, entry):
+        with self._lock:
+            self.slow_queries.append(entry)
+
+    def report(self):
+        with self._lock:
+            endpoints = {
+                endpoint: {
+                    'requests': stats['requests'],
+                    'statements': stats['statements'],
+                    'statements_per_request': round(stats['statements'] / stats['requests'], 2),
+                    'max_statements': stats['max_statements'],
+                    'sql_ms_total': round(stats['sql_seconds'] * 1000, 2),
+                    'sql_ms_per_request': round(stats['sql_seconds'] * 1000 / stats['requests'], 3),
+                    'slowest': stats['slowest'] and {
+                        'ms': round(stats['slowest']['seconds'] * 1000, 2),
+                        'statement': stats['slowest']['statement'],
+                        'parameters': stats['slowest']['parameters'],
+                    },
+                }
+                for endpoint, stats in self.endpoints.items()
+            }
+            return {'endpoints': endpoints, 'slow_queries': list(self.slow_queries)}
+
+
+def redact(parameters, executemany=False):
+    """
+    Параметри запиту без значень, лише їхні типи
+
+    Значення - дані клієнтів, тож у звіти та журнал вони не потрапляють.
+    Для executemany описується перший набір і кількість наборів (psycopg2
+    з execute_values може передати і один словник на всю сторінку).
+    """
+    if executemany and isinstance(parameters, (list, tuple)):
+        text = f"{len(parameters)} x {redact(parameters[0]) if parameters else '[]'}"
+    elif isinstance(parameters, dict):
+        text = repr({key: type(value).__name__ for key, value in parameters.items()})
+    elif isinstance(parameters, (list, tuple)):
+        text = repr([type(value).__name__ for value in parameters])
+    else:
+        text = type(parameters).__name__
+    return text if len(text) <= PARAMS_PREVIEW else text[:PARAMS_PREVIEW] + '...'
+
+
+def one_line(statement, limit=HEADER_STATEMENT_SIZE):
+    """SQL в один рядок для заголовка відповіді"""
+    text = ' '.join(statement.split())
+    return text if len(text) <= limit else text[:limit] + '...'
+
+
+def sql_headers(sql):
+    """Заголовки X-SQL-* відповіді з кількістю, часом та найповільнішим запитом"""
+    headers = {'X-SQL-Count': str(sql.count), 'X-SQL-Time-Ms': f"{sql.seconds * 1000:.2f}"}
+    if sql.slowest is not None:
+        headers['X-SQL-Slowest-Ms'] = f"{sql.slowest['seconds'] * 1000:.2f}"
+        headers['X-SQL-Slowest'] = one_line(sql.slowest['statement'])
+    return headers
+
+
+def explain(conn, statement, parameters):
+    """
+    План повільного запиту, отриманий на тому ж з'єднанні
+
+    Виконується напряму через DBAPI-курсор (без подій SQLAlchemy) у
+    savepoint, щоб помилка EXPLAIN не зламала транзакцію запиту.
+    """
+    if not statement.lstrip().lower().startswith(EXPLAINABLE):
+        return None
+    explain_cursor = conn.connection.cursor()
+    try:
+        explain_cursor.execute("SAVEPOINT sql_explain")
+        try:
+            explain_cursor.execute("EXPLAIN " + statement, parameters)
+            plan = [row[0] for row in explain_cursor.fetchall()]
+            explain_cursor.execute("RELEASE SAVEPOINT sql_explain")
+            return plan
+        except conn.dialect.loaded_dbapi.Error as err:
+            explain_cursor.execute("ROLLBACK TO SAVEPOINT sql_explain")
+            return [f"EXPLAIN не вдався: {err}".strip()]
+    finally:
+        explain_cursor.close()
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_started'] = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop('query_started', None)
+    sql = current_sql.get()
+    # Запити поза HTTP-запитом (migrate.py, бенчмарки) не рахуються; без
+    # початку (слухачі підключено посеред виконання) час невідомий
+    if sql is None or started is None:
+        return
+    elapsed = time.perf_counter() - started
+    sql.count += 1
+    sql.seconds += elapsed
+    if sql.slowest is None or elapsed > sql.slowest['seconds']:
+        sql.slowest = {'seconds': elapsed, 'statement': statement, 'parameters': redact(parameters, executemany)}
+
+    if elapsed * 1000 < sql.slow_ms:
+        return
+    entry = {
+        'endpoint': sql.endpoint(),
+        'ms': round(elapsed * 1000, 2),
+        'statement': statement,
+        'parameters': redact(parameters, executemany),
+        'plan': None,
+    }
+    if sql.explain and not executemany:
+        entry['plan'] = explain(conn, statement, parameters)
+    sql.stats.add_slow_query(entry)
+    sql.logger.warning(
+        "Повільний SQL (%.1f мс) у %s: %s; параметри: %s\n%s",
+        entry['ms'], entry['endpoint'], statement, entry['parameters'], '\n'.join(entry['plan'] or []),
+    )
+
+
+def listen_engine_events():
+    """
+    Вішає слухачі на клас Engine: вони охоплюють primary, репліки та
+    sync_engine асинхронних engine (події asyncpg виконуються в greenlet
+    SQLAlchemy з контекстом корутини, тож current_sql там той самий)
+    """
+    if not event.contains(Engine, 'before_cursor_execute', before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', after_cursor_execute)
+
+
+def init_instrumentation(app):
+    """
+    Рахує SQL кожного запиту через події engine
+
+    У debug-режимі (або з SQL_DEBUG_HEADERS) відповідь отримує заголовки
+    X-SQL-Count, X-SQL-Time-Ms, X-SQL-Slowest-Ms та X-SQL-Slowest.
+    """
+    listen_engine_events()
+    app.extensions['sql_stats'] = SqlStats()
+
+    @app.before_request
+    def start_sql_stats():
+        current_sql.set(RequestSql(
+            app.extensions['sql_stats'], lambda: request.endpoint or request.path, app.config, app.logger,
+        ))
+
+    @app.after_request
+    def finish_sql_stats(response):
+        sql = current_sql.get()
+        if sql is None:
+            return response
+        sql.stats.add_request(sql.endpoint(), sql)
+        if app.debug or app.config['SQL_DEBUG_HEADERS']:
+            response.headers.update(sql_headers(sql))
+        return response
+
+    @app.teardown_request
+    def clear_sql_stats(exc):
+        current_sql.set(None)
@@ -0,0 +1,132 @@
+from sqlalchemy import text
+
+MIGRATIONS_TABLE = 'schema_migrations'
+
+# Довільний, але сталий ключ advisory lock: дві паралельні міграції чекають одна на одну
+LOCK_KEY = 0x626F6F6B
+
+
+class NoTransaction(list):
+    """
+    Кроки міграції, що виконуються поза транзакцією, кожен окремо
+
+    Потрібно для CREATE/DROP INDEX CONCURRENTLY. Перервана міграція
+    повторюється з першого кроку, тож кроки мають бути ідемпотентними.
+    """
+
+
+def create_index_concurrently(name, definition):
+    """
+    Крок міграції: CREATE INDEX CONCURRENTLY, який не блокує записи в таблицю
+
+    Перерваний CREATE INDEX CONCURRENTLY лишає INVALID-індекс з тим самим
+    ім'ям: такий індекс видаляється і будується заново, а готовий лишається.
+    """
+    def step(conn):
+        valid = conn.execute(
+            text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"), {'name': name}
+        ).scalar()
+        if valid:
+            return
+        if valid is not None:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY {name}"))
+        conn.execute(text(f"CREATE INDEX CONCURRENTLY {name} ON {definition}"))
+    return step
+
+
+# (версія, назва, кроки). Крок - SQL-рядок або функція від з'єднання.
+# Версії лише додаються в кінець і не змінюються
+MIGRATIONS = [
+    (1, 'create_books', [
+        """
+        CREATE TABLE IF NOT EXISTS books (
+            id SERIAL PRIMARY KEY,
+            title VARCHAR(200) NOT NULL,
+            author VARCHAR(100) NOT NULL,
+            year INTEGER NOT NULL
+        )
+        """,
+    ]),
+    (2, 'books_indexes', NoTransaction([
+        # Фільтр за автором (і автором + роком) та діапазоном років;
+        # CONCURRENTLY, щоб на наявній таблиці не зупиняти записи на час побудови
+        create_index_concurrently('ix_books_author_year', "books (author, year)"),
+        create_index_concurrently('ix_books_year', "books (year)"),
+        create_index_concurrently('ix_books_title', "books (title)"),
+        # GET /books шукає id сторінки в первинному ключі (deferred join,
+        # app/pagination.py), тож покривний індекс за id не потрібен
+    ])),
+    (3, 'table_versions', [
+        # Версія таблиці для ключів кешу результатів (app/cache.py). Тригер, що
+        # її збільшує, встановлює install_version_trigger лише з увімкненим кешем
+        """
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name text PRIMARY KEY,
+            version bigint NOT NULL
+        )
+        """,
+        "INSERT INTO table_versions (table_name, version) VALUES ('books', 1) ON CONFLICT DO NOTHING",
+    ]),
+]
+
+
+def current_version(conn):
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+            version integer PRIMARY KEY,
+            name text NOT NULL,
+            applied_at timestamptz NOT NULL DEFAULT now()
+        )
+    """))
+    return conn.execute(text(f"SELECT coalesce(max(version), 0) FROM {MIGRATIONS_TABLE}")).scalar()
+
+
+def run_step(conn, step):
+    if callable(step):
+        step(conn)
+    else:
+        conn.execute(text(step))
+
+
+def migrate(engine, target=None):
+    """
+    Застосовує міграції, новіші за поточну версію схеми
+
+    Кожна міграція виконується у власній транзакції разом із записом у
+    schema_migrations, тож перервана міграція не лишає схему напівзміненою.
+    Кроки NoTransaction виконуються в режимі autocommit на окремому
+    з'єднанні, а запис у schema_migrations додається після останнього.
+
+    Args:
+        target: Версія, до якої мігрувати (за замовчуванням - остання)
+
+    Returns:
+        list: Застосовані міграції [(версія, назва), ...]
+    """
+    applied = []
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {'key': LOCK_KEY})
+        conn.commit()
+        try:
+            with conn.begin():
+                version = current_version(conn)
+            for number, name, steps in MIGRATIONS:
+                if number <= version or (target is not None and number > target):
+                    continue
+                if isinstance(steps, NoTransaction):
+                    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as autocommit:
+                        for step in steps:
+                            run_step(autocommit, step)
+                    steps = []
+                with conn.begin():
+                    for step in steps:
+                        run_step(conn, step)
+                    conn.execute(
+                        text(f"INSERT INTO {MIGRATIONS_TABLE} (version, name) VALUES (:version, :name)"),
+                        {'version': number, 'name': name},
+                    )
+                applied.append((number, name))
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {'key': LOCK_KEY})
+            conn.commit()
+    return applied
@@ -0,0 +1,21 @@
+from sqlalchemy import select
+
+from app.models import Book
+
+BOOK_COLUMNS = (Book.id, Book.title, Book.author, Book.year)
+
+
+def offset_page_statement(offset, limit):
+    """
+    SELECT сторінки GET /books (ORDER BY id OFFSET ... LIMIT ...) через deferred join
+
+    Пропущені рядки відкидаються у підзапиті, що вибирає лише id і читає
+    вузький первинний ключ index-only scan; повні рядки дочитуються
+    тільки для limit id сторінки.
+    """
+    page_ids = select(Book.id).order_by(Book.id).offset(offset).limit(limit).subquery('page_ids')
+    return (
+        select(*BOOK_COLUMNS)
+        .join(page_ids, Book.id == page_ids.c.id)
+        .order_by(Book.id)
+    )
@@ -1,7 +1,13 @@
 from flask import request, jsonify, current_app
+from sqlalchemy import insert
 from app.database import db
+from app.replicas import read_only
+from app.cache import cached
 from app.models import Book
-from app.schemas import book_schema, books_schema
+from app.schemas import book_schema, books_schema, book_updates_schema, bulk_delete_schema
+from app.bulk import bulk_update, bulk_delete, summarize
+from app.counting import COUNT_MODES, count_books
+from app.pagination import offset_page_statement
 from marshmallow import ValidationError
 
 def register_routes(app):
@@ -10,6 +16,8 @@ def register_routes(app):
         return "Головна сторінка API бібліотеки"
 
     @app.route('/books', methods=['GET'])
+    @read_only
+    @cached
     def get_books():
         # Параметри пагінації
         page = request.args.get('offset', default=0, type=int)
@@ -18,9 +26,15 @@ def register_routes(app):
         if limit > 100:
             limit = 100
         
-        total_books = Book.query.count()
+        # exact (за замовчуванням) - COUNT(*) або лічильник, estimated - статистика планувальника, none - без total
+        use_counter = current_app.config['BOOKS_COUNTER']
+        count_mode = request.args.get('count', default='exact')
+        if count_mode not in COUNT_MODES:
+            return jsonify({"error": f"count має бути одним з: {', '.join(COUNT_MODES)}"}), 400
         
-        books = Book.query.offset(page).limit(limit).all()
+        total_books = count_books(db.session, count_mode, use_counter)
+        
+        books = db.session.execute(offset_page_statement(page, limit)).all()
         
         result = books_schema.dump(books)
         
@@ -28,12 +42,27 @@ def register_routes(app):
             'data': result,
             'meta': {
                 'total': total_books,
+                'count': count_mode,
                 'offset': page,
                 'limit': limit
             }
         })
 
+    @app.route('/cache/stats', methods=['GET'])
+    def cache_stats():
+        cache = current_app.extensions.get('result_cache')
+        if cache is None:
+            return jsonify({"error": "Кеш результатів вимкнено (RESULT_CACHE_SIZE=0)"}), 404
+        return jsonify(cache.stats())
+
+    if app.config['SQL_STATS_ENDPOINT']:
+        @app.route('/sql/stats', methods=['GET'])
+        def sql_stats():
+            return jsonify(current_app.extensions['sql_stats'].report())
+
     @app.route('/books/<int:book_id>', methods=['GET'])
+    @read_only
+    @cached
     def get_book(book_id):
         book = Book.query.get(book_id)
         if not book:
@@ -47,17 +76,49 @@ def register_routes(app):
             books_data = books_schema.load(request.json)
 
             
-            new_books = [
-                Book(title=book['title'], author=book['author'], year=book['year'])
-                for book in books_data
-            ]
+            if not books_data:
+                return jsonify([]), 201
 
-            db.session.add_all(new_books)
+            # Один багаторядковий INSERT ... RETURNING (insertmanyvalues) замість
+            # add_all: відповідь будується з повернених рядків, без SELECT на кожну книгу
+            statement = insert(Book).returning(
+                Book.id, Book.title, Book.author, Book.year, sort_by_parameter_order=True
+            )
+            rows = db.session.execute(statement, books_data).all()
             db.session.commit()
 
-            return jsonify(books_schema.dump(new_books)), 201
+            return jsonify(books_schema.dump(rows)), 201
+        except ValidationError as err:
+            return jsonify(err.messages), 400
+
+    @app.route('/books/bulk-update', methods=['POST'])
+    def bulk_update_books():
+        try:
+            items = book_updates_schema.load(request.json)
+        except ValidationError as err:
+            return jsonify(err.messages), 400
+        
+        ids = [item['id'] for item in items]
+        if len(set(ids)) != len(ids):
+            return jsonify({"error": "id у запиті мають бути унікальними"}), 400
+        
+        # Один UPDATE ... FROM unnest(...) в одній транзакції замість запиту на кожну книгу
+        results = bulk_update(db.session, items)
+        db.session.commit()
+        
+        return jsonify(summarize(results))
+
+    @app.route('/books', methods=['DELETE'])
+    def delete_books_bulk():
+        try:
+            target = bulk_delete_schema.load(request.json)
         except ValidationError as err:
             return jsonify(err.messages), 400
+        
+        results = bulk_delete(db.session, ids=target.get('ids'), filters=target.get('filter'))
+        db.session.commit()
+        
+        return jsonify(summarize(results))
 
     @app.route('/books/<int:book_id>', methods=['PUT'])
     def update_book(book_id):
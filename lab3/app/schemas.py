@@ -1,4 +1,4 @@
-from marshmallow import Schema, fields, validate
+from marshmallow import Schema, ValidationError, fields, validate, validates_schema
 
 class BookSchema(Schema):
     id = fields.Int(dump_only=True)  # тільки для виводу, не для створення
@@ -9,4 +9,33 @@ class BookSchema(Schema):
     ])
 
 book_schema = BookSchema()
-books_schema = BookSchema(many=True)
\ No newline at end of file
+books_schema = BookSchema(many=True)
+
+
+class BookUpdateSchema(BookSchema):
+    """Елемент POST /books/bulk-update: id та будь-яка підмножина полів книги"""
+    id = fields.Int(required=True, validate=validate.Range(min=1))
+
+
+class BookFilterSchema(Schema):
+    author = fields.Str(validate=validate.Length(min=1))
+    title = fields.Str(validate=validate.Length(min=1))
+    year_from = fields.Int()
+    year_to = fields.Int()
+
+
+class BulkDeleteSchema(Schema):
+    """Тіло DELETE /books: або список ids, або непорожній filter"""
+    ids = fields.List(fields.Int(validate=validate.Range(min=1)))
+    filter = fields.Nested(BookFilterSchema)
+
+    @validates_schema
+    def validate_target(self, data, **kwargs):
+        if ('ids' in data) == ('filter' in data):
+            raise ValidationError("Потрібно вказати або ids, або filter")
+        if 'filter' in data and not data['filter']:
+            raise ValidationError("filter не може бути порожнім", 'filter')
+
+
+book_updates_schema = BookUpdateSchema(many=True, partial=('title', 'author', 'year'))
+bulk_delete_schema = BulkDeleteSchema()
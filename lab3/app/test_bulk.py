@@ -0,0 +1,61 @@
+import pytest
+from marshmallow import ValidationError
+
+from app.bulk import per_id_results, summarize
+from app.schemas import bulk_delete_schema
+
+
+class TestBulkDeleteSchema:
+    """Тести для тіла DELETE /books"""
+
+    def test_ids(self):
+        assert bulk_delete_schema.load({'ids': [3, 1]}) == {'ids': [3, 1]}
+
+    def test_filter(self):
+        data = bulk_delete_schema.load({'filter': {'author': "Франко", 'year_to': 1900}})
+        assert data == {'filter': {'author': "Франко", 'year_to': 1900}}
+
+    @pytest.mark.parametrize("body", [
+        {},
+        {'ids': [1], 'filter': {'author': "Франко"}},
+    ])
+    def test_exactly_one_target(self, body):
+        with pytest.raises(ValidationError) as err:
+            bulk_delete_schema.load(body)
+        assert '_schema' in err.value.messages
+
+    def test_empty_filter(self):
+        with pytest.raises(ValidationError) as err:
+            bulk_delete_schema.load({'filter': {}})
+        assert 'filter' in err.value.messages
+
+    @pytest.mark.parametrize("body", [
+        {'ids': [0]},
+        {'ids': ["abc"]},
+        {'ids': 5},
+        {'filter': {'author': ""}},
+        {'filter': {'year_from': "later"}},
+        {'filter': {'isbn': "123"}},
+    ])
+    def test_invalid_values(self, body):
+        with pytest.raises(ValidationError):
+            bulk_delete_schema.load(body)
+
+
+class TestResults:
+    """Тести для результатів bulk-ендпоінтів"""
+
+    def test_per_id_results_keep_request_order(self):
+        assert per_id_results([5, 2, 9], [9, 5], 'deleted') == [
+            {'id': 5, 'status': 'deleted'},
+            {'id': 2, 'status': 'not_found'},
+            {'id': 9, 'status': 'deleted'},
+        ]
+
+    def test_per_id_results_empty(self):
+        assert per_id_results([], [], 'updated') == []
+
+    def test_summarize(self):
+        results = per_id_results([1, 2, 3], [1, 3], 'updated')
+        assert summarize(results) == {'results': results, 'meta': {'updated': 2, 'not_found': 1}}
+        assert summarize([]) == {'results': [], 'meta': {}}
@@ -0,0 +1,117 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app import cache
+from app.cache import MISSING, LRUCache, ResultCache, cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Керований час замість time.monotonic для перевірки TTL
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+class TestLRUCache:
+    """Тести для кешу процесу з LRU та TTL"""
+
+    def test_get_missing(self, clock):
+        assert LRUCache(2, 60).get("a") is MISSING
+
+    def test_none_is_a_value(self, clock):
+        lru = LRUCache(2, 60)
+        lru.set("a", None)
+        assert lru.get("a") is None
+
+    def test_ttl(self, clock):
+        lru = LRUCache(2, 60)
+        lru.set("a", 1)
+        clock.value += 59
+        assert lru.get("a") == 1
+        clock.value += 1
+        assert lru.get("a") is MISSING
+        # Прострочений запис видаляється при читанні
+        assert len(lru) == 0
+
+    def test_set_refreshes_ttl(self, clock):
+        lru = LRUCache(2, 60)
+        lru.set("a", 1)
+        clock.value += 50
+        lru.set("a", 2)
+        clock.value += 50
+        assert lru.get("a") == 2
+
+    def test_evicts_least_recently_used(self, clock):
+        lru = LRUCache(2, 60)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        # Читання робить "a" найсвіжішим, тож витісняється "b"
+        assert lru.get("a") == 1
+        lru.set("c", 3)
+        assert len(lru) == 2
+        assert lru.get("b") is MISSING
+        assert (lru.get("a"), lru.get("c")) == (1, 3)
+
+
+class FakeRemote:
+    def __init__(self, values=None):
+        self.values = dict(values or {})
+
+    def get(self, key):
+        return self.values.get(key, MISSING)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+
+class TestResultCache:
+    """Тести для дворівневого кешу та його лічильників"""
+
+    def test_local_only(self, clock):
+        result = ResultCache(LRUCache(4, 60))
+        assert result.get("k") is MISSING
+        result.set("k", b"body")
+        assert result.get("k") == b"body"
+        assert result.stats() == {
+            'local_hits': 1, 'redis_hits': 0, 'misses': 1,
+            'hits': 1, 'hit_ratio': 0.5, 'entries': 1, 'redis': False,
+        }
+
+    def test_remote_hit_fills_local(self, clock):
+        remote = FakeRemote({"k": b"body"})
+        result = ResultCache(LRUCache(4, 60), remote)
+        assert result.get("k") == b"body"
+        assert result.get("k") == b"body"
+        stats = result.stats()
+        assert (stats['redis_hits'], stats['local_hits'], stats['misses']) == (1, 1, 0)
+        assert stats['entries'] == 1 and stats['redis']
+
+    def test_set_writes_both_levels(self, clock):
+        remote = FakeRemote()
+        result = ResultCache(LRUCache(4, 60), remote)
+        result.set("k", b"body")
+        assert remote.values == {"k": b"body"}
+
+    def test_no_lookups(self, clock):
+        assert ResultCache(LRUCache(4, 60)).stats()['hit_ratio'] is None
+
+
+class TestCacheKey:
+    """Тести для ключа кешу"""
+
+    def test_order_of_parameters_does_not_matter(self):
+        first = cache_key("get_books", [], [("limit", "10"), ("offset", "20")], 3)
+        second = cache_key("get_books", [], [("offset", "20"), ("limit", "10")], 3)
+        assert first == second
+
+    def test_version_and_endpoint_are_part_of_key(self):
+        key = cache_key("get_book", [("book_id", 5)], [], 3)
+        assert json.loads(key) == ["get_book", [["book_id", 5]], [], 3]
+        assert key != cache_key("get_book", [("book_id", 5)], [], 4)
+        assert key != cache_key("get_books", [("book_id", 5)], [], 3)
+
+    def test_repeated_query_parameters(self):
+        assert cache_key("get_books", [], [("a", "1"), ("a", "2")], 1) != cache_key("get_books", [], [("a", "1")], 1)
@@ -0,0 +1,47 @@
+import pytest
+
+from app import instrumentation
+from app.instrumentation import one_line, redact
+
+
+class TestRedact:
+    """Тести для опису параметрів без значень"""
+
+    def test_dict(self):
+        parameters = {'title': "Кобзар", 'year': 1840, 'author': None}
+        assert redact(parameters) == "{'title': 'str', 'year': 'int', 'author': 'NoneType'}"
+
+    def test_sequence(self):
+        assert redact(("secret", 5)) == "['str', 'int']"
+
+    def test_executemany(self):
+        assert redact([{'id': 1}, {'id': 2}, {'id': 3}], executemany=True) == "3 x {'id': 'int'}"
+        assert redact([], executemany=True) == "0 x []"
+
+    def test_executemany_with_single_page_dict(self):
+        # psycopg2 з execute_values передає словник на всю сторінку
+        parameters = {'title__0': "A", 'title__1': "B"}
+        assert redact(parameters, executemany=True) == "{'title__0': 'str', 'title__1': 'str'}"
+
+    @pytest.mark.parametrize("parameters,executemany", [
+        ({'title': "secret title"}, False),
+        (["secret title"], False),
+        ([{'title': "secret title"}], True),
+    ])
+    def test_values_are_not_shown(self, parameters, executemany):
+        assert "secret" not in redact(parameters, executemany)
+
+    def test_truncated(self, monkeypatch):
+        monkeypatch.setattr(instrumentation, "PARAMS_PREVIEW", 10)
+        assert redact(list(range(100))) == "['int', 'i..."
+
+
+class TestOneLine:
+    """Тести для SQL у заголовку відповіді"""
+
+    def test_whitespace_is_collapsed(self):
+        assert one_line("SELECT *\n    FROM books\r\n\tWHERE id = %(id)s ") == "SELECT * FROM books WHERE id = %(id)s"
+
+    def test_truncated(self):
+        assert one_line("SELECT " + "x, " * 10, limit=12) == "SELECT x, x,..."
+        assert one_line("SELECT 1", limit=8) == "SELECT 1"
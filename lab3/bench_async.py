@@ -0,0 +1,140 @@
+"""
+Порівняння пропускної здатності sync (Flask + Flask-SQLAlchemy) та async
+(FastAPI + SQLAlchemy asyncio + asyncpg) варіантів API lab3.
+
+Обидва сервери запускаються як окремі процеси на одній базі, після чого
+CONCURRENCY клієнтів протягом DURATION секунд змішано запитують
+GET /books та GET /books/{id}. Друкуються запити/с, p50/p99 та помилки.
+
+Запуск (після python migrate.py): DATABASE_URL=... python bench_async.py [клієнтів] [секунд]
+"""
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+CONCURRENCY = 500
+DURATION = 20
+SEED_BOOKS = 10_000
+SERVERS = {
+    'sync': [sys.executable, '-m', 'flask', '--app', 'run', 'run', '--port', '5101', '--with-threads'],
+    'async': [sys.executable, '-m', 'uvicorn', 'app.async_routes:app', '--port', '5102', '--log-level', 'warning'],
+}
+PORTS = {'sync': 5101, 'async': 5102}
+
+
+class Connection:
+    """
+    Мінімальний HTTP/1.1 клієнт з keep-alive.
+
+    Клієнт працює на тій самій машині, що й сервери, тому він має бути
+    якомога дешевшим, щоб не забирати процесор у вимірюваного сервера.
+    """
+
+    def __init__(self, port):
+        self.port = port
+        self.reader = self.writer = None
+
+    async def get(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection('127.0.0.1', self.port)
+        self.writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status = int(head[9:12])
+        headers = head.decode('latin-1').lower()
+        length = int(headers.split('content-length:')[1].split('\r\n')[0])
+        body = await self.reader.readexactly(length)
+        if 'connection: close' in headers or head.startswith(b'HTTP/1.0'):
+            self.close()
+        return status, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+async def wait_ready(port):
+    for _ in range(100):
+        try:
+            await Connection(port).get('/')
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"Сервер на порту {port} не запустився")
+
+
+def seed(port):
+    """Доповнює таблицю до SEED_BOOKS книг через POST /books; повертає кількість книг"""
+    base_url = f'http://127.0.0.1:{port}'
+    total = httpx.get(base_url + '/books', params={'limit': 1, 'count': 'exact'}).json()['meta']['total']
+    missing = SEED_BOOKS - total
+    while missing > 0:
+        batch = [{'title': f"Bench book {i}", 'author': f"Author {i % 500}", 'year': 1900 + i % 120}
+                 for i in range(min(missing, 5000))]
+        httpx.post(base_url + '/books', json=batch, timeout=60)
+        missing -= len(batch)
+    return max(total, SEED_BOOKS)
+
+
+async def worker(port, deadline, max_id, latencies, errors, rnd):
+    connection = Connection(port)
+    while time.perf_counter() < deadline:
+        if rnd.random() < 0.5:
+            path = f"/books?offset={rnd.randint(0, 1000)}&limit=10&count=estimated"
+        else:
+            path = f"/books/{rnd.randint(1, max_id)}"
+        started = time.perf_counter()
+        try:
+            status, _ = await connection.get(path)
+        except (OSError, asyncio.IncompleteReadError) as err:
+            connection.close()
+            errors.append(type(err).__name__)
+            continue
+        if status >= 500:
+            errors.append(status)
+        else:
+            latencies.append(time.perf_counter() - started)
+    connection.close()
+
+
+async def run_load(port, max_id, concurrency, duration):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        worker(port, deadline, max_id, latencies, errors, random.Random(i))
+        for i in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000 if latencies else float('nan')
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float('nan')
+    return len(latencies) / elapsed, p50, p99, len(errors)
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else CONCURRENCY
+    duration = int(sys.argv[2]) if len(sys.argv) > 2 else DURATION
+    here = os.path.dirname(os.path.abspath(__file__))
+    print(f"клієнтів: {concurrency}, тривалість: {duration} с")
+    print(f"{'варіант':>8} {'запитів/с':>10} {'p50, мс':>9} {'p99, мс':>9} {'помилок':>8}")
+    for name, command in SERVERS.items():
+        server = subprocess.Popen(command, cwd=here, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            asyncio.run(wait_ready(PORTS[name]))
+            max_id = seed(PORTS[name])
+            rps, p50, p99, errors = asyncio.run(run_load(PORTS[name], max_id, concurrency, duration))
+        finally:
+            server.terminate()
+            server.wait()
+        print(f"{name:>8} {rps:>10.0f} {p50:>9.1f} {p99:>9.1f} {errors:>8}")
+
+
+if __name__ == "__main__":
+    main()
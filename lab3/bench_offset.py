@@ -0,0 +1,87 @@
+"""
+Бенчмарк GET /books з глибоким offset: звичайний OFFSET проти deferred join.
+
+Таблиця books заповнюється до потрібного розміру (generate_series), після
+чого VACUUM ANALYZE оновлює visibility map для index-only scan. На кожній
+глибині з DEPTHS обидва запити виконуються REPEATS разів; друкується
+медіана латентності та смуга, пропорційна їй (графік латентності від
+глибини). Вимірюється лише вибірка сторінки, без COUNT(*) та серіалізації.
+
+old - Book.query.order_by(Book.id).offset(...).limit(...) (як було)
+new - offset_page_statement (id сторінки з первинного ключа, потім JOIN)
+
+Запуск (після python migrate.py): DATABASE_URL=... python bench_offset.py [рядків]
+"""
+import statistics
+import sys
+import time
+
+from sqlalchemy import text
+
+from app import create_app
+from app.database import db
+from app.models import Book
+from app.pagination import offset_page_statement
+
+DEFAULT_ROWS = 3_000_000
+DEPTHS = [0, 1_000, 10_000, 100_000, 500_000, 1_000_000, 2_000_000]
+PAGE_SIZE = 10
+REPEATS = 5
+BAR_WIDTH = 40
+
+
+def seed(size):
+    """Доповнює таблицю books до size рядків і готує її до index-only scan"""
+    existing = Book.query.count()
+    if existing < size:
+        db.session.execute(text("""
+            INSERT INTO books (title, author, year)
+            SELECT 'Book title number ' || i, 'Author ' || (i % 5000), 1500 + i % 525
+            FROM generate_series(:start, :stop) AS i
+        """), {'start': existing, 'stop': size - 1})
+        db.session.commit()
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        conn.execute(text('VACUUM ANALYZE books'))
+
+
+def old_page(offset):
+    return Book.query.order_by(Book.id).offset(offset).limit(PAGE_SIZE).all()
+
+
+def new_page(offset):
+    return db.session.execute(offset_page_statement(offset, PAGE_SIZE)).all()
+
+
+def measure(page, offset):
+    """Медіана латентності сторінки, мс"""
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        page(offset)
+        timings.append((time.perf_counter() - started) * 1000)
+        db.session.expunge_all()
+    return statistics.median(timings)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    app = create_app()
+    with app.app_context():
+        seed(rows)
+        depths = [depth for depth in DEPTHS if depth < rows]
+        results = []
+        for depth in depths:
+            assert [book.id for book in old_page(depth)] == [row.id for row in new_page(depth)]
+            results.append((depth, measure(old_page, depth), measure(new_page, depth)))
+
+    scale = BAR_WIDTH / max(max(old_ms, new_ms) for _, old_ms, new_ms in results)
+    print(f"рядків: {rows}, limit: {PAGE_SIZE}")
+    print(f"{'offset':>10} {'old, мс':>9} {'new, мс':>9}")
+    for depth, old_ms, new_ms in results:
+        print(f"{depth:>10} {old_ms:>9.2f} {new_ms:>9.2f}")
+        print(f"{'old':>10} {'#' * max(1, round(old_ms * scale))}")
+        print(f"{'new':>10} {'=' * max(1, round(new_ms * scale))}")
+
+
+if __name__ == "__main__":
+    main()
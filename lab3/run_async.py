@@ -0,0 +1,8 @@
+import os
+import uvicorn
+
+# Кількість воркерів uvicorn; кожен має власний пул з'єднань (DB_POOL_SIZE)
+WORKERS = int(os.environ.get("UVICORN_WORKERS", "1"))
+
+if __name__ == "__main__":
+    uvicorn.run("app.async_routes:app", host="0.0.0.0", port=5000, workers=WORKERS)
@@ -1,23 +1,50 @@
 import os
+import secrets
 from flask import Flask
 from app.database import db
+from app.replicas import init_replicas
 
 def create_app():
     app = Flask(__name__)
     
     app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
         'DATABASE_URL',
-        'postgresql://postgres:postgres@db:5432/bookdb'
+        'postgresql+psycopg2://postgres:postgres@db:5432/bookdb'
     )
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Таблиця-лічильник з тригерами для точного meta.total за O(1)
+    app.config['BOOKS_COUNTER'] = os.environ.get('BOOKS_COUNTER', '0') == '1'
+    # Репліки для read-only маршрутів (через кому); DATABASE_URL лишається primary для записів
+    app.config['DATABASE_REPLICA_URLS'] = [
+        url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()
+    ]
+    # Як часто перевіряти відтворений WAL та відставання кожної репліки, секунд
+    app.config['REPLICA_CHECK_SECONDS'] = float(os.environ.get('REPLICA_CHECK_SECONDS', '1'))
+    # Репліка, що відстає від primary більше, не отримує запитів, секунд
+    app.config['REPLICA_MAX_LAG_SECONDS'] = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', '5'))
+    # Скільки секунд недоступна репліка не отримує запитів
+    app.config['REPLICA_RETRY_SECONDS'] = float(os.environ.get('REPLICA_RETRY_SECONDS', '30'))
+    # pg_trgm для GET /books/search?mode=fuzzy (розширення має бути доступне в Postgres)
+    app.config['BOOKS_TRGM'] = os.environ.get('BOOKS_TRGM', '0') == '1'
+    # Поріг word_similarity для mode=fuzzy: 0.5 знаходить опечатку в одну літеру в
+    # коротких словах, але на схожих назвах кандидатів стає набагато більше
+    app.config['BOOKS_TRGM_THRESHOLD'] = float(os.environ.get('BOOKS_TRGM_THRESHOLD', '0.6'))
+    # Ключ для HMAC-підпису cursor у GET /books. Без нього cursor можна підробити,
+    # тож поза debug-режимом (FLASK_DEBUG=1) застосунок без ключа не стартує
+    app.config['CURSOR_SECRET'] = os.environ.get('CURSOR_SECRET')
+    if not app.config['CURSOR_SECRET']:
+        if not app.debug:
+            raise RuntimeError("Не задано CURSOR_SECRET (ключ підпису cursor); для розробки - FLASK_DEBUG=1")
+        # Випадковий ключ процесу: cursor не переживають перезапуск
+        app.config['CURSOR_SECRET'] = secrets.token_hex(32)
     
    
     db.init_app(app)
+    init_replicas(app, app.config['DATABASE_REPLICA_URLS'])
     
     from app.routes import register_routes
     register_routes(app)
     
-    with app.app_context():
-        db.create_all()
+    # Схема (таблиці, індекси, лічильник) створюється окремим кроком: python migrate.py
     
     return app
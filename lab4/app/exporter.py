@@ -0,0 +1,68 @@
+import csv
+import io
+import itertools
+import zlib
+
+from sqlalchemy import select
+
+from app.models import Book
+from app.serialization import BOOK_COLUMNS, BOOK_FIELDS, rows_to_dicts, dumps
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+EXPORT_MIMETYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+# Скільки рядків за раз забирається з серверного cursor і кодується в один шматок відповіді
+BATCH_ROWS = 5_000
+
+
+def encode_csv(rows, header=False):
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator='\n')
+    if header:
+        writer.writerow(BOOK_FIELDS)
+    writer.writerows(rows)
+    return out.getvalue().encode('utf-8')
+
+
+def encode_ndjson(rows):
+    return b''.join(dumps(book) + b'\n' for book in rows_to_dicts(rows))
+
+
+def iter_rows(engine):
+    """
+    Пачки рядків books у порядку id з іменованого серверного cursor
+
+    Окреме з'єднання, а не сесія запиту: генератор відповіді виконується
+    вже після виходу з view, а з'єднання має жити до кінця вивантаження.
+    У пам'яті одночасно лише одна пачка.
+    """
+    statement = select(*BOOK_COLUMNS).order_by(Book.id)
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=BATCH_ROWS).execute(statement)
+        for rows in result.partitions():
+            yield rows
+
+
+def iter_export(engine, fmt, compress=False):
+    """
+    Байти вивантаження у форматі fmt, шматками по BATCH_ROWS рядків
+
+    Args:
+        engine: Engine, з якого читати (primary або репліка)
+        fmt: csv або ndjson
+        compress: стискати gzip на льоту
+    """
+    gzip = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+    encode = encode_csv if fmt == 'csv' else encode_ndjson
+    # Заголовок CSV окремим шматком, щоб він був і в порожньому вивантаженні
+    header = [encode_csv([], header=True)] if fmt == 'csv' else []
+
+    for chunk in itertools.chain(header, map(encode, iter_rows(engine))):
+        if gzip is None:
+            yield chunk
+            continue
+        compressed = gzip.compress(chunk)
+        if compressed:
+            yield compressed
+    if gzip is not None:
+        yield gzip.flush()
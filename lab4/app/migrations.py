@@ -0,0 +1,169 @@
+from sqlalchemy import text
+
+MIGRATIONS_TABLE = 'schema_migrations'
+
+# Довільний, але сталий ключ advisory lock: дві паралельні міграції чекають одна на одну
+LOCK_KEY = 0x626F6F6B
+# Рядків на одну транзакцію заповнення нової колонки
+BACKFILL_BATCH = 10000
+
+
+class NoTransaction(list):
+    """
+    Кроки міграції, що виконуються поза транзакцією, кожен окремо
+
+    Потрібно для CREATE/DROP INDEX CONCURRENTLY. Перервана міграція
+    повторюється з першого кроку, тож кроки мають бути ідемпотентними.
+    """
+
+
+def create_index_concurrently(name, definition, replace=False):
+    """
+    Крок міграції: CREATE INDEX CONCURRENTLY, який не блокує записи в таблицю
+
+    Перерваний CREATE INDEX CONCURRENTLY лишає INVALID-індекс з тим самим
+    ім'ям: такий індекс видаляється і будується заново, а готовий
+    лишається. З replace=True наявний індекс перебудовується завжди (коли
+    змінилось його визначення).
+    """
+    def step(conn):
+        valid = conn.execute(
+            text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"), {'name': name}
+        ).scalar()
+        if valid and not replace:
+            return
+        if valid is not None:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY {name}"))
+        conn.execute(text(f"CREATE INDEX CONCURRENTLY {name} ON {definition}"))
+    return step
+
+
+def backfill_search_vector(conn):
+    """
+    Крок міграції: заповнює search_vector наявних книг пакетами за id
+
+    Кожен пакет - окрема коротка транзакція (з'єднання в autocommit), тож
+    рядки не блокуються на весь час заповнення. Нові та змінені книги вже
+    заповнює тригер, а вже заповнені рядки пропускаються.
+    """
+    max_id = conn.execute(text("SELECT coalesce(max(id), 0) FROM books")).scalar()
+    for start in range(0, max_id, BACKFILL_BATCH):
+        conn.execute(text("""
+            UPDATE books
+            SET search_vector = setweight(to_tsvector('simple', title), 'A')
+                || setweight(to_tsvector('simple', author), 'B')
+            WHERE id > :start AND id <= :end AND search_vector IS NULL
+        """), {'start': start, 'end': start + BACKFILL_BATCH})
+
+# (версія, назва, кроки). Крок - SQL-рядок або функція від з'єднання.
+# Версії лише додаються в кінець і не змінюються
+MIGRATIONS = [
+    (1, 'create_books', [
+        """
+        CREATE TABLE IF NOT EXISTS books (
+            id SERIAL PRIMARY KEY,
+            title VARCHAR(200) NOT NULL,
+            author VARCHAR(100) NOT NULL,
+            year INTEGER NOT NULL
+        )
+        """,
+    ]),
+    (2, 'books_keyset_indexes', NoTransaction([
+        # Складені індекси під keyset-пагінацію GET /books для типових сортувань;
+        # CONCURRENTLY, щоб на наявній таблиці не зупиняти записи на час побудови.
+        # Індекс за автором раніше створювався create_all без INCLUDE - замінюємо.
+        # sort=author,year: покривний, сторінка читається index-only scan
+        create_index_concurrently(
+            'ix_books_author_year_id', "books (author, year, id) INCLUDE (title)", replace=True,
+        ),
+        create_index_concurrently('ix_books_title_id', "books (title, id)"),
+        create_index_concurrently('ix_books_year_id', "books (year, id)"),
+        # Сортування за замовчуванням (id): покривний індекс замість звернень до таблиці
+        create_index_concurrently('ix_books_id_covering', "books (id) INCLUDE (title, author, year)"),
+    ])),
+    (3, 'books_search_vector', NoTransaction([
+        # Звичайна колонка, яку заповнює тригер: ADD COLUMN без значення за
+        # замовчуванням не перезаписує таблицю (на відміну від STORED-колонки).
+        # Заголовок важить більше за автора (ваги A та B для ts_rank)
+        "ALTER TABLE books ADD COLUMN IF NOT EXISTS search_vector tsvector",
+        """
+        CREATE OR REPLACE FUNCTION books_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := setweight(to_tsvector('simple', NEW.title), 'A')
+                || setweight(to_tsvector('simple', NEW.author), 'B');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE OR REPLACE TRIGGER books_search_vector
+        BEFORE INSERT OR UPDATE OF title, author ON books
+        FOR EACH ROW EXECUTE FUNCTION books_search_vector_update()
+        """,
+        # Після тригера: рядки, записані під час заповнення, вже мають вектор
+        backfill_search_vector,
+        create_index_concurrently('ix_books_search_vector', "books USING GIN (search_vector)"),
+    ])),
+]
+
+
+def current_version(conn):
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+            version integer PRIMARY KEY,
+            name text NOT NULL,
+            applied_at timestamptz NOT NULL DEFAULT now()
+        )
+    """))
+    return conn.execute(text(f"SELECT coalesce(max(version), 0) FROM {MIGRATIONS_TABLE}")).scalar()
+
+
+def run_step(conn, step):
+    if callable(step):
+        step(conn)
+    else:
+        conn.execute(text(step))
+
+
+def migrate(engine, target=None):
+    """
+    Застосовує міграції, новіші за поточну версію схеми
+
+    Кожна міграція виконується у власній транзакції разом із записом у
+    schema_migrations, тож перервана міграція не лишає схему напівзміненою.
+    Кроки NoTransaction виконуються в режимі autocommit на окремому
+    з'єднанні, а запис у schema_migrations додається після останнього.
+
+    Args:
+        target: Версія, до якої мігрувати (за замовчуванням - остання)
+
+    Returns:
+        list: Застосовані міграції [(версія, назва), ...]
+    """
+    applied = []
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {'key': LOCK_KEY})
+        conn.commit()
+        try:
+            with conn.begin():
+                version = current_version(conn)
+            for number, name, steps in MIGRATIONS:
+                if number <= version or (target is not None and number > target):
+                    continue
+                if isinstance(steps, NoTransaction):
+                    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as autocommit:
+                        for step in steps:
+                            run_step(autocommit, step)
+                    steps = []
+                with conn.begin():
+                    for step in steps:
+                        run_step(conn, step)
+                    conn.execute(
+                        text(f"INSERT INTO {MIGRATIONS_TABLE} (version, name) VALUES (:version, :name)"),
+                        {'version': number, 'name': name},
+                    )
+                applied.append((number, name))
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {'key': LOCK_KEY})
+            conn.commit()
+    return applied
@@ -1,12 +1,20 @@
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from app.database import db
 
 class Book(db.Model):
     __tablename__ = 'books'
+    # Індекси створюються міграціями (app/migrations.py)
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     author = db.Column(db.String(100), nullable=False)
     year = db.Column(db.Integer, nullable=False)
+    # Колонка для повнотекстового пошуку, яку заповнює тригер (міграція 3):
+    # FetchedValue, щоб INSERT не передавав NULL; deferred, щоб звичайні
+    # запити її не вибирали
+    search_vector = db.deferred(db.Column(
+        TSVECTOR, server_default=db.FetchedValue(), server_onupdate=db.FetchedValue(),
+    ))
     
     def to_dict(self):
         return {
@@ -0,0 +1,163 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+
+from sqlalchemy import and_, or_, tuple_
+
+from app.models import Book
+
+# Колонки, за якими дозволено сортувати GET /books
+SORT_COLUMNS = {
+    'id': Book.id,
+    'title': Book.title,
+    'author': Book.author,
+    'year': Book.year,
+}
+
+
+# Сортування, для якого видавались непідписані cursor base64(id)
+LEGACY_SORT = [('id', False)]
+# Типи значень ключа k у cursor (значення колонок та score пошуку)
+CURSOR_SCALARS = (str, int, float)
+
+
+class CursorError(ValueError):
+    """Невірний, підроблений або чужий cursor"""
+
+
+def parse_sort(sort):
+    """
+    Розбирає параметр sort на список (назва, спадання)
+
+    Args:
+        sort: Рядок виду "author,year,-title"
+
+    Returns:
+        list: [(name, descending), ...], завжди закінчується на id
+    """
+    fields = []
+    for part in (sort or 'id').split(','):
+        part = part.strip()
+        name = part.lstrip('-')
+        if name not in SORT_COLUMNS:
+            raise ValueError(f"Невідоме поле сортування: {name}")
+        if any(name == existing for existing, _ in fields):
+            raise ValueError(f"Поле {name} вказано двічі")
+        fields.append((name, part.startswith('-')))
+    # id - унікальний, тож додаємо його останнім для однозначного порядку
+    if all(name != 'id' for name, _ in fields):
+        fields.append(('id', all(desc for _, desc in fields)))
+    return fields
+
+
+def sort_signature(fields):
+    return ','.join(('-' if desc else '') + name for name, desc in fields)
+
+
+def order_by_clause(fields):
+    return [SORT_COLUMNS[name].desc() if desc else SORT_COLUMNS[name].asc() for name, desc in fields]
+
+
+def keyset_condition(fields, values):
+    """
+    Умова "рядок після cursor" для keyset-пагінації
+
+    Якщо всі напрямки однакові, це одне порівняння row value
+    (author, year, id) > (:a, :y, :id), яке Postgres виконує як seek по
+    складеному індексу. Для змішаних напрямків умова розгортається в
+    (a > :a) OR (a = :a AND y < :y) OR ...
+    """
+    columns = [SORT_COLUMNS[name] for name, _ in fields]
+    directions = {desc for _, desc in fields}
+    if len(directions) == 1:
+        if directions.pop():
+            return tuple_(*columns) < tuple_(*values)
+        return tuple_(*columns) > tuple_(*values)
+
+    alternatives = []
+    for i, ((_, desc), column, value) in enumerate(zip(fields, columns, values)):
+        equal_prefix = [prefix == prefix_value for prefix, prefix_value in zip(columns[:i], values[:i])]
+        alternatives.append(and_(*equal_prefix, column < value if desc else column > value))
+    return or_(*alternatives)
+
+
+def _signature(payload, secret):
+    digest = hmac.new(secret.encode(), payload, hashlib.sha256).digest()[:16]
+    return base64.urlsafe_b64encode(digest).rstrip(b'=')
+
+
+def sign_cursor(data, secret):
+    """Непрозорий cursor: base64url(JSON) + "." + скорочений HMAC-SHA256"""
+    payload = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode()
+    payload = base64.urlsafe_b64encode(payload).rstrip(b'=')
+    return (payload + b'.' + _signature(payload, secret)).decode()
+
+
+def unsign_cursor(cursor, secret):
+    """
+    Перевіряє підпис cursor та повертає його дані
+
+    Returns:
+        dict: Дані cursor; k - список скалярних значень
+
+    Raises:
+        CursorError: cursor пошкоджений, підпис не збігається або дані
+                     не мають формату {'k': [...], ...}
+    """
+    try:
+        payload, signature = cursor.encode().split(b'.')
+    except ValueError:
+        raise CursorError("Невірний формат cursor")
+    if not hmac.compare_digest(signature, _signature(payload, secret)):
+        raise CursorError("Невірний підпис cursor")
+    try:
+        data = json.loads(base64.urlsafe_b64decode(payload + b'=' * (-len(payload) % 4)))
+    except ValueError:
+        raise CursorError("Невірний формат cursor")
+    # Підпис лише засвідчує, що cursor видано з цим ключем; формат перевіряємо окремо
+    if not isinstance(data, dict) or not isinstance(data.get('k'), list):
+        raise CursorError("Невірний формат cursor")
+    if not all(isinstance(value, CURSOR_SCALARS) for value in data['k']):
+        raise CursorError("Невірний формат cursor")
+    return data
+
+
+def encode_cursor(fields, book, secret):
+    """Підписаний cursor з повним ключем сортування останнього рядка"""
+    return sign_cursor({
+        's': sort_signature(fields),
+        'k': [getattr(book, name) for name, _ in fields],
+    }, secret)
+
+
+def decode_legacy_cursor(cursor):
+    """
+    Id з cursor старого формату base64(id) (до підписаних cursor)
+
+    Приймається ще один реліз, щоб клієнти, які гортали сторінки під час
+    оновлення, дочитали їх; після цього функцію можна прибрати.
+    """
+    try:
+        return int(base64.b64decode(cursor.encode(), validate=True).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise CursorError("Невірний формат cursor")
+
+
+def decode_cursor(cursor, fields, secret):
+    """
+    Перевіряє підпис cursor та повертає значення ключа сортування
+
+    Cursor без "." (у base64 крапки немає) - старий формат, який дозволений
+    лише для сортування за id.
+
+    Raises:
+        CursorError: підпис не збігається або cursor видано для іншого sort
+    """
+    if '.' not in cursor and fields == LEGACY_SORT:
+        return [decode_legacy_cursor(cursor)]
+    data = unsign_cursor(cursor, secret)
+    if data.get('s') != sort_signature(fields) or len(data.get('k', [])) != len(fields):
+        raise CursorError("Cursor виданий для іншого сортування")
+    return data['k']
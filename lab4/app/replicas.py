@@ -0,0 +1,187 @@
+import itertools
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, has_app_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+# Позиція WAL primary після останнього успішного запису клієнта (LSN числом):
+# відповідь на запис повертає її в заголовку та cookie, клієнт надсилає назад
+# будь-яким з них
+LAST_WRITE_HEADER = 'X-Last-Write-LSN'
+LAST_WRITE_COOKIE = 'last_write'
+
+WRITE_LSN_SQL = text("SELECT pg_wal_lsn_diff(pg_current_wal_insert_lsn(), '0/0')::bigint")
+# Відтворений LSN та відставання репліки в секундах. Якщо весь отриманий WAL
+# відтворено, відставання 0: час останньої транзакції росте й тоді, коли
+# на primary просто немає записів. Невідоме відставання (з запуску репліки
+# не відтворено жодної транзакції) вважається нескінченним
+REPLICA_STATUS_SQL = text("""
+    SELECT coalesce(pg_wal_lsn_diff(
+               CASE WHEN pg_is_in_recovery() THEN pg_last_wal_replay_lsn() ELSE pg_current_wal_lsn() END, '0/0'
+           ), 0)::bigint AS lsn,
+           CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp())::float, 'Infinity')
+           END AS lag
+""")
+
+
+class ReplicaRouter:
+    """
+    Пул engine'ів реплік для read-only маршрутів.
+
+    Репліки обираються по колу серед здорових. Стан репліки (відтворений
+    LSN та відставання, REPLICA_STATUS_SQL) викликач перевіряє не частіше
+    ніж раз на check_seconds; репліка з відставанням понад max_lag_seconds
+    пропускається. Репліка, на якій запит упав з помилкою з'єднання,
+    вважається недоступною retry_seconds секунд. Якщо підходящих реплік
+    немає, читання йде на primary.
+    """
+
+    def __init__(self, urls, engine_options=None, retry_seconds=30, check_seconds=1, max_lag_seconds=5):
+        self.engines = [create_engine(url, **(engine_options or {})) for url in urls]
+        self.retry_seconds = retry_seconds
+        self.check_seconds = check_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self._down_until = {engine: 0.0 for engine in self.engines}
+        self._checked_at = {engine: None for engine in self.engines}
+        # (lsn, lag) останньої перевірки; None - репліка ще не перевірена
+        self._status = {engine: None for engine in self.engines}
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    def due_checks(self):
+        """
+        Доступні репліки, стан яких пора перевірити
+
+        Перевірка вважається розпочатою одразу, тож паралельні запити не
+        перевіряють ту саму репліку вдруге.
+        """
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                engine for engine in self.engines
+                if self._down_until[engine] <= now
+                and (self._checked_at[engine] is None or now - self._checked_at[engine] >= self.check_seconds)
+            ]
+            for engine in due:
+                self._checked_at[engine] = now
+        return due
+
+    def record(self, engine, lsn, lag):
+        """Результат перевірки стану репліки"""
+        with self._lock:
+            self._status[engine] = (lsn, lag)
+
+    def choose(self, min_lsn=0):
+        """Наступна доступна репліка, що відтворила WAL щонайменше до min_lsn, або None"""
+        now = time.monotonic()
+        with self._lock:
+            start = next(self._turn)
+            for offset in range(len(self.engines)):
+                engine = self.engines[(start + offset) % len(self.engines)]
+                status = self._status[engine]
+                if self._down_until[engine] > now or status is None:
+                    continue
+                lsn, lag = status
+                if lag <= self.max_lag_seconds and lsn >= min_lsn:
+                    return engine
+        return None
+
+    def mark_down(self, engine):
+        with self._lock:
+            self._down_until[engine] = time.monotonic() + self.retry_seconds
+            # Після паузи репліка знову перевіряється до першого запиту
+            self._status[engine] = None
+            self._checked_at[engine] = None
+        # З'єднання до впалої репліки в пулі вже непридатні
+        engine.dispose()
+
+
+class RoutingSession(Session):
+    """Сесія Flask-SQLAlchemy, що в read-only маршрутах читає з репліки"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context():
+            engine = g.get('read_engine')
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def last_write_lsn(headers, cookies):
+    """LSN останнього запису клієнта із заголовка або cookie; 0 - записів не було"""
+    value = headers.get(LAST_WRITE_HEADER) or cookies.get(LAST_WRITE_COOKIE)
+    try:
+        return max(int(value or 0), 0)
+    except ValueError:
+        return 0
+
+
+def check_replicas(router):
+    """Перевіряє стан реплік, яким настав час перевірки"""
+    for engine in router.due_checks():
+        try:
+            with engine.connect() as conn:
+                router.record(engine, *conn.execute(REPLICA_STATUS_SQL).one())
+        except OperationalError:
+            router.mark_down(engine)
+
+
+def read_only(view):
+    """
+    Виконує маршрут на репліці, якщо вони налаштовані
+
+    Після власного запису клієнт читає лише з реплік, що вже відтворили
+    його LSN (read-your-writes), інакше з primary. Якщо репліка недоступна,
+    вона позначається впалою, а маршрут (він лише читає) виконується ще
+    раз на primary.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        router = current_app.extensions.get('replicas')
+        engine = None
+        if router is not None:
+            check_replicas(router)
+            engine = router.choose(last_write_lsn(request.headers, request.cookies))
+        if engine is None:
+            return view(*args, **kwargs)
+
+        session = current_app.extensions['sqlalchemy'].session
+        g.read_engine = engine
+        try:
+            return view(*args, **kwargs)
+        except OperationalError:
+            session.rollback()
+            router.mark_down(engine)
+            g.read_engine = None
+            return view(*args, **kwargs)
+        finally:
+            g.pop('read_engine', None)
+    return wrapper
+
+
+def init_replicas(app, urls):
+    """Підключає репліки з DATABASE_REPLICA_URLS та позначення записів клієнта"""
+    if not urls:
+        return
+    app.extensions['replicas'] = ReplicaRouter(
+        urls,
+        app.config.get('SQLALCHEMY_ENGINE_OPTIONS'),
+        app.config['REPLICA_RETRY_SECONDS'],
+        app.config['REPLICA_CHECK_SECONDS'],
+        app.config['REPLICA_MAX_LAG_SECONDS'],
+    )
+
+    @app.after_request
+    def remember_write(response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+            # Після коміту запису: позиція WAL primary не менша за позицію коміту
+            with app.extensions['sqlalchemy'].engine.connect() as conn:
+                lsn = str(conn.execute(WRITE_LSN_SQL).scalar())
+            response.headers[LAST_WRITE_HEADER] = lsn
+            response.set_cookie(LAST_WRITE_COOKIE, lsn, httponly=True)
+        return response
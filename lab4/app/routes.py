@@ -1,9 +1,19 @@
 from flask import request, jsonify, current_app, url_for
+from sqlalchemy import select, update
 from app.database import db
+from app.replicas import read_only
 from app.models import Book
 from app.schemas import book_schema, books_schema
+from app.counting import COUNT_MODES, count_books
+from app.importer import IMPORT_FORMATS, import_books
+from app.exporter import EXPORT_FORMATS, EXPORT_MIMETYPES, iter_export
+from app.pagination import (
+    CursorError, parse_sort, sort_signature, order_by_clause, keyset_condition,
+    encode_cursor, decode_cursor, sign_cursor, unsign_cursor
+)
+from app.search import SEARCH_MODES, search_statement, similarity_threshold_statement
+from app.serialization import BOOK_COLUMNS, rows_to_dicts, json_response
 from marshmallow import ValidationError
-import base64
 
 def register_routes(app):
     @app.route('/')
@@ -11,6 +21,7 @@ def register_routes(app):
         return "Головна сторінка API бібліотеки"
 
     @app.route('/books', methods=['GET'])
+    @read_only
     def get_books():
         cursor = request.args.get('cursor', default=None)
         limit = request.args.get('limit', default=10, type=int)
@@ -18,18 +29,30 @@ def register_routes(app):
         if limit > 100:
             limit = 100
         
-        total_books = Book.query.count()
+        try:
+            sort_fields = parse_sort(request.args.get('sort'))
+        except ValueError as err:
+            return jsonify({"error": str(err)}), 400
+        
+        # exact (за замовчуванням) - COUNT(*) або лічильник, estimated - статистика планувальника, none - без total
+        use_counter = current_app.config['BOOKS_COUNTER']
+        count_mode = request.args.get('count', default='exact')
+        if count_mode not in COUNT_MODES:
+            return jsonify({"error": f"count має бути одним з: {', '.join(COUNT_MODES)}"}), 400
+        
+        total_books = count_books(db.session, count_mode, use_counter)
         
-        query = Book.query.order_by(Book.id)
+        # Кортежі колонок замість об'єктів Book: без гідратації ORM та marshmallow
+        statement = select(*BOOK_COLUMNS).order_by(*order_by_clause(sort_fields))
         
         if cursor:
             try:
-                cursor_id = int(base64.b64decode(cursor.encode()).decode())
-                query = query.filter(Book.id > cursor_id)
+                cursor_values = decode_cursor(cursor, sort_fields, current_app.config['CURSOR_SECRET'])
             except (ValueError, TypeError):
                 return jsonify({"error": "Невірний формат cursor"}), 400
+            statement = statement.where(keyset_condition(sort_fields, cursor_values))
         
-        books = query.limit(limit + 1).all()
+        books = db.session.execute(statement.limit(limit + 1)).all()
         
         has_next = len(books) > limit
         if has_next:
@@ -37,21 +60,87 @@ def register_routes(app):
         
         next_cursor = None
         if has_next and books:
-            last_id = books[-1].id
-            next_cursor = base64.b64encode(str(last_id).encode()).decode()
+            next_cursor = encode_cursor(sort_fields, books[-1], current_app.config['CURSOR_SECRET'])
         
-        result = books_schema.dump(books)
+        return json_response({
+            'data': rows_to_dicts(books),
+            'meta': {
+                'total': total_books,
+                'count': count_mode,
+                'limit': limit,
+                'sort': sort_signature(sort_fields),
+                'next_cursor': next_cursor
+            }
+        })
+
+    @app.route('/books/search', methods=['GET'])
+    @read_only
+    def search_books():
+        query = request.args.get('q', default='').strip()
+        mode = request.args.get('mode', default='fts')
+        cursor = request.args.get('cursor', default=None)
+        limit = min(max(request.args.get('limit', default=10, type=int), 1), 100)
+        
+        if not query:
+            return jsonify({"error": "Параметр q обов'язковий"}), 400
+        if mode not in SEARCH_MODES:
+            return jsonify({"error": f"mode має бути одним з: {', '.join(SEARCH_MODES)}"}), 400
+        if mode == 'fuzzy' and not current_app.config['BOOKS_TRGM']:
+            return jsonify({"error": "Нечіткий пошук вимкнено (BOOKS_TRGM)"}), 400
+        
+        # Cursor прив'язаний до запиту й режиму: k - (score, id) останньої книги сторінки
+        signature = f"search:{mode}:{query}"
+        after = None
+        if cursor:
+            try:
+                data = unsign_cursor(cursor, current_app.config['CURSOR_SECRET'])
+                if data.get('s') != signature:
+                    raise CursorError("Cursor виданий для іншого запиту")
+                after = tuple(data['k'])
+            except (ValueError, TypeError, KeyError):
+                return jsonify({"error": "Невірний формат cursor"}), 400
+        
+        statement = search_statement(query, mode, limit + 1, after)
+        if statement is not None and mode == 'fuzzy':
+            db.session.execute(similarity_threshold_statement(current_app.config['BOOKS_TRGM_THRESHOLD']))
+        rows = db.session.execute(statement).all() if statement is not None else []
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = sign_cursor({'s': signature, 'k': [last.score, last.id]}, current_app.config['CURSOR_SECRET'])
         
         return jsonify({
-            'data': result,
+            'data': [dict(book_schema.dump(row), score=round(row.score, 4)) for row in rows],
             'meta': {
-                'total': total_books,
+                'q': query,
+                'mode': mode,
                 'limit': limit,
                 'next_cursor': next_cursor
             }
         })
 
+    @app.route('/books/export', methods=['GET'])
+    @read_only
+    def export_books():
+        fmt = request.args.get('format', default='ndjson')
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({"error": f"format має бути одним з: {', '.join(EXPORT_FORMATS)}"}), 400
+        
+        # Engine фіксується тут: генератор читає вже після виходу з view (і з @read_only)
+        engine = db.session.get_bind()
+        compress = 'gzip' in request.accept_encodings
+        
+        response = current_app.response_class(iter_export(engine, fmt, compress), mimetype=EXPORT_MIMETYPES[fmt])
+        response.headers['Content-Disposition'] = f'attachment; filename=books.{fmt}'
+        response.headers['Vary'] = 'Accept-Encoding'
+        if compress:
+            response.headers['Content-Encoding'] = 'gzip'
+        return response
+
     @app.route('/books/<int:book_id>', methods=['GET'])
+    @read_only
     def get_book(book_id):
         book = Book.query.get(book_id)
         if not book:
@@ -75,24 +164,55 @@ def register_routes(app):
         except ValidationError as err:
             return jsonify(err.messages), 400
 
-    @app.route('/books/<int:book_id>', methods=['PUT'])
-    def update_book(book_id):
-        book = Book.query.get(book_id)
-        if not book:
-            return jsonify({"error": "Книга не знайдена"}), 404
+    @app.route('/books/import', methods=['POST'])
+    def import_books_stream():
+        # Формат з параметра format або з Content-Type тіла
+        fmt = request.args.get('format')
+        if fmt is None:
+            fmt = {'text/csv': 'csv', 'application/x-ndjson': 'ndjson'}.get(request.mimetype)
+        if fmt not in IMPORT_FORMATS:
+            return jsonify({"error": "Підтримуються лише text/csv та application/x-ndjson"}), 415
         
         try:
-            book_data = book_schema.load(request.json)
-            
-            book.title = book_data['title']
-            book.author = book_data['author']
-            book.year = book_data['year']
-            
-            db.session.commit()
-            
-            return jsonify(book_schema.dump(book))
+            report = import_books(db.session, request.stream, fmt)
+        except ValueError as err:
+            db.session.rollback()
+            return jsonify({"error": str(err)}), 400
+        
+        return jsonify(report), 201
+
+    def update_book_fields(book_id, partial):
+        try:
+            book_data = book_schema.load(request.json, partial=partial)
         except ValidationError as err:
             return jsonify(err.messages), 400
+        
+        if not book_data:
+            return jsonify({"error": "Немає полів для оновлення"}), 400
+        
+        # Один UPDATE ... RETURNING замість get + зміни об'єкта + перечитування після commit;
+        # порожній RETURNING означає, що книги з таким id немає
+        statement = (
+            update(Book)
+            .where(Book.id == book_id)
+            .values(**book_data)
+            .returning(Book.id, Book.title, Book.author, Book.year)
+            .execution_options(synchronize_session=False)
+        )
+        book = db.session.execute(statement).first()
+        db.session.commit()
+        
+        if book is None:
+            return jsonify({"error": "Книга не знайдена"}), 404
+        return jsonify(book_schema.dump(book))
+
+    @app.route('/books/<int:book_id>', methods=['PUT'])
+    def update_book(book_id):
+        return update_book_fields(book_id, partial=False)
+
+    @app.route('/books/<int:book_id>', methods=['PATCH'])
+    def patch_book(book_id):
+        return update_book_fields(book_id, partial=True)
 
     @app.route('/books/<int:book_id>', methods=['DELETE'])
     def delete_book(book_id):
@@ -0,0 +1,86 @@
+import re
+
+from sqlalchemy import REAL, and_, cast, func, or_, select
+
+from app.migrations import create_index_concurrently, run_step
+from app.models import Book
+
+# fts - повнотекстовий пошук по search_vector (останнє слово - як префікс),
+# fuzzy - схожість триграм pg_trgm, стійка до опечаток
+SEARCH_MODES = ('fts', 'fuzzy')
+
+# Конфігурація без стемінгу: назви та автори бувають українською й англійською
+SEARCH_CONFIG = 'simple'
+
+WORD_RE = re.compile(r"\w+")
+
+TRIGRAM_STEPS = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    create_index_concurrently('ix_books_title_trgm', "books USING GIN (title gin_trgm_ops)"),
+    create_index_concurrently('ix_books_author_trgm', "books USING GIN (author gin_trgm_ops)"),
+]
+
+
+def install_trigram(engine):
+    """
+    Вмикає pg_trgm та створює триграмні GIN-індекси для mode=fuzzy
+
+    Індекси будуються CONCURRENTLY (поза транзакцією), щоб не зупиняти записи.
+    """
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        for step in TRIGRAM_STEPS:
+            run_step(conn, step)
+
+
+def similarity_threshold_statement(threshold):
+    """SELECT, що задає поріг оператора %> до кінця поточної транзакції"""
+    return select(func.set_config('pg_trgm.word_similarity_threshold', str(threshold), True))
+
+
+def tsquery_text(query):
+    """
+    Запит у синтаксисі to_tsquery: усі слова обов'язкові, останнє - префікс
+
+    Слова беруться регулярним виразом, тож оператори tsquery з тексту
+    користувача в запит не потрапляють.
+    """
+    words = WORD_RE.findall(query)
+    if not words:
+        return None
+    return ' & '.join(words[:-1] + [f"{words[-1]}:*"])
+
+
+def search_statement(query, mode, limit, after=None):
+    """
+    SELECT сторінки результатів, впорядкованих за (score DESC, id)
+
+    Args:
+        query: Текст запиту
+        mode: fts або fuzzy
+        limit: Кількість рядків
+        after: (score, id) останнього рядка попередньої сторінки
+
+    Returns:
+        Select або None, якщо в запиті немає жодного слова
+    """
+    if mode == 'fts':
+        tsquery_value = tsquery_text(query)
+        if tsquery_value is None:
+            return None
+        tsquery = func.to_tsquery(SEARCH_CONFIG, tsquery_value)
+        score = func.ts_rank(Book.search_vector, tsquery)
+        # GIN-індекс по search_vector знаходить кандидатів, ранжуються лише вони
+        condition = Book.search_vector.op('@@')(tsquery)
+    else:
+        score = func.greatest(func.word_similarity(query, Book.title), func.word_similarity(query, Book.author))
+        # title %> q те саме, що q <% title: використовує триграмні GIN-індекси.
+        # Поріг - pg_trgm.word_similarity_threshold (similarity_threshold_statement)
+        condition = or_(Book.title.op('%>')(query), Book.author.op('%>')(query))
+
+    statement = select(Book.id, Book.title, Book.author, Book.year, score.label('score')).where(condition)
+    if after is not None:
+        # ts_rank та word_similarity повертають real: порівнюємо як real, інакше
+        # значення з cursor, приведене до double, не збіжеться саме з собою
+        last_score, last_id = cast(after[0], REAL), after[1]
+        statement = statement.where(or_(score < last_score, and_(score == last_score, Book.id > last_id)))
+    return statement.order_by(score.desc(), Book.id).limit(limit)
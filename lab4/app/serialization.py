@@ -0,0 +1,31 @@
+import json
+
+from flask import current_app
+
+from app.models import Book
+
+try:
+    import orjson
+except ImportError:  # без orjson - стандартний json, повільніше, але той самий результат
+    orjson = None
+
+# Колонки, які віддає API; SELECT лише їх повертає кортежі без створення об'єктів Book
+BOOK_COLUMNS = (Book.id, Book.title, Book.author, Book.year)
+BOOK_FIELDS = tuple(column.key for column in BOOK_COLUMNS)
+
+
+def rows_to_dicts(rows):
+    """Рядки select(*BOOK_COLUMNS) у словники того ж вигляду, що й books_schema.dump"""
+    return [dict(zip(BOOK_FIELDS, row)) for row in rows]
+
+
+def dumps(payload):
+    """JSON-байти з відсортованими ключами, як у jsonify"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(payload, status=200):
+    """Відповідь application/json без проходу через jsonify"""
+    return current_app.response_class(dumps(payload), status=status, mimetype='application/json')
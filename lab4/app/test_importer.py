@@ -0,0 +1,95 @@
+import io
+
+import pytest
+
+from app import importer
+from app.importer import copy_blocks, iter_lines, parse_csv, parse_ndjson, validate
+
+
+def lines_of(data, monkeypatch, read_bytes=3):
+    # Маленькі шматки, щоб рядки та символи UTF-8 розривались між read()
+    monkeypatch.setattr(importer, "READ_BYTES", read_bytes)
+    return list(iter_lines(io.BytesIO(data)))
+
+
+class TestIterLines:
+    """Тести для потокового розбиття тіла на рядки"""
+
+    def test_chunks_split_lines_and_characters(self, monkeypatch):
+        data = "title\nКобзар\n\nостанній".encode("utf-8")
+        assert lines_of(data, monkeypatch) == ["title\n", "Кобзар\n", "\n", "останній"]
+
+    def test_bom_is_skipped(self, monkeypatch):
+        assert lines_of("\ufeffa\nb\n".encode("utf-8"), monkeypatch) == ["a\n", "b\n"]
+
+    def test_empty_body(self, monkeypatch):
+        assert lines_of(b"", monkeypatch) == []
+
+    def test_invalid_utf8(self, monkeypatch):
+        with pytest.raises(ValueError):
+            lines_of(b"a\n\xff\xfe\n", monkeypatch)
+
+
+class TestParse:
+    """Тести для розбору CSV та NDJSON"""
+
+    def test_csv_columns_in_any_order(self):
+        lines = ['year, author ,title\n', '1840,Шевченко,"Кобзар, том 1"\n', '\n', '1900,Short\n']
+        assert list(parse_csv(lines)) == [(2, ("Кобзар, том 1", "Шевченко", "1840")), (4, None)]
+
+    def test_csv_quoted_newline_keeps_line_numbers(self):
+        lines = ['title,author,year\n', '"A\n', 'B",C,1\n', 'D,E,2\n']
+        assert list(parse_csv(lines)) == [(3, ("A\nB", "C", "1")), (4, ("D", "E", "2"))]
+
+    def test_csv_missing_columns(self):
+        with pytest.raises(ValueError):
+            list(parse_csv(['title,year\n']))
+
+    def test_csv_empty(self):
+        assert list(parse_csv([])) == []
+
+    def test_ndjson(self):
+        lines = ['{"title": "A", "author": "B", "year": 1999.0}\n', '\n', '[1]\n', '{broken\n', '{"title": "C"}\n']
+        assert list(parse_ndjson(lines)) == [
+            (1, ("A", "B", 1999.0)), (3, None), (4, None), (5, ("C", None, None)),
+        ]
+
+
+class TestValidate:
+    """Тести для валідації рядка імпорту"""
+
+    @pytest.mark.parametrize("year,expected", [
+        (1999, 1999), ("1999", 1999), (" 1999 ", 1999), (1999.0, 1999), (0, 0), (2100, 2100),
+    ])
+    def test_valid_year(self, year, expected):
+        assert validate("T", "A", year) == ("T", "A", expected)
+
+    @pytest.mark.parametrize("year", [None, True, "1999.0", "abc", [1999], -1, 2101, "3000"])
+    def test_invalid_year(self, year):
+        assert validate("T", "A", year).startswith("year:")
+
+    @pytest.mark.parametrize("title,author,field", [
+        ("", "A", "title"), (None, "A", "title"), (5, "A", "title"), ("T", "", "author"),
+        ("x" * 201, "A", "title"), ("T", "x" * 101, "author"),
+        ("a\x00b", "A", "title"), ("T", "\x00", "author"),
+    ])
+    def test_invalid_text(self, title, author, field):
+        assert validate(title, author, 1999).startswith(f"{field}:")
+
+
+class TestCopyBlocks:
+    """Тести для формування тексту COPY"""
+
+    def test_escaping_and_report(self, monkeypatch):
+        monkeypatch.setattr(importer, "BLOCK_ROWS", 2)
+        monkeypatch.setattr(importer, "MAX_REPORTED_ERRORS", 1)
+        report = {'imported': 0, 'rejected': 0, 'errors': []}
+        rows = [
+            (1, ("a\tb", "c\\d", "1")), (2, None), (3, ("e\nf", "g\rh", 2)), (4, ("T", "A", 5000)), (5, ("i", "j", 3)),
+        ]
+        blocks = list(copy_blocks(rows, report))
+        assert blocks == [
+            "a\\tb\tc\\\\d\t1\ne\\nf\tg\\rh\t2\n".encode("utf-8"),
+            b"i\tj\t3\n",
+        ]
+        assert report == {'imported': 3, 'rejected': 2, 'errors': [{'line': 2, 'error': "Невірний формат рядка"}]}
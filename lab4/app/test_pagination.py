@@ -0,0 +1,153 @@
+import base64
+import random
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.dialects import postgresql
+
+from app import pagination
+from app.models import Book
+from app.pagination import (
+    CursorError, decode_cursor, encode_cursor, keyset_condition, order_by_clause, parse_sort,
+    sign_cursor, unsign_cursor,
+)
+
+SECRET = "test-secret"
+COLUMNS = (Book.id, Book.title, Book.author, Book.year)
+
+
+class TestParseSort:
+    """Тести для розбору параметра sort"""
+
+    def test_default_is_id(self):
+        assert parse_sort(None) == [('id', False)]
+
+    def test_id_is_appended_as_tiebreaker(self):
+        assert parse_sort("author,-year") == [('author', False), ('year', True), ('id', False)]
+        # Якщо всі поля за спаданням, id теж за спаданням: умова лишається одним row value
+        assert parse_sort("-author,-year") == [('author', True), ('year', True), ('id', True)]
+
+    def test_explicit_id_keeps_its_position(self):
+        assert parse_sort("-id,year") == [('id', True), ('year', False)]
+
+    @pytest.mark.parametrize("sort", ["isbn", "year,year", "author,-author"])
+    def test_invalid(self, sort):
+        with pytest.raises(ValueError):
+            parse_sort(sort)
+
+
+class TestCursorSignature:
+    """Тести для підпису та перевірки cursor"""
+
+    def test_round_trip(self):
+        data = {'s': 'author,id', 'k': ["Франко", 7]}
+        assert unsign_cursor(sign_cursor(data, SECRET), SECRET) == data
+
+    def test_tampered_payload(self):
+        cursor = sign_cursor({'s': 'id', 'k': [10]}, SECRET)
+        payload, signature = cursor.split('.')
+        forged = base64.urlsafe_b64encode(b'{"s":"id","k":[1000]}').rstrip(b'=').decode()
+        with pytest.raises(CursorError):
+            unsign_cursor(f"{forged}.{signature}", SECRET)
+        with pytest.raises(CursorError):
+            unsign_cursor(f"{payload}.{signature[:-1]}A", SECRET)
+
+    def test_other_secret(self):
+        with pytest.raises(CursorError):
+            unsign_cursor(sign_cursor({'s': 'id', 'k': [1]}, SECRET), "other-secret")
+
+    @pytest.mark.parametrize("cursor", ["", "a.b.c", "nodot", "....."])
+    def test_malformed(self, cursor):
+        with pytest.raises(CursorError):
+            unsign_cursor(cursor, SECRET)
+
+    @pytest.mark.parametrize("data", [
+        [1, 2], "id", 5, None, {'s': 'id'}, {'s': 'id', 'k': 5}, {'s': 'id', 'k': [[1]]}, {'s': 'id', 'k': [{'a': 1}]},
+    ])
+    def test_signed_payload_of_wrong_shape(self, data):
+        with pytest.raises(CursorError):
+            unsign_cursor(sign_cursor(data, SECRET), SECRET)
+        with pytest.raises(CursorError):
+            decode_cursor(sign_cursor(data, SECRET), parse_sort(None), SECRET)
+
+    def test_signed_payload_that_is_not_json(self):
+        payload = base64.urlsafe_b64encode(b'{broken').rstrip(b'=')
+        cursor = sign_cursor({'k': []}, SECRET)
+        forged = payload + b'.' + pagination._signature(payload, SECRET)
+        assert unsign_cursor(cursor, SECRET) == {'k': []}
+        with pytest.raises(CursorError):
+            unsign_cursor(forged.decode(), SECRET)
+
+    def test_cursor_from_other_sort(self):
+        row = Book(id=3, title="T", author="A", year=1900)
+        cursor = encode_cursor(parse_sort("year"), row, SECRET)
+        assert decode_cursor(cursor, parse_sort("year"), SECRET) == [1900, 3]
+        with pytest.raises(CursorError):
+            decode_cursor(cursor, parse_sort("-year"), SECRET)
+
+    def test_legacy_cursor_only_for_id_sort(self):
+        legacy = base64.b64encode(b"42").decode()
+        assert decode_cursor(legacy, parse_sort(None), SECRET) == [42]
+        with pytest.raises(CursorError):
+            decode_cursor(legacy, parse_sort("year"), SECRET)
+        with pytest.raises(CursorError):
+            decode_cursor(base64.b64encode(b"x").decode(), parse_sort(None), SECRET)
+
+
+@pytest.fixture(scope="module")
+def engine():
+    """SQLite у пам'яті з тими самими колонками books, що й у Postgres"""
+    engine = create_engine("sqlite://")
+    rnd = random.Random(0)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE books (id INTEGER PRIMARY KEY, title TEXT, author TEXT, year INTEGER)"))
+        # Мало різних значень - багато рівних ключів, які розрізняє лише id
+        conn.execute(text("INSERT INTO books VALUES (:id, :title, :author, :year)"), [
+            {'id': i, 'title': f"T{rnd.randint(0, 5)}", 'author': rnd.choice("ABC"), 'year': rnd.randint(1, 4)}
+            for i in range(1, 201)
+        ])
+    return engine
+
+
+def walk(engine, fields, page_size=7):
+    """Id усіх рядків, прочитаних сторінками з cursor на останньому рядку"""
+    ids, values = [], None
+    with engine.connect() as conn:
+        while True:
+            statement = select(*COLUMNS).order_by(*order_by_clause(fields)).limit(page_size)
+            if values is not None:
+                statement = statement.where(keyset_condition(fields, values))
+            rows = conn.execute(statement).all()
+            if not rows:
+                return ids
+            ids.extend(row.id for row in rows)
+            values = [getattr(rows[-1], name) for name, _ in fields]
+
+
+def expected_order(engine, fields):
+    with engine.connect() as conn:
+        rows = conn.execute(select(*COLUMNS)).all()
+    # Стабільне сортування від останнього поля до першого
+    for name, desc in reversed(fields):
+        rows.sort(key=lambda row: getattr(row, name), reverse=desc)
+    return [row.id for row in rows]
+
+
+class TestKeysetCondition:
+    """Тести для умови keyset-пагінації"""
+
+    def test_uniform_directions_use_row_value(self):
+        sql = str(keyset_condition(parse_sort("author,year"), ["A", 1, 2]).compile(dialect=postgresql.dialect()))
+        assert sql.startswith("(books.author, books.year, books.id) >")
+        sql = str(keyset_condition(parse_sort("-author,-year"), ["A", 1, 2]).compile(dialect=postgresql.dialect()))
+        assert sql.startswith("(books.author, books.year, books.id) <")
+
+    def test_mixed_directions_use_or_chain(self):
+        sql = str(keyset_condition(parse_sort("author,-year"), ["A", 1, 2]).compile(dialect=postgresql.dialect()))
+        assert " OR " in sql and "books.year <" in sql and "books.id >" in sql
+
+    @pytest.mark.parametrize("sort", [None, "-id", "author", "-author", "author,year", "-year,-title",
+                                      "author,-year", "-author,year,-title", "title,-id"])
+    def test_pages_cover_all_rows_in_order(self, engine, sort):
+        fields = parse_sort(sort)
+        assert walk(engine, fields) == expected_order(engine, fields)
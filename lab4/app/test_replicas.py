@@ -0,0 +1,61 @@
+import pytest
+
+from app.replicas import ReplicaRouter, last_write_lsn
+
+
+@pytest.fixture
+def router():
+    # Engine'и SQLite не підключаються до першого запиту: роутеру потрібні лише об'єкти
+    return ReplicaRouter(["sqlite://", "sqlite://"], retry_seconds=60, check_seconds=60, max_lag_seconds=5)
+
+
+class TestReplicaRouter:
+    """Тести для вибору репліки за станом"""
+
+    def test_unchecked_replicas_are_not_used(self, router):
+        assert router.choose() is None
+        assert router.due_checks() == router.engines
+        # Перевірка вже розпочата: паралельний запит не перевіряє вдруге
+        assert router.due_checks() == []
+
+    def test_round_robin_over_healthy(self, router):
+        first, second = router.engines
+        router.record(first, 100, 0.0)
+        router.record(second, 100, 0.0)
+        assert {router.choose(), router.choose()} == {first, second}
+
+    def test_lagging_replica_is_skipped(self, router):
+        first, second = router.engines
+        router.record(first, 100, 0.0)
+        router.record(second, 100, float('inf'))
+        assert [router.choose() for _ in range(4)] == [first] * 4
+
+    def test_read_your_writes(self, router):
+        first, second = router.engines
+        router.record(first, 100, 0.0)
+        router.record(second, 200, 0.0)
+        assert [router.choose(150) for _ in range(4)] == [second] * 4
+        assert router.choose(300) is None
+
+    def test_down_replica_is_checked_again_after_retry(self, router):
+        first, second = router.engines
+        router.due_checks()
+        router.record(first, 100, 0.0)
+        router.record(second, 100, 0.0)
+        router.mark_down(first)
+        assert [router.choose() for _ in range(4)] == [second] * 4
+        router.retry_seconds = 0
+        router.mark_down(first)
+        assert router.due_checks() == [first]
+
+
+@pytest.mark.parametrize("headers,cookies,expected", [
+    ({}, {}, 0),
+    ({"X-Last-Write-LSN": "42"}, {}, 42),
+    ({}, {"last_write": "42"}, 42),
+    ({"X-Last-Write-LSN": "50"}, {"last_write": "42"}, 50),
+    ({"X-Last-Write-LSN": "abc"}, {}, 0),
+    ({"X-Last-Write-LSN": "-5"}, {}, 0),
+])
+def test_last_write_lsn(headers, cookies, expected):
+    assert last_write_lsn(headers, cookies) == expected
@@ -0,0 +1,62 @@
+"""
+Бенчмарк POST /books/import (потоковий COPY прямо в books).
+
+Генерує CSV та NDJSON з заданою кількістю книг (частина рядків навмисно
+невалідна), відправляє їх потоком через тестовий клієнт Flask і друкує
+звіт ендпоінта. Після кожного прогону імпортовані книги видаляються.
+
+Запуск (після python migrate.py): DATABASE_URL=... CURSOR_SECRET=... python bench_import.py [кількість книг]
+"""
+import io
+import json
+import random
+import sys
+
+from sqlalchemy import text
+
+from app import create_app
+from app.database import db
+
+DEFAULT_ROWS = 500_000
+AUTHOR_PREFIX = 'Import author'
+# Кожен INVALID_EVERY-й рядок має рік поза діапазоном
+INVALID_EVERY = 1000
+
+
+def generate(rows, fmt):
+    rnd = random.Random(42)
+    out = io.StringIO()
+    if fmt == 'csv':
+        out.write('title,author,year\n')
+    for i in range(rows):
+        year = 3000 if i % INVALID_EVERY == 0 else rnd.randint(1500, 2024)
+        title = f"Book, \"{i}\""
+        author = f"{AUTHOR_PREFIX} {rnd.randint(1, 50_000)}"
+        if fmt == 'csv':
+            out.write(f'"{title.replace(chr(34), chr(34) * 2)}",{author},{year}\n')
+        else:
+            out.write(json.dumps({'title': title, 'author': author, 'year': year}) + '\n')
+    return out.getvalue().encode('utf-8')
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    app = create_app()
+    client = app.test_client()
+    content_types = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+    print(f"{'формат':>7} {'МБ':>7} {'імпорт.':>9} {'відхил.':>8} {'с':>7} {'COPY, с':>8} {'коміт, с':>9} {'рядків/с':>10}")
+    for fmt, content_type in content_types.items():
+        body = generate(rows, fmt)
+        response = client.post('/books/import', data=io.BytesIO(body), content_type=content_type)
+        report = response.get_json()
+        assert response.status_code == 201, report
+        print(f"{fmt:>7} {len(body) / 2**20:>7.1f} {report['imported']:>9} {report['rejected']:>8} "
+              f"{report['seconds']:>7.2f} {report['copy_seconds']:>8.2f} {report['commit_seconds']:>9.2f} "
+              f"{report['rows_per_second']:>10}")
+        with app.app_context():
+            db.session.execute(text("DELETE FROM books WHERE author LIKE :prefix"), {'prefix': f"{AUTHOR_PREFIX} %"})
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Бенчмарк GET /books: keyset-пагінація (cursor) проти OFFSET.
+
+Таблиця books заповнюється до потрібного розміру, після чого сторінки
+1..N проходяться запитом з умовою keyset (як у GET /books з cursor), а на
+вибраних глибинах вимірюється той самий запит з OFFSET. Вимірюється лише
+вибірка сторінки, без COUNT(*) та серіалізації. Латентність keyset має
+лишатися сталою, латентність OFFSET - рости з номером сторінки.
+
+Наприкінці перші сторінки проходяться через тестовий клієнт Flask, щоб
+перевірити, що cursor з API дає той самий порядок.
+
+Запуск (після python migrate.py): DATABASE_URL=... CURSOR_SECRET=... python bench_keyset.py [сторінок] [sort]
+"""
+import random
+import statistics
+import sys
+import time
+
+from sqlalchemy import text
+
+from app import create_app
+from app.database import db
+from app.models import Book
+from app.pagination import parse_sort, order_by_clause, keyset_condition
+
+PAGE_SIZE = 10
+DEFAULT_PAGES = 10_000
+SAMPLE_PAGES = [1, 10, 100, 1_000, 5_000, 10_000]
+REPEATS = 5
+
+
+def seed(size):
+    """Доповнює таблицю books до size рядків"""
+    existing = Book.query.count()
+    rnd = random.Random(42)
+    batch = []
+    for i in range(existing, size):
+        batch.append({
+            'title': f"Book title number {i}",
+            'author': f"Author {rnd.randint(1, 5_000)}",
+            'year': rnd.randint(1500, 2024),
+        })
+        if len(batch) == 10_000:
+            db.session.execute(Book.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(Book.__table__.insert(), batch)
+    db.session.commit()
+    db.session.execute(text('ANALYZE books'))
+    db.session.commit()
+
+
+def keyset_page(sort_fields, last):
+    query = Book.query.order_by(*order_by_clause(sort_fields))
+    if last is not None:
+        query = query.filter(keyset_condition(sort_fields, [getattr(last, name) for name, _ in sort_fields]))
+    return query.limit(PAGE_SIZE + 1).all()
+
+
+def offset_page(sort_fields, page):
+    """Та сама сторінка через OFFSET, для порівняння"""
+    query = Book.query.order_by(*order_by_clause(sort_fields))
+    return query.offset((page - 1) * PAGE_SIZE).limit(PAGE_SIZE + 1).all()
+
+
+def check_api(client, sort, sort_fields, pages):
+    """Сторінки з API мають збігатися зі сторінками keyset_page"""
+    cursor, last = None, None
+    for _ in range(pages):
+        params = {'limit': PAGE_SIZE, 'sort': sort}
+        if cursor:
+            params['cursor'] = cursor
+        body = client.get('/books', query_string=params).get_json()
+        expected = keyset_page(sort_fields, last)[:PAGE_SIZE]
+        assert [book['id'] for book in body['data']] == [book.id for book in expected]
+        cursor, last = body['meta']['next_cursor'], expected[-1]
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PAGES
+    sort = sys.argv[2] if len(sys.argv) > 2 else 'author,year'
+    app = create_app()
+    client = app.test_client()
+    with app.app_context():
+        seed(pages * PAGE_SIZE + PAGE_SIZE)
+        sort_fields = parse_sort(sort)
+
+        # Прохід сторінок keyset; зберігаємо латентність кожної сторінки
+        latencies = {}
+        last = None
+        for page in range(1, pages + 1):
+            started = time.perf_counter()
+            books = keyset_page(sort_fields, last)
+            latencies[page] = time.perf_counter() - started
+            db.session.expunge_all()
+            if len(books) <= PAGE_SIZE:
+                break
+            last = books[PAGE_SIZE - 1]
+
+        print(f"sort={sort}, сторінок пройдено: {len(latencies)}")
+        print(f"{'сторінка':>9} {'keyset, мс':>11} {'offset, мс':>11}")
+        for page in SAMPLE_PAGES:
+            if page not in latencies:
+                continue
+            # Медіана keyset по сусідніх сторінках, щоб згладити шум
+            window = [latencies[p] for p in range(max(1, page - REPEATS), page + 1)]
+            timings = []
+            for _ in range(REPEATS):
+                started = time.perf_counter()
+                offset_page(sort_fields, page)
+                timings.append(time.perf_counter() - started)
+                db.session.expunge_all()
+            print(f"{page:>9} {statistics.median(window) * 1000:>11.2f} {statistics.median(timings) * 1000:>11.2f}")
+
+        check_api(client, sort, sort_fields, 20)
+        print("API cursor: порядок збігається")
+
+
+if __name__ == "__main__":
+    main()
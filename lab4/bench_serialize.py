@@ -0,0 +1,76 @@
+"""
+Бенчмарк процесорної вартості сторінки GET /books: ORM проти core.
+
+orm  - як було: Book.query (об'єкти Book) + books_schema.dump + jsonify
+core - як зараз: select(*BOOK_COLUMNS) (кортежі) + rows_to_dicts + orjson
+
+Для кожного розміру сторінки обидва шляхи виконуються REPEATS разів на
+тих самих keyset-сторінках; вимірюється процесорний час процесу
+(time.process_time), тобто саме робота Python, без очікування Postgres.
+Перед вимірюванням перевіряється, що обидва шляхи дають однаковий JSON.
+
+Запуск (після python migrate.py): DATABASE_URL=... CURSOR_SECRET=... python bench_serialize.py [сторінок]
+"""
+import json
+import sys
+import time
+
+from flask import jsonify
+
+from app import create_app
+from app.database import db
+from app.models import Book
+from app.schemas import books_schema
+from app.serialization import BOOK_COLUMNS, rows_to_dicts, dumps, orjson
+
+PAGE_SIZES = [10, 100]
+DEFAULT_PAGES = 200
+REPEATS = 3
+MIN_BOOKS = 10_000
+
+
+def orm_page(after_id, limit):
+    books = Book.query.filter(Book.id > after_id).order_by(Book.id).limit(limit).all()
+    return jsonify({'data': books_schema.dump(books)}).get_data()
+
+
+def core_page(after_id, limit):
+    statement = db.select(*BOOK_COLUMNS).where(Book.id > after_id).order_by(Book.id).limit(limit)
+    rows = db.session.execute(statement).all()
+    return dumps({'data': rows_to_dicts(rows)})
+
+
+def measure(page, starts, limit):
+    """Середній процесорний час на сторінку, мкс"""
+    best = None
+    for _ in range(REPEATS):
+        started = time.process_time()
+        for after_id in starts:
+            page(after_id, limit)
+            # Identity map не має накопичуватись між сторінками
+            db.session.expunge_all()
+        elapsed = time.process_time() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(starts) * 1_000_000
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PAGES
+    app = create_app()
+    with app.test_request_context():
+        total = Book.query.count()
+        if total < MIN_BOOKS:
+            sys.exit(f"У books {total} рядків; заповніть таблицю (наприклад, bench_keyset.py)")
+        min_id = db.session.query(db.func.min(Book.id)).scalar()
+        print(f"книг: {total}, сторінок на прогін: {pages}, кодувальник: {'orjson' if orjson else 'json'}")
+        print(f"{'limit':>6} {'orm, мкс':>10} {'core, мкс':>10} {'прискорення':>12}")
+        for limit in PAGE_SIZES:
+            starts = [min_id - 1 + i * limit for i in range(pages)]
+            assert json.loads(orm_page(starts[1], limit)) == json.loads(core_page(starts[1], limit))
+            orm_us = measure(orm_page, starts, limit)
+            core_us = measure(core_page, starts, limit)
+            print(f"{limit:>6} {orm_us:>10.0f} {core_us:>10.0f} {orm_us / core_us:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
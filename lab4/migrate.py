@@ -0,0 +1,27 @@
+"""
+Застосовує міграції схеми. Запускається окремим кроком перед стартом воркерів.
+
+Запуск: python migrate.py [версія]
+"""
+import sys
+
+from app import create_app
+from app.counting import install_counter
+from app.database import db
+from app.migrations import migrate
+from app.search import install_trigram
+
+app = create_app()
+
+if __name__ == "__main__":
+    target = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    with app.app_context():
+        applied = migrate(db.engine, target)
+        for version, name in applied:
+            print(f"Застосовано міграцію {version}: {name}")
+        if not applied:
+            print("Схема вже актуальна")
+        if app.config['BOOKS_COUNTER']:
+            install_counter(db.engine)
+        if app.config['BOOKS_TRGM']:
+            install_trigram(db.engine)